@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 from openai import OpenAI
+from svg_render import heatmap_svg
+from score_model import Assessment, layout_for
 
 # ---- Set your OpenAI key ----
 api_key = "sk-APIKey"
@@ -35,37 +35,20 @@ categories = [
     "AI/ML Integration", "Governance & Security", "Business Engagement"
 ]
 
-scores = {}
+assessment = Assessment(layout_for(categories))
 for cat in categories:
     col1, col2 = st.columns([4, 1])
     with col1:
         score = st.slider(f"{cat}", 1, 5, 3, format="%d", key=cat)
     with col2:
         st.markdown(f"**{levels[score]}**", unsafe_allow_html=True)
-    scores[cat] = score
+    assessment[cat] = score
+scores = assessment.to_dict()
 
 # ---- Heatmap ----
 def draw_cube_heatmap(scores):
-    fig, ax = plt.subplots(figsize=(10, 2))
-    ax.set_xlim(0, len(scores))
-    ax.set_ylim(0, 1)
-    ax.axis('off')
-
-    color_map = {
-        1: "#d6e4f0",  # Light Blue
-        2: "#a9c9e2",
-        3: "#78abd5",
-        4: "#4f90c6",
-        5: "#2d72b8"   # Deep Blue
-    }
-
-    for i, (category, level) in enumerate(scores.items()):
-        rect = patches.Rectangle((i, 0), 1, 1, linewidth=1, edgecolor='white', facecolor=color_map[level])
-        ax.add_patch(rect)
-        ax.text(i + 0.5, 0.75, category, ha='center', va='center', fontsize=8, wrap=True)
-        ax.text(i + 0.5, 0.25, f"Level {level}\n({levels[level]})", ha='center', va='center', fontsize=8, color='black')
-
-    st.pyplot(fig)
+    # SVG drawn in the browser; no matplotlib figure per rerun
+    st.image(heatmap_svg(scores, levels), width="stretch")
 
 st.markdown("### Maturity Heatmap")
 draw_cube_heatmap(scores)
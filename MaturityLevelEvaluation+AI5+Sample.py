@@ -1,9 +1,10 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import numpy as np
 from openai import OpenAI
+from portfolio_scoring import key_insights
+from radar_charts import radar_svg
+from svg_render import phase_roadmap_svg
+from score_model import Assessment, layout_for
 
 # ---- App Configuration (MUST BE FIRST) ----
 st.set_page_config(page_title="Cloud & AI Maturity", layout="wide")
@@ -139,7 +140,7 @@ st.markdown("### Maturity Assessment")
 st.markdown("**Scale:** 1 = Greenfield | 2 = Emerging | 3 = Developing | 4 = Established | 5 = Optimized")
 
 # ---- Data Storage for Scores and Comments ----
-all_scores = {}
+assessment = Assessment(layout_for(categories_structure))
 category_comments = {}
 
 # ---- Category Assessment Interface ----
@@ -148,7 +149,6 @@ for category, sub_caps in categories_structure.items():
     
     # Create columns for sub-capabilities (3 columns for 6 items)
     cols = st.columns(3)
-    sub_scores = {}
     
     for i, sub_cap in enumerate(sub_caps):
         with cols[i % 3]:
@@ -159,14 +159,7 @@ for category, sub_caps in categories_structure.items():
                 format="Level %d"
             )
             st.caption(f"**{levels[score]}**")
-            sub_scores[sub_cap] = score
-    
-    # Calculate category average
-    category_avg = round(np.mean(list(sub_scores.values())))
-    all_scores[category] = {
-        'average': category_avg,
-        'sub_capabilities': sub_scores
-    }
+            assessment[category, sub_cap] = score
     
     # Add comment textbox for each category
     comment = st.text_area(
@@ -179,72 +172,25 @@ for category, sub_caps in categories_structure.items():
     
     st.markdown("---")
 
+# ---- Category Averages (summed per category from the score vector) ----
+all_scores = assessment.to_dict(average_digits=None)
+
 # ---- Spider Chart Visualization for Each Category ----
+@st.cache_data(max_entries=256, show_spinner=False)
+def render_category_radar(category, sub_caps, values, average):
+    # Keyed on one category's score tuple, so moving a slider redraws only that category's chart
+    return radar_svg(category, sub_caps, values, average, levels[average])
+
 def draw_spider_charts(all_scores):
-    fig, axes = plt.subplots(2, 3, figsize=(20, 14), subplot_kw=dict(projection='polar'))
-    fig.suptitle('Cloud & Data Maturity Assessment - Spider Chart Analysis', fontsize=18, fontweight='bold')
-    
-    categories = list(all_scores.keys())
-    
-    # Professional blue color scheme for spider charts
-    colors = ['#1976d2', '#42a5f5', '#64b5f6', '#90caf9', '#bbdefb', '#e3f2fd']
-    
+    st.markdown("**Cloud & Data Maturity Assessment - Spider Chart Analysis**")
+    # One cached image per category, composited as a 3-column grid in the browser
+    cols = st.columns(3)
     for idx, (category, scores_data) in enumerate(all_scores.items()):
-        row, col = divmod(idx, 3)
-        ax = axes[row, col]
-        
-        # Get sub-capability data
-        sub_caps = list(scores_data['sub_capabilities'].keys())
-        values = list(scores_data['sub_capabilities'].values())
-        
-        # Number of variables
-        N = len(sub_caps)
-        
-        # Angles for each axis
-        angles = [n / float(N) * 2 * np.pi for n in range(N)]
-        angles += angles[:1]  # Complete the circle
-        
-        # Values for plotting
-        values += values[:1]  # Complete the circle
-        
-        # Plot the spider chart
-        ax.plot(angles, values, 'o-', linewidth=3, label=category, color='#1976d2', markersize=8)
-        ax.fill(angles, values, alpha=0.25, color='#1976d2')
-        
-        # Add labels
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(sub_caps, fontsize=10, fontweight='bold')
-        
-        # Set y-axis limits and labels
-        ax.set_ylim(0, 5)
-        ax.set_yticks([1, 2, 3, 4, 5])
-        ax.set_yticklabels(['1\nGreenfield', '2\nEmerging', '3\nDeveloping', '4\nEstablished', '5\nOptimized'], 
-                          fontsize=8)
-        
-        # Add gridlines
-        ax.grid(True, alpha=0.3)
-        
-        # Category title with average
-        ax.set_title(f"{category}\nAverage: {scores_data['average']:.1f} ({levels[scores_data['average']]})", 
-                    fontsize=14, fontweight='bold', pad=20, color='#1565c0')
-        
-        # Add value labels on the chart
-        for angle, value, sub_cap in zip(angles[:-1], values[:-1], sub_caps):
-            ax.annotate(f'{value}', 
-                       xy=(angle, value), 
-                       xytext=(5, 5), 
-                       textcoords='offset points',
-                       fontsize=9, 
-                       fontweight='bold',
-                       color='#0d47a1',
-                       bbox=dict(boxstyle='round,pad=0.2', facecolor='white', alpha=0.8))
-    
-    # Hide empty subplot if odd number of categories
-    if len(categories) % 2 != 0:
-        axes[1, 2].axis('off')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+        if idx and idx % 3 == 0:
+            cols = st.columns(3)
+        with cols[idx % 3]:
+            st.image(render_category_radar(category, tuple(scores_data['sub_capabilities'].keys()),
+                                           tuple(scores_data['sub_capabilities'].values()), scores_data['average']))
 
 # ---- Display Spider Chart Visualization ----
 st.markdown("### Maturity Assessment - Spider Chart Analysis")
@@ -252,8 +198,6 @@ draw_spider_charts(all_scores)
 
 # ---- Create Roadmap Diagram ----
 def draw_roadmap_diagram():
-    fig, ax = plt.subplots(figsize=(14, 8))
-    
     # Define phases
     phases = [
         {
@@ -282,51 +226,7 @@ def draw_roadmap_diagram():
         }
     ]
     
-    # Draw phases as connected boxes
-    box_width = 3
-    box_height = 2
-    spacing = 1
-    
-    for i, phase in enumerate(phases):
-        x_pos = i * (box_width + spacing)
-        
-        # Main phase box
-        rect = patches.FancyBboxPatch(
-            (x_pos, 2), box_width, box_height,
-            boxstyle="round,pad=0.1",
-            facecolor=phase['color'],
-            edgecolor=phase['border'],
-            linewidth=2
-        )
-        ax.add_patch(rect)
-        
-        # Phase title
-        ax.text(x_pos + box_width/2, 3.5, phase['name'], 
-               ha='center', va='center', fontsize=12, fontweight='bold')
-        
-        # Phase items
-        for j, item in enumerate(phase['items']):
-            ax.text(x_pos + box_width/2, 2.8 - j*0.3, f"• {item}", 
-                   ha='center', va='center', fontsize=9)
-        
-        # Arrow to next phase
-        if i < len(phases) - 1:
-            arrow = patches.FancyArrowPatch(
-                (x_pos + box_width, 3),
-                (x_pos + box_width + spacing, 3),
-                arrowstyle='->',
-                mutation_scale=20,
-                color='#666666'
-            )
-            ax.add_patch(arrow)
-    
-    ax.set_xlim(-0.5, len(phases) * (box_width + spacing))
-    ax.set_ylim(1, 5)
-    ax.set_title('18-Month Strategic Roadmap', fontsize=16, fontweight='bold', pad=20)
-    ax.axis('off')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+    st.image(phase_roadmap_svg(phases, '18-Month Strategic Roadmap'), width="stretch")
 
 # ---- AI Evaluation Button ----
 if st.button("Generate AI-Powered Strategic Assessment", type="primary"):
@@ -437,13 +337,14 @@ if st.button("Generate AI-Powered Strategic Assessment", type="primary"):
     st.markdown("### Key Strategic Insights")
     
     # Calculate insights
-    high_maturity = [cat for cat, data in all_scores.items() if data['average'] >= 4]
-    low_maturity = [cat for cat, data in all_scores.items() if data['average'] <= 2]
+    overall_avg, high_maturity, low_maturity = key_insights(
+        {cat: data['average'] for cat, data in all_scores.items()}, strength=4, priority=2
+    )
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Average Maturity", f"{np.mean([data['average'] for data in all_scores.values()]):.1f}")
+        st.metric("Average Maturity", f"{overall_avg:.1f}")
     
     with col2:
         st.metric("Strength Areas", len(high_maturity))
@@ -1,9 +1,10 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import numpy as np
 from openai import OpenAI
+from portfolio_scoring import key_insights
+from radar_charts import radar_svg
+from svg_render import phase_roadmap_svg
+from score_model import Assessment, layout_for
 import re
 
 # ---- App Configuration ----
@@ -124,7 +125,7 @@ st.markdown("### Maturity Assessment")
 st.markdown("**Scale:** 1 = Greenfield | 2 = Emerging | 3 = Developing | 4 = Established | 5 = Optimized")
 
 # ---- Data Storage for Scores, Comments, Inclusion ----
-all_scores = {}
+assessment = Assessment(layout_for(categories_structure))
 category_comments = {}
 category_inclusion = {}
 
@@ -136,7 +137,6 @@ for category, sub_caps in categories_structure.items():
         category_inclusion[category] = include_cat
         if include_cat:
             cols = st.columns(3)
-            sub_scores = {}
             for i, sub_cap in enumerate(sub_caps):
                 with cols[i % 3]:
                     score = st.slider(
@@ -146,12 +146,7 @@ for category, sub_caps in categories_structure.items():
                         format="Level %d"
                     )
                     st.caption(f"**{levels[score]}**")
-                    sub_scores[sub_cap] = score
-            category_avg = round(np.mean(list(sub_scores.values())))
-            all_scores[category] = {
-                'average': category_avg,
-                'sub_capabilities': sub_scores
-            }
+                    assessment[category, sub_cap] = score
             comment = st.text_area(
                 f"Key considerations for {category}:",
                 placeholder="Enter specific challenges, priorities, or context for this area...",
@@ -161,6 +156,10 @@ for category, sub_caps in categories_structure.items():
             category_comments[category] = comment
         st.markdown("---")
 
+# ---- Category Averages (summed per category from the score vector; excluded categories are left out) ----
+all_scores = assessment.to_dict([cat for cat in categories_structure if category_inclusion[cat]],
+                                average_digits=None)
+
 # ---- Overall Thoughts Section ----
 st.markdown('<div class="category-header">Additional Context/Technology Preferences</div>', unsafe_allow_html=True)
 overall_input = st.text_area(
@@ -171,40 +170,26 @@ overall_input = st.text_area(
 )
 
 # ---- Dynamic Spider Chart Visualization ----
+@st.cache_data(max_entries=256, show_spinner=False)
+def render_category_radar(category, sub_caps, values, average, color):
+    # Keyed on one category's score tuple, so moving a slider redraws only that category's chart
+    return radar_svg(category, sub_caps, values, average, levels[average], color)
+
 def draw_spider_charts(selected_scores):
-    num_selected = len(selected_scores)
-    if num_selected == 0:
+    if not selected_scores:
         st.info("No categories selected for visualization.")
         return
-    rows = (num_selected + 2) // 3
-    fig, axes = plt.subplots(rows, 3, figsize=(20, 7 * rows), subplot_kw=dict(projection='polar'))
-    axes = axes.flatten() if num_selected > 1 else [axes]
-    fig.suptitle('Cloud & Data Maturity Assessment - Spider Chart Analysis', fontsize=18, fontweight='bold')
+    st.markdown("**Cloud & Data Maturity Assessment - Spider Chart Analysis**")
     colors = ['#1976d2', '#42a5f5', '#64b5f6', '#90caf9', '#bbdefb', '#e3f2fd']
+    # One cached image per category, composited as a 3-column grid in the browser
+    cols = st.columns(3)
     for idx, (category, scores_data) in enumerate(selected_scores.items()):
-        ax = axes[idx]
-        sub_caps = list(scores_data['sub_capabilities'].keys())
-        values = list(scores_data['sub_capabilities'].values())
-        N = len(sub_caps)
-        angles = [n / float(N) * 2 * np.pi for n in range(N)]
-        angles += angles[:1]
-        values += values[:1]
-        ax.plot(angles, values, 'o-', linewidth=3, label=category, color=colors[idx % len(colors)], markersize=8)
-        ax.fill(angles, values, alpha=0.25, color=colors[idx % len(colors)])
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(sub_caps, fontsize=10, fontweight='bold')
-        ax.set_ylim(0, 5)
-        ax.set_yticks([1, 2, 3, 4, 5])
-        ax.set_yticklabels(['1\nGreenfield', '2\nEmerging', '3\nDeveloping', '4\nEstablished', '5\nOptimized'], fontsize=8)
-        ax.grid(True, alpha=0.3)
-        ax.set_title(f"{category}\nAverage: {scores_data['average']:.1f} ({levels[scores_data['average']]})", fontsize=14, fontweight='bold', pad=20, color='#1565c0')
-        for angle, value, sub_cap in zip(angles[:-1], values[:-1], sub_caps):
-            ax.annotate(f'{value}', xy=(angle, value), xytext=(5, 5), textcoords='offset points', fontsize=9, fontweight='bold', color='#0d47a1', bbox=dict(boxstyle='round,pad=0.2', facecolor='white', alpha=0.8))
-    # Hide unused subplots
-    for j in range(idx + 1, len(axes)):
-        axes[j].axis('off')
-    plt.tight_layout()
-    st.pyplot(fig)
+        if idx and idx % 3 == 0:
+            cols = st.columns(3)
+        with cols[idx % 3]:
+            st.image(render_category_radar(category, tuple(scores_data['sub_capabilities'].keys()),
+                                           tuple(scores_data['sub_capabilities'].values()), scores_data['average'],
+                                           colors[idx % len(colors)]))
 
 st.markdown("### Maturity Assessment - Spider Chart Analysis")
 selected_scores = {cat: all_scores[cat] for cat in categories_structure if category_inclusion.get(cat)}
@@ -255,51 +240,11 @@ Success criteria and milestones:
 - Enhance data analytics capabilities
 - Expand AI/ML initiatives across the organization"""
         phases = extract_success_criteria(default_roadmap_content)
-    fig, ax = plt.subplots(figsize=(8, 7))
     colors = ['#e3f2fd', '#f3e5f5', '#e8f5e9', '#fff3e0']
     borders = ['#1976d2', '#7b1fa2', '#388e3c', '#f57c00']
-    box_width = 7
-    box_height = 1.2
-    spacing = 0.5
-    y_start = 7.5
-    for i, phase in enumerate(phases):
-        y_pos = y_start - i * (box_height + spacing)
-        color = colors[i % len(colors)]
-        border = borders[i % len(borders)]
-        rect = patches.FancyBboxPatch(
-            (0.7, y_pos), box_width, box_height,
-            boxstyle="round,pad=0.1",
-            facecolor=color,
-            edgecolor=border,
-            linewidth=3 if i == 0 else 2
-        )
-        ax.add_patch(rect)
-        ax.text(
-            0.7 + box_width/2, y_pos + box_height - 0.2,
-            phase['phase'],
-            ha='center', va='center',
-            fontsize=12, fontweight='bold', color=border
-        )
-        for j, item in enumerate(phase['criteria']):
-            ax.text(
-                0.7 + box_width/2, y_pos + box_height - 0.5 - j*0.28,
-                f"• {item}",
-                ha='center', va='center',
-                fontsize=10, fontweight='normal', color=border
-            )
-        if i < len(phases) - 1:
-            arrow = patches.FancyArrowPatch(
-                (0.7 + box_width/2, y_pos),
-                (0.7 + box_width/2, y_pos - spacing + 0.1),
-                arrowstyle='->', mutation_scale=13, color='#666666', linewidth=1.2
-            )
-            ax.add_patch(arrow)
-    ax.set_xlim(0, 8)
-    ax.set_ylim(0, 9)
-    ax.set_title('18-Month Strategic Roadmap', fontsize=15, fontweight='bold', pad=25, color='#1565c0')
-    ax.axis('off')
-    plt.subplots_adjust(top=0.93, bottom=0.03, left=0.05, right=0.95, hspace=0)
-    st.pyplot(fig)
+    boxes = [{'name': phase['phase'], 'items': phase['criteria'], 'color': colors[i % len(colors)],
+              'border': borders[i % len(borders)]} for i, phase in enumerate(phases)]
+    st.image(phase_roadmap_svg(boxes, '18-Month Strategic Roadmap', vertical=True), width="stretch")
 
 # ---- AI Evaluation Button ----
 if st.button("Generate AI-Powered Strategic Assessment", type="primary"):
@@ -398,11 +343,12 @@ if st.button("Generate AI-Powered Strategic Assessment", type="primary"):
         phases = extract_success_criteria(default_roadmap_content)
         draw_roadmap_diagram(phases)
     st.markdown("### Key Strategic Insights")
-    high_maturity = [cat for cat, data in filtered_scores.items() if data['average'] >= 3]
-    low_maturity = [cat for cat, data in filtered_scores.items() if data['average'] <= 2]
+    overall_avg, high_maturity, low_maturity = key_insights(
+        {cat: data['average'] for cat, data in filtered_scores.items()}, strength=3, priority=2
+    )
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Average Maturity", f"{np.mean([data['average'] for data in filtered_scores.values()]):.1f}")
+        st.metric("Average Maturity", f"{overall_avg:.1f}")
     with col2:
         st.metric("Strength Areas", len(high_maturity))
         if high_maturity:
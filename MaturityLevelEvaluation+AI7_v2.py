@@ -3,14 +3,26 @@
 # consolidated roadmap, diagrams, PPTX export, debug raw outputs saved.
 
 import streamlit as st
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import numpy as np
-import json, re, os
-from io import BytesIO
-from openai import OpenAI
-from pptx import Presentation
-from pptx.util import Inches, Pt
+import json, os, time
+from datetime import datetime
+from response_cache import ResponseCache
+from assessment_store import AssessmentStore
+from score_model import Assessment, layout_for
+from request_scheduler import RequestScheduler
+from token_budget import UsageMeter, format_usage
+from perf_trace import Tracer
+from card_prefetch import CardPrefetcher
+from model_routing import ModelRouter, build_routes, DRAFT, FINAL, TIERS
+from maturity_engine import (
+    levels, categories_structure, STRUCTURED_MODES, CompletionClient,
+    categories_to_process, build_category_prompt, build_batched_prompt, estimate_tokens,
+    run_category_generation, run_batched_generation, collect_results, consolidate_roadmap,
+    category_fingerprint, fragments_fingerprint, dirty_categories, merge_results,
+    normalize_baseball_card, BaseballCard, item_card
+)
+from roadmap_export import (
+    render_roadmap_pngs, export_to_pptx, deck_fingerprint, roadmap_8week_svg, roadmap_3year_svg
+)
 
 # ---- App Configuration ----------------------
 st.set_page_config(page_title="Cloud & AI Maturity Evaluator", layout="wide")
@@ -19,7 +31,13 @@ st.markdown("Assess maturity, generate executive & technical guidance, and produ
 
 # ---- Set your OpenAI key --------------------
 api_key = "sk-"  # Replace with your actual API key
-client = OpenAI(api_key=api_key)
+
+@st.cache_resource(show_spinner=False)
+def get_openai_client(key):
+    # Imported and created once per process, on the first model call (not on every rerun)
+    from openai import OpenAI
+    # retries are handled by the shared RequestScheduler (rate limits, backoff, Retry-After)
+    return OpenAI(api_key=key, max_retries=0)
 
 # -------------------- CSS --------------------
 st.markdown("""
@@ -39,440 +57,436 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# -------------------- Structures --------------------
-levels = {1: "Greenfield", 2: "Emerging", 3: "Developing", 4: "Established", 5: "Optimized"}
-categories_structure = {
-    "Cloud Architecture": ["Infrastructure Design","Scalability & Performance","Multi-cloud Strategy","Cost Optimization","Disaster Recovery","Service Architecture"],
-    "Data Management": ["Data Quality","Data Integration","Master Data Management","Data Lifecycle","Data Storage Strategy","Real-time Processing"],
-    "Data Visualization & Insights": ["Dashboard Design","Data Storytelling","Interactive Visualizations","Advanced Analytics Techniques","Self-Service Analytics","Insight Communication"],
-    "AI/ML Integration": ["Model Development","MLOps & Deployment","AI Ethics & Bias","Business Integration","AutoML Capabilities","AI Governance"],
-    "Governance & Security": ["Data Privacy","Compliance Management","Access Controls","Risk Management","Audit & Monitoring","Policy Enforcement"],
-    "Business Engagement": ["Stakeholder Alignment","Change Management","Skills & Training","Value Measurement","Business Process Integration","Strategic Planning"]
-}
-
 # -------------------- Sidebar inputs --------------------
 st.sidebar.header("Company Context")
-industry = st.sidebar.selectbox("Industry", ["Homebuilding & Real Estate","Healthcare","Manufacturing","Financial Services","Logistics","Retail","Food and Beverage"])
-company_size = st.sidebar.text_input("Company size", "1,200 employees")
-it_size = st.sidebar.text_input("IT department size", "50")
-uses_cloud = st.sidebar.radio("Uses cloud?", ["No","Yes"], index=1)
-cloud_platform = st.sidebar.text_input("Which cloud platform(s)?", "Azure") if uses_cloud == "Yes" else ""
-priority_projects = st.sidebar.text_area("Priority projects", "ERP consolidation, eCommerce upgrade")
-use_seed_scenario = st.sidebar.checkbox("Seed with charitable gaming scenario", value=True)
+industries = ["Homebuilding & Real Estate","Healthcare","Manufacturing","Financial Services","Logistics","Retail","Food and Beverage"]
+# Input defaults live in session state (not in the widgets) so a saved assessment can be loaded into them
+for key, default in {"client_name": "", "company_size": "1,200 employees", "it_size": "50", "uses_cloud": "Yes",
+                     "cloud_platform": "Azure", "priority_projects": "ERP consolidation, eCommerce upgrade",
+                     "use_seed_scenario": True, "overall_input": ""}.items():
+    st.session_state.setdefault(key, default)
+client_name = st.sidebar.text_input("Client name", key="client_name", help="Used to find this assessment again later.")
+industry = st.sidebar.selectbox("Industry", industries, key="industry")
+company_size = st.sidebar.text_input("Company size", key="company_size")
+it_size = st.sidebar.text_input("IT department size", key="it_size")
+uses_cloud = st.sidebar.radio("Uses cloud?", ["No","Yes"], key="uses_cloud")
+cloud_platform = st.sidebar.text_input("Which cloud platform(s)?", key="cloud_platform") if uses_cloud == "Yes" else ""
+priority_projects = st.sidebar.text_area("Priority projects", key="priority_projects")
+use_seed_scenario = st.sidebar.checkbox("Seed with charitable gaming scenario", key="use_seed_scenario")
 seed_scenario_text = (
     "The client is a manufacturer and distributor of charitable gaming products. "
     "They operate three business units with silos, ~10 ERPs, no consolidated data, and many long-tenured staff resistant to change."
 ) if use_seed_scenario else ""
 
+st.sidebar.header("Generation Settings")
+model_tiers = {"Draft (fast, for workshops)": DRAFT, "Final (deck quality)": FINAL}
+st.session_state.setdefault("model_tier", next(iter(model_tiers)))
+model_tier = model_tiers[st.sidebar.radio("Model tier", list(model_tiers), key="model_tier",
+                                          help="Draft uses a faster, cheaper model with shorter outputs for live "
+                                               "iteration; switch to Final and regenerate before exporting the deck.")]
+max_in_flight = st.sidebar.slider("Max concurrent AI calls", 1, len(categories_structure), 4,
+                                  help="Upper bound on category prompts sent to the model at the same time.")
+use_response_cache = st.sidebar.checkbox("Reuse cached AI responses", value=True,
+                                         help="Identical prompts are answered from the local cache without calling the model.")
+generation_mode = st.sidebar.radio("Generation mode", ["Per category", "Batched (one request)"],
+                                   help="Batched sends the shared company context once for all selected categories.")
+structured_output = st.sidebar.selectbox("Structured output", ["Off", "JSON schema", "Function calling"],
+                                         help="Ask the model for cards that already match the baseball-card schema. "
+                                              "Models without support fall back to free-form JSON + repair.")
+stream_cards = st.sidebar.checkbox("Stream baseball cards as they generate", value=True,
+                                   help="Render each card field as soon as the model produces it.")
+regenerate_all = st.sidebar.checkbox("Regenerate unchanged categories", value=False,
+                                     help="By default only categories whose scores, comment, include flag or "
+                                          "the shared context changed since the last generation are sent to the model.")
+prefetch_cards = st.sidebar.checkbox("Prefetch cards while scoring", value=False,
+                                     help="Generate a category's card in the background once its inputs have stopped "
+                                          "changing, so Generate mostly finds the cards ready.")
+prefetch_delay = st.sidebar.slider("Prefetch after inputs are stable for (seconds)", 2, 60, 8) if prefetch_cards else None
+
+# -------------------- Assessment store and peer index --------------------
+@st.cache_resource
+def get_assessment_store():
+    # One SQLite store per process; every finished assessment is saved here
+    return AssessmentStore(os.getenv("MATURITY_STORE_PATH", os.path.join(".cache", "assessments.sqlite3")))
+
+@st.cache_resource
+def get_portfolio():
+    # Score vectors and per-industry percentile histograms of every stored assessment, shared by all sessions;
+    # imported here so numpy is only loaded once there are stored assessments to compare with
+    from portfolio_scoring import Portfolio
+    return Portfolio.from_store(get_assessment_store(), categories_structure)
+
+assessment_store = get_assessment_store()
+portfolio = None
+if assessment_store.stats()["assessments"]:
+    portfolio = get_portfolio()
+    portfolio.sync(assessment_store)  # picks up assessments saved since the last run (e.g. by the batch CLI)
+show_peer_ranks = st.sidebar.checkbox("Show peer percentile under each slider", value=True,
+                                      help="Rank of each score among stored assessments from the same industry.")
+bulk_scoring = st.sidebar.checkbox("Apply slider changes in bulk", value=True,
+                                   help="Edit any number of scores and comments, then click Apply scores; the rest "
+                                        "of the page reruns once instead of after every slider move.")
+
 # -------------------- Sliders UI --------------------
 st.markdown("---")
 st.markdown("## Maturity Assessment")
 st.markdown("**Scale:** 1 = Greenfield | 2 = Emerging | 3 = Developing | 4 = Established | 5 = Optimized")
-all_scores, category_comments, category_inclusion = {}, {}, {}
-for category, sub_caps in categories_structure.items():
-    with st.expander(category, expanded=False):
-        st.markdown(f'<div class="category-header">{category}</div>', unsafe_allow_html=True)
-        include_cat = st.checkbox(f"Include {category}", True, key=f"include_{category}")
-        category_inclusion[category] = include_cat
-
-        sub_scores = {}
-        cols = st.columns(3)
-        for i, sub_cap in enumerate(sub_caps):
-            with cols[i % 3]:
-                score = st.slider(f"{sub_cap}", 1, 5, 3, key=f"{category}_{sub_cap}", format="Level %d")
-                st.caption(f"**{levels[score]}**")
-                sub_scores[sub_cap] = score
-            if (i+1) % 3 == 0 and i < len(sub_caps)-1:
-                cols = st.columns(3)
-
-        all_scores[category] = {"average": round(np.mean(list(sub_scores.values())), 1), "sub_capabilities": sub_scores}
-        comment = st.text_area(f"Comments for {category} (optional):", key=f"comment_{category}", height=70)
-        category_comments[category] = comment
-
-overall_input = st.text_area("Overall context/constraints (budget, compliance, culture):", height=100)
+assessment = Assessment(layout_for(categories_structure))
+category_comments, category_inclusion = {}, {}
+# In bulk mode the sliders and comments sit in a form: editing them reruns nothing, and the page
+# (cards, roadmap, prefetch, peer benchmark) reruns once with all the edits when they are applied
+scoring_form = st.form("maturity_scoring", border=False) if bulk_scoring else st.container()
+with scoring_form:
+    for category, sub_caps in categories_structure.items():
+        with st.expander(category, expanded=False):
+            st.markdown(f'<div class="category-header">{category}</div>', unsafe_allow_html=True)
+            st.session_state.setdefault(f"include_{category}", True)
+            include_cat = st.checkbox(f"Include {category}", key=f"include_{category}")
+            category_inclusion[category] = include_cat
+
+            cols = st.columns(3)
+            for i, sub_cap in enumerate(sub_caps):
+                with cols[i % 3]:
+                    st.session_state.setdefault(f"{category}_{sub_cap}", 3)
+                    score = st.slider(f"{sub_cap}", 1, 5, key=f"{category}_{sub_cap}", format="Level %d")
+                    peer_rank, peer_count = (portfolio.sub_capability_rank(industry, category, sub_cap, score)
+                                             if show_peer_ranks and portfolio is not None else (None, 0))
+                    if peer_count:
+                        st.caption(f"**{levels[score]}** · P{peer_rank:.0f} of {peer_count} {industry} peers")
+                    else:
+                        st.caption(f"**{levels[score]}**")
+                    assessment[category, sub_cap] = score
+                if (i+1) % 3 == 0 and i < len(sub_caps)-1:
+                    cols = st.columns(3)
+
+            comment = st.text_area(f"Comments for {category} (optional):", key=f"comment_{category}", height=70)
+            category_comments[category] = comment
+
+    overall_input = st.text_area("Overall context/constraints (budget, compliance, culture):", height=100, key="overall_input")
+    if bulk_scoring:
+        st.form_submit_button("Apply scores", type="primary",
+                              help="Slider and comment changes take effect (and peer ranks update) when applied.")
+        st.caption("Apply your score changes before generating — edits that have not been applied are not used.")
+# the nested dict shape the prompts, the store and the exports use
+all_scores = assessment.to_dict()
 
 # -------------------- Session-state init --------------------
 if "recommendation_data" not in st.session_state: st.session_state["recommendation_data"] = []
 if "category_fragments" not in st.session_state: st.session_state["category_fragments"] = []
 if "consolidated_json" not in st.session_state: st.session_state["consolidated_json"] = None
 if "raw_ai_outputs" not in st.session_state: st.session_state["raw_ai_outputs"] = {}
-
-# -------------------- Helpers: OpenAI and JSON parsing --------------------
-def call_openai(prompt, max_tokens=1400, temperature=0.6):
-    if client is None:
-        raise RuntimeError("OpenAI client is not configured. Add OPENAI_API_KEY.")
-    resp = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=temperature,
-        max_tokens=max_tokens
+if "pptx_deck" not in st.session_state: st.session_state["pptx_deck"] = None
+if "assessment_usage" not in st.session_state: st.session_state["assessment_usage"] = None
+if "assessment_id" not in st.session_state: st.session_state["assessment_id"] = None
+# input fingerprint of each generated card, and of the fragments the current roadmap was consolidated from
+if "category_fingerprints" not in st.session_state: st.session_state["category_fingerprints"] = {}
+if "consolidated_fingerprint" not in st.session_state: st.session_state["consolidated_fingerprint"] = None
+# timing spans for every stage run in this session (shown in the sidebar "Performance" panel)
+if "perf_tracer" not in st.session_state: st.session_state["perf_tracer"] = Tracer()
+tracer = st.session_state["perf_tracer"]
+
+# -------------------- Helpers: OpenAI client and response cache --------------------
+@st.cache_resource
+def get_response_cache():
+    # One cache per process, shared across reruns and sessions
+    path = os.getenv("MATURITY_CACHE_PATH", os.path.join(".cache", "ai_responses.sqlite3"))
+    max_mb = float(os.getenv("MATURITY_CACHE_MAX_MB", "50"))
+    ttl = os.getenv("MATURITY_CACHE_TTL_SECONDS")
+    return ResponseCache(path, max_bytes=int(max_mb * 1024 * 1024), ttl_seconds=float(ttl) if ttl else None)
+
+response_cache = get_response_cache()
+with st.sidebar.expander("AI response cache"):
+    cache_stats = response_cache.stats()
+    st.caption(f"Hits: {cache_stats['hits']} · Misses: {cache_stats['misses']} · "
+               f"Entries: {cache_stats['entries']} · {cache_stats['bytes'] / 1024:.0f} KB")
+    if st.button("Clear cache"):
+        response_cache.clear()
+
+@st.cache_resource
+def get_request_scheduler():
+    # One scheduler per process: every session draws on the same API key's rate limits
+    return RequestScheduler(
+        requests_per_minute=float(os.getenv("MATURITY_RPM", "500")),
+        tokens_per_minute=float(os.getenv("MATURITY_TPM", "200000")),
+        max_retries=int(os.getenv("MATURITY_MAX_RETRIES", "6")),
+        deadline_seconds=float(os.getenv("MATURITY_CALL_DEADLINE_SECONDS", "120"))
     )
-    return str(resp.choices[0].message.content)
 
-def try_load_json(text):
-    """
-    Robust JSON loader with several fallbacks.
-    Returns a Python object (usually dict) or raises ValueError.
-    """
-    if text is None:
-        raise ValueError("No text provided")
-    t = str(text).strip()
-
-    # If code fence present, extract inner content
-    fence = re.search(r"```(?:json)?\s*([\s\S]*?)\s*```", t, re.IGNORECASE)
-    if fence:
-        t = fence.group(1).strip()
-
-    # Direct try
-    try:
-        return json.loads(t)
-    except Exception:
-        pass
-
-    # Try replace single quotes with double quotes (common model output)
-    try:
-        return json.loads(t.replace("'", '"'))
-    except Exception:
-        pass
-
-    # Remove trailing commas before } or ]
-    try:
-        cleaned = re.sub(r",\s*([}\]])", r"\1", t)
-        return json.loads(cleaned)
-    except Exception:
-        pass
-
-    # Extract first {...} substring
-    start = t.find("{"); end = t.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        candidate = t[start:end+1]
-        try:
-            return json.loads(candidate)
-        except Exception:
-            # last-ditch: replace single quotes in candidate
-            try:
-                return json.loads(candidate.replace("'", '"'))
-            except Exception:
-                pass
-
-    raise ValueError("Could not parse JSON from the model output.")
-
-def normalize_baseball_card(parsed):
-    """
-    Ensure returned object has 'executive' and 'technical' keys.
-    Accept a few common variants. Returns normalized dict:
-    { "executive": {...}, "technical": {...} }
-    """
-    if parsed is None:
-        return {"executive": {}, "technical": {}}
-    if isinstance(parsed, str):
-        # cannot parse — return empty and keep raw elsewhere
-        return {"executive": {}, "technical": {}}
-    if isinstance(parsed, list):
-        # unexpected — place in executive.summary
-        return {"executive": {"summary": " ".join(map(str, parsed))}, "technical": {}}
-    if isinstance(parsed, dict):
-        keys_lower = {k.lower(): k for k in parsed.keys()}
-        # If already has exec/technical
-        if "executive" in parsed and "technical" in parsed:
-            return {
-                "executive": parsed.get("executive") or {},
-                "technical": parsed.get("technical") or {}
-            }
-        # Accept capitalized variants
-        if "Executive" in parsed or "Technical" in parsed:
-            return {
-                "executive": parsed.get("Executive") or parsed.get("executive") or {},
-                "technical": parsed.get("Technical") or parsed.get("technical") or {}
-            }
-        # Some outputs may return top-level fields for executive only
-        # Heuristic: if keys include summary/recommendation/activities -> treat as executive
-        exec_keys = {"summary", "recommendation", "activities", "project_activities", "focus_8w", "plan_3y", "assumptions", "team"}
-        lower_keys = {k.lower() for k in parsed.keys()}
-        if lower_keys & exec_keys:
-            # map fields to canonical names if necessary
-            exec_block = {}
-            tech_block = {}
-            for k, v in parsed.items():
-                kl = k.lower()
-                if kl in exec_keys:
-                    # unify 'project_activities' -> 'activities'
-                    if kl == "project_activities":
-                        exec_block.setdefault("activities", v)
-                    else:
-                        exec_block[kl] = v
-                else:
-                    # put other keys under exec by default
-                    exec_block[k] = v
-            return {"executive": exec_block, "technical": tech_block}
-        # If parsed contains exactly two top-level keys that look like cards (e.g., 'Exec' and 'Tech'), map them
-        if len(parsed.keys()) <= 4:
-            # attempt mapping by inspection
-            exec_block = parsed.get("executive") or parsed.get("Executive") or {}
-            tech_block = parsed.get("technical") or parsed.get("Technical") or {}
-            return {"executive": exec_block, "technical": tech_block}
-        # fallback: put entire parsed content into executive.summary as string
-        return {"executive": {"summary": json.dumps(parsed)[:1000]}, "technical": {}}
-    # else fallback
-    return {"executive": {}, "technical": {}}
-
-def get_field(case_insensitive_dict, *candidates):
-    """
-    Helper: given a dict, return first existing field among candidates (case-insensitive).
-    """
-    if not isinstance(case_insensitive_dict, dict):
-        return None
-    for cand in candidates:
-        for k in case_insensitive_dict.keys():
-            if k.lower() == cand.lower():
-                return case_insensitive_dict[k]
-    return None
-
-# -------------------- Diagram drawing --------------------
-def draw_8week_roadmap_figure(focus_dict):
-    fig, ax = plt.subplots(figsize=(12, 3))
-    ax.set_xlim(0, 4)
-    ax.set_ylim(0, 1)
-    ax.axis("off")
-    for i, sprint in enumerate(["sprint1", "sprint2", "sprint3", "sprint4"]):
-        x = i
-        items = focus_dict.get(sprint, [])
-        if isinstance(items, str):
-            items = [items]
-        lines = [f"• {it}" for it in items] if items else ["(no items)"]
-        text = f"Sprint {i+1}\n" + "\n".join(lines)
-        ax.add_patch(
-            patches.FancyBboxPatch((x + 0.05, 0.05), 0.9, 0.9, boxstyle="round,pad=0.02", facecolor="#e3f2fd", edgecolor="#1976d2")
-        )
-        ax.text(x + 0.08, 0.5, text, ha="left", va="center", fontsize=8, wrap=True)
-    plt.tight_layout()
-    return fig
-
-def draw_3year_roadmap_figure(plan_dict):
-    fig, ax = plt.subplots(figsize=(12, 3))
-    ax.set_xlim(0, 3)
-    ax.set_ylim(0, 1)
-    ax.axis("off")
-    for i, year in enumerate(["year1", "year2", "year3"]):
-        x = i
-        items = plan_dict.get(year, [])
-        if isinstance(items, str):
-            items = [items]
-        lines = [f"• {it}" for it in items] if items else ["(no items)"]
-        text = f"Year {i+1}\n" + "\n".join(lines)
-        ax.add_patch(
-            patches.FancyBboxPatch((x + 0.05, 0.05), 0.9, 0.9, boxstyle="round,pad=0.02", facecolor="#e8f5e9", edgecolor="#2e7d32")
-        )
-        ax.text(x + 0.08, 0.5, text, ha="left", va="center", fontsize=8, wrap=True)
-    plt.tight_layout()
-    return fig
-
-# -------------------- PPTX helpers --------------------
-def add_wrapped_paragraph(frame, text, font_size=11, bold=False, level=0):
-    p = frame.add_paragraph()
-    p.text = text
-    p.font.size = Pt(font_size)
-    p.font.bold = bold
-    p.level = level
-    p.word_wrap = True
-    return p
-
-def export_to_pptx(consolidated, fig1, fig2, rec_data):
-    prs = Presentation()
-    # Title slide
-    slide = prs.slides.add_slide(prs.slide_layouts[0])
-    slide.shapes.title.text = "Consolidated Roadmap & Baseball Cards"
-
-    # Roadmap slides
-    for title, fig in [("8-Week Roadmap", fig1), ("3-Year Roadmap", fig2)]:
-        slide = prs.slides.add_slide(prs.slide_layouts[5])
-        slide.shapes.title.text = title
-        img = BytesIO()
-        fig.savefig(img, format="png", bbox_inches="tight")
-        img.seek(0)
-        slide.shapes.add_picture(img, Inches(0.5), Inches(1.5), width=Inches(8))
-
-    # Per-category baseball card slides
-    for item in rec_data:
-        cat = item["category"]
-        data = item["data_normalized"]  # normalized form we saved
-        slide = prs.slides.add_slide(prs.slide_layouts[5])
-        slide.shapes.title.text = f"{cat} Baseball Cards"
-
-        # Left column: Executive
-        tf = slide.shapes.add_textbox(Inches(0.3), Inches(1.3), Inches(4.2), Inches(5)).text_frame
-        tf.clear()
-        add_wrapped_paragraph(tf, "EXECUTIVE Baseball Card", 14, True)
-        exec_block = data.get("executive", {}) or {}
-        # summary + recommendation
-        summary = get_field(exec_block, "summary")
-        rec = get_field(exec_block, "recommendation")
-        if summary: add_wrapped_paragraph(tf, f"Summary: {summary}", 11)
-        if rec: add_wrapped_paragraph(tf, f"Recommendation: {rec}", 11)
-        activities = get_field(exec_block, "activities", "project_activities")
-        if activities and isinstance(activities, list):
-            add_wrapped_paragraph(tf, "Project Activities:", 11, True)
-            for a in activities:
-                add_wrapped_paragraph(tf, f"• {a}", 10, False, 1)
-        assumptions = get_field(exec_block, "assumptions")
-        if assumptions and isinstance(assumptions, list):
-            add_wrapped_paragraph(tf, "Assumptions:", 11, True)
-            for a in assumptions:
-                add_wrapped_paragraph(tf, f"• {a}", 10, False, 1)
-
-        # Right column: Technical
-        tf2 = slide.shapes.add_textbox(Inches(4.8), Inches(1.3), Inches(4.2), Inches(5)).text_frame
-        tf2.clear()
-        add_wrapped_paragraph(tf2, "TECHNICAL Baseball Card", 14, True)
-        tech_block = data.get("technical", {}) or {}
-        summary_t = get_field(tech_block, "summary")
-        rec_t = get_field(tech_block, "recommendation")
-        if summary_t: add_wrapped_paragraph(tf2, f"Summary: {summary_t}", 11)
-        if rec_t: add_wrapped_paragraph(tf2, f"Recommendation: {rec_t}", 11)
-        t_activities = get_field(tech_block, "activities", "project_activities")
-        if t_activities and isinstance(t_activities, list):
-            add_wrapped_paragraph(tf2, "Project Activities:", 11, True)
-            for a in t_activities:
-                add_wrapped_paragraph(tf2, f"• {a}", 10, False, 1)
-        assumptions_t = get_field(tech_block, "assumptions")
-        if assumptions_t and isinstance(assumptions_t, list):
-            add_wrapped_paragraph(tf2, "Assumptions:", 11, True)
-            for a in assumptions_t:
-                add_wrapped_paragraph(tf2, f"• {a}", 10, False, 1)
-        # team
-        team = get_field(tech_block, "team")
-        if team and isinstance(team, list):
-            add_wrapped_paragraph(tf2, "Initial Team (3-6 months):", 11, True)
-            for t in team:
-                add_wrapped_paragraph(tf2, f"• {t}", 10, False, 1)
-
-    # final summary slide (top 3 priorities)
-    slide = prs.slides.add_slide(prs.slide_layouts[5])
-    slide.shapes.title.text = "Executive Summary — Top Priorities"
-    tf3 = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(8.5), Inches(5)).text_frame
-    tf3.clear()
-    add_wrapped_paragraph(tf3, "Top 3 Priorities (by impact)", 18, True)
-
-    # derive priorities from consolidated (if present)
-    items = []
-    if consolidated:
-        for s in ["sprint1", "sprint2", "sprint3", "sprint4"]:
-            items.extend(consolidated.get("focus_8w", {}).get(s, []))
-        for y in ["year1", "year2", "year3"]:
-            items.extend(consolidated.get("plan_3y", {}).get(y, []))
-    top3 = items[:3]
-    for t in top3:
-        add_wrapped_paragraph(tf3, f"• {t}", 14)
-
-    out = BytesIO()
-    prs.save(out)
-    out.seek(0)
-    return out
+request_scheduler = get_request_scheduler()
+with st.sidebar.expander("AI rate limits"):
+    scheduler_stats = request_scheduler.stats()
+    st.caption(f"Calls: {scheduler_stats['calls']} · Retries: {scheduler_stats['retries']} · "
+               f"Throttled: {scheduler_stats['throttled_seconds']:.1f}s")
+
+@st.cache_resource
+def get_model_router():
+    # Per-stage models for each tier; routing decisions and per-model latency are logged process-wide
+    return ModelRouter(build_routes(draft_model=os.getenv("MATURITY_DRAFT_MODEL", "gpt-4o-mini"),
+                                    final_model=os.getenv("MATURITY_FINAL_MODEL", "gpt-4o")))
+
+model_router = get_model_router()
+llm = CompletionClient(cache=response_cache, use_cache=use_response_cache,
+                       structured_mode=STRUCTURED_MODES.get(structured_output),
+                       client_factory=lambda: get_openai_client(api_key),
+                       scheduler=request_scheduler, router=model_router, tier=model_tier)
+
+# -------------------- Diagram rendering --------------------
+# The page shows SVG diagrams; these PNGs are only rasterized for the PowerPoint deck.
+# Cached on the JSON content of the roadmap, so reruns with an unchanged roadmap skip matplotlib entirely;
+# render_roadmap_pngs holds the pyplot lock, since sessions export from different threads
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_roadmap_png_pair(roadmap_json):
+    return render_roadmap_pngs(json.loads(roadmap_json))
 
 # -------------------- Generate AI-powered assessment --------------------
-# Build a strong prompt template that enforces required JSON schema
-generation_schema = """
-You are an experienced CTO advisor. Return ONLY valid JSON that exactly follows this structure (no explanatory text, no markdown fences):
-
-{
-  "executive": {
-    "summary": "2-3 sentence summary",
-    "recommendation": "2+ sentence justification",
-    "activities": ["Activity 1", "Activity 2", "..."],
-    "focus_8w": ["Sprint1 item", "Sprint2 item", "..."],
-    "plan_3y": ["Year1 item", "Year2 item", "..."],
-    "assumptions": ["Assumption 1", "..."]
-  },
-  "technical": {
-    "summary": "2-3 sentence summary",
-    "recommendation": "2+ sentence technical justification",
-    "activities": ["Tactic 1", "Tactic 2", "..."],
-    "focus_8w": ["Sprint-level technical task", "..."],
-    "plan_3y": ["Year1 technical plan", "..."],
-    "assumptions": ["Assumption A", "..."],
-    "team": ["Role: count", "..."]
-  }
+profile = {
+    "client": client_name.strip() or "Unnamed client",
+    "industry": industry,
+    "company_size": company_size,
+    "it_size": it_size,
+    "uses_cloud": uses_cloud,
+    "cloud_platform": cloud_platform,
+    "priority_projects": priority_projects,
+    "overall_input": overall_input,
+    "seed_scenario": seed_scenario_text,
+    "scores": all_scores,
+    "comments": category_comments,
+    "inclusion": category_inclusion
 }
 
-Make sure:
-- All keys are double quoted.
-- All lists are JSON arrays.
-- Keep entries concise.
-- Use the inputs below for context.
-"""
+# -------------------- Saved assessments --------------------
+def load_saved_assessment(assessment_id):
+    # Runs as a button callback (before the rerun), so the input widgets can be set to the stored profile
+    saved = assessment_store.load(assessment_id)
+    if saved is None:
+        return
+    p = saved["profile"]
+    st.session_state["client_name"] = saved["client"]
+    if p.get("industry") in industries:
+        st.session_state["industry"] = p["industry"]
+    for key in ["company_size", "it_size", "priority_projects", "overall_input"]:
+        st.session_state[key] = p.get(key, "")
+    st.session_state["uses_cloud"] = p.get("uses_cloud", "Yes")
+    if p.get("cloud_platform"):
+        st.session_state["cloud_platform"] = p["cloud_platform"]
+    st.session_state["use_seed_scenario"] = bool(p.get("seed_scenario"))
+    for category, sub_caps in categories_structure.items():
+        stored = p["scores"].get(category, {}).get("sub_capabilities", {})
+        for sub_cap in sub_caps:
+            st.session_state[f"{category}_{sub_cap}"] = int(stored.get(sub_cap, 3))
+        st.session_state[f"include_{category}"] = bool(p["inclusion"].get(category, True))
+        st.session_state[f"comment_{category}"] = p["comments"].get(category, "")
+    st.session_state["recommendation_data"] = saved["recommendation_data"]
+    st.session_state["category_fragments"] = saved["category_fragments"]
+    st.session_state["consolidated_json"] = saved["consolidated_json"]
+    st.session_state["raw_ai_outputs"] = saved["raw_ai_outputs"]
+    # fingerprints carry the tier each card was saved with, so Draft cards (or rows saved before
+    # tiers were recorded) stay flagged as not Final and are regenerated for another tier
+    st.session_state["category_fingerprints"] = {
+        item["category"]: category_fingerprint(p, item["category"], saved["card_tiers"].get(item["category"]))
+        for item in saved["recommendation_data"]}
+    st.session_state["consolidated_fingerprint"] = (fragments_fingerprint(saved["category_fragments"], saved["tier"])
+                                                    if saved["consolidated_json"] is not None else None)
+    st.session_state["pptx_deck"] = None
+    st.session_state["assessment_usage"] = None
+    st.session_state["assessment_id"] = assessment_id
+
+with st.sidebar.expander("Saved assessments"):
+    saved_industry = st.selectbox("Industry filter", ["All"] + industries, key="saved_industry")
+    saved_client = st.text_input("Client starts with", key="saved_client")
+    saved_category = st.selectbox("Has a card for", ["Any"] + list(categories_structure), key="saved_category")
+    matches = assessment_store.search(industry=None if saved_industry == "All" else saved_industry,
+                                      client=saved_client.strip() or None,
+                                      category=None if saved_category == "Any" else saved_category)
+    if not matches:
+        st.caption("No saved assessments match.")
+    else:
+        labels = {m["id"]: f"#{m['id']} · {m['client']} · {m['industry']} · "
+                           f"{datetime.fromtimestamp(m['created']):%Y-%m-%d %H:%M}{' · roadmap' if m['has_roadmap'] else ''}"
+                  for m in matches}
+        chosen = st.selectbox("Assessment", list(labels), format_func=labels.get, key="saved_choice")
+        st.button("Load assessment", on_click=load_saved_assessment, args=(chosen,),
+                  help="Restores the inputs, cards and roadmap without calling the model.")
+
+# -------------------- Peer benchmark --------------------
+with st.expander(f"Peer benchmark — {industry}"):
+    benchmark_rows, peer_count = portfolio.benchmark(assessment, industry) if portfolio is not None else ([], 0)
+    if not peer_count:
+        st.caption(f"No stored {industry} assessments to compare with yet.")
+    else:
+        st.caption(f"Current scores against {peer_count} stored {industry} assessment(s).")
+        st.table([{"Category": r["category"], "Average": f"{r['average']:.1f}",
+                   "Peer median": f"{r['peer_median']:.1f}", "Peer IQR": f"{r['peer_p25']:.1f}–{r['peer_p75']:.1f}",
+                   "Percentile": f"{r['percentile']:.0f}", "Gap to 5": f"{r['gap_to_target']:.1f}",
+                   "Class": r["class"].capitalize()} for r in benchmark_rows])
+
+# -------------------- Background prefetch --------------------
+prefetcher = None
+if prefetch_cards:
+    if "card_prefetcher" not in st.session_state: st.session_state["card_prefetcher"] = CardPrefetcher()
+    prefetcher = st.session_state["card_prefetcher"]
+    # when each selected category's inputs last changed; only categories edited in this session are prefetched
+    now = time.time()
+    previous_inputs = st.session_state.get("prefetch_inputs", {})
+    prefetch_inputs = {}
+    for category in categories_to_process(profile):
+        fingerprint = category_fingerprint(profile, category, model_tier)
+        seen = previous_inputs.get(category)
+        if seen is not None and seen["fingerprint"] == fingerprint:
+            prefetch_inputs[category] = seen
+        else:
+            prefetch_inputs[category] = {"fingerprint": fingerprint, "since": now,
+                                         "edited": seen is not None or bool(previous_inputs)}
+    st.session_state["prefetch_inputs"] = prefetch_inputs
+    st.session_state["prefetch_profile"] = profile
+    # anything prefetched for inputs that have changed since is no longer useful
+    prefetcher.invalidate({c: v["fingerprint"] for c, v in prefetch_inputs.items()})
+elif "card_prefetcher" in st.session_state:
+    st.session_state["card_prefetcher"].cancel_all()
+    st.session_state.pop("prefetch_inputs", None)
+
+@st.fragment(run_every=1.0)
+def prefetch_tick():
+    # Reruns on its own every second: starts prefetches for categories whose inputs have settled
+    now = time.time()
+    for category, seen in st.session_state["prefetch_inputs"].items():
+        if (seen["edited"] and now - seen["since"] >= prefetch_delay
+                and seen["fingerprint"] != st.session_state["category_fingerprints"].get(category)):
+            prefetcher.prefetch(llm, category, seen["fingerprint"],
+                                build_category_prompt(st.session_state["prefetch_profile"], category))
+    status, stats = prefetcher.status(), prefetcher.stats()
+    st.caption(f"Started: {stats['started']} · Used: {stats['used']} · Cancelled: {stats['cancelled']} · "
+               f"Wasted: {stats['wasted']} ({format_usage(stats['wasted_usage'])})")
+    if status:
+        st.caption(" · ".join(f"{category}: {state}" for category, state in status.items()))
+    if st.button("Cancel prefetches", disabled=not status):
+        prefetcher.cancel_all()
+
+if prefetcher is not None:
+    with st.sidebar.expander("Background prefetch"):
+        prefetch_tick()
+
+# -------------------- Streaming previews --------------------
+def card_preview_markdown(category, partial):
+    """
+    Markdown preview of a card that is still streaming (partial = parse_partial_json output).
+    """
+    card = BaseballCard.from_normalized(normalize_baseball_card(partial) if isinstance(partial, dict) else None)
+    lines = [f"#### {category}"]
+    for title, block_name, fields in [
+        ("EXECUTIVE Baseball Card", "executive",
+         [("Summary", "summary"), ("Recommendation", "recommendation"), ("Project Activities", "activities"),
+          ("8-Week Focus", "focus_8w"), ("3-Year Plan", "plan_3y"), ("Assumptions", "assumptions")]),
+        ("TECHNICAL Baseball Card", "technical",
+         [("Summary", "summary"), ("Recommendation", "recommendation"), ("Project Activities", "activities"),
+          ("8-Week Tactical Plan", "focus_8w"), ("3-Year Technical Roadmap", "plan_3y"),
+          ("Assumptions", "assumptions"), ("Initial Team (3–6 months)", "team")]),
+    ]:
+        block = getattr(card, block_name)
+        if block is None:
+            continue
+        lines.append(f"**{title}**")
+        for label, name in fields:
+            value = getattr(block, name)
+            if isinstance(value, list) and value:
+                lines.append(f"- **{label}:**")
+                lines.extend(f"  • {v}" for v in value)
+            elif value:
+                lines.append(f"- **{label}:** {value}")
+    if len(lines) == 1:
+        lines.append("_Waiting for the model..._")
+    return "\n".join(lines)
 
 if st.button("Generate AI-Powered Strategic Assessment"):
-    if client is None:
+    if not api_key:
         st.error("OpenAI not configured. Add OPENAI_API_KEY.")
     else:
-        # reset storage for fresh run
-        st.session_state["recommendation_data"] = []
-        st.session_state["category_fragments"] = []
-        st.session_state["raw_ai_outputs"] = {}
-        st.session_state["consolidated_json"] = None
+        # token/cost/latency accounting for this assessment (generation + consolidation)
+        st.session_state["assessment_usage"] = UsageMeter()
+        assessment_llm = llm.metered(st.session_state["assessment_usage"])
 
         # select categories: include check OR comment present -> included
-        categories_to_process = [
-            c for c in categories_structure.keys()
-            if category_inclusion.get(c) or (category_comments.get(c, "").strip() != "")
-        ]
-        if not categories_to_process:
+        selected = categories_to_process(profile)
+        # only categories whose inputs changed since their card was generated go back to the model
+        dirty, fingerprints = dirty_categories(profile, selected,
+                                               {} if regenerate_all else st.session_state["category_fingerprints"],
+                                               model_tier)
+        previous_cards = st.session_state["recommendation_data"]
+        fresh_cards, fresh_fragments = [], []
+        if not selected:
             st.info("No categories selected — check 'Include' for categories to evaluate or add a comment to include it.")
+        elif not dirty:
+            st.info("No category inputs changed since the last generation — keeping the existing cards.")
         else:
-            with st.spinner("Calling AI for selected categories..."):
-                for category in categories_to_process:
-                    include_flag = category_inclusion.get(category, False)
-                    comment_text = category_comments.get(category, "").strip()
-                    scores = all_scores.get(category, {})
-                    avg = scores.get("average")
-                    # Build a detailed prompt for the model — uses schema defined above
-                    prompt = generation_schema + f"""
-
-Context:
-Industry: {industry}
-Company size: {company_size}
-IT department size: {it_size}
-Uses cloud: {uses_cloud} {cloud_platform}
-Priority projects: {priority_projects if priority_projects else 'None'}
-Category: {category}
-Included flag: {'Yes' if include_flag else 'No'}
-Category maturity average (if included): {avg if include_flag else 'N/A'}
-Sub-capability scores: {json.dumps(scores.get('sub_capabilities', {}))}
-Category comments: {comment_text if comment_text else 'None'}
-Overall context: {overall_input if overall_input else 'None'}
-Seed scenario: {seed_scenario_text if seed_scenario_text else 'None'}
-
-Return the JSON only, exactly matching the schema at the top.
-"""
-                    try:
-                        raw = call_openai(prompt, max_tokens=1000, temperature=0.4)
-                        st.session_state["raw_ai_outputs"][category] = raw
-                        # parse robustly
-                        parsed = try_load_json(raw)
-                        normalized = normalize_baseball_card(parsed)
-                        # store both raw, parsed and normalized for debugging & export
-                        st.session_state["recommendation_data"].append({
-                            "category": category,
-                            "raw": raw,
-                            "parsed": parsed,
-                            "data_normalized": normalized,
-                            "show_avg": include_flag,
-                            "avg": avg if include_flag else None
-                        })
-                        # For consolidation, use executive.focus_8w and plan_3y if present (normalize to list)
-                        exec_focus = get_field(normalized["executive"], "focus_8w") or []
-                        exec_plan3 = get_field(normalized["executive"], "plan_3y") or []
-                        if isinstance(exec_focus, str): exec_focus = [exec_focus]
-                        if isinstance(exec_plan3, str): exec_plan3 = [exec_plan3]
-                        st.session_state["category_fragments"].append({
-                            "category": category,
-                            "focus_8w": exec_focus,
-                            "plan_3y": exec_plan3
-                        })
-                    except Exception as e:
-                        st.error(f"Failed to generate/parse JSON for '{category}': {e}")
-                        # save raw text for debugging if available
-                        st.session_state["raw_ai_outputs"][category] = raw if 'raw' in locals() else "<no raw captured>"
+            if len(dirty) < len(selected):
+                st.caption(f"Regenerating {len(dirty)} of {len(selected)} categories with changed inputs: {', '.join(dirty)}.")
+            # cards prefetched in the background for exactly these inputs (waits for any still running)
+            prefetched = {}
+            if prefetcher is not None:
+                with st.spinner("Collecting prefetched cards..."):
+                    for category in dirty:
+                        result = prefetcher.claim(category, fingerprints[category], st.session_state["assessment_usage"])
+                        if result is not None:
+                            prefetched[category] = result
+                if prefetched:
+                    st.caption(f"{len(prefetched)} card(s) were prefetched while scoring: {', '.join(prefetched)}.")
+            pending = [category for category in dirty if category not in prefetched]
+            generated = []
+            on_update = None
+            if stream_cards:
+                previews = {category: st.empty() for category in pending}
+                on_update = lambda category, card: previews[category].markdown(card_preview_markdown(category, card))
+            with tracer.span("generate", mode=generation_mode, tier=model_tier, categories=len(pending),
+                             prefetched=len(prefetched), reused=len(selected) - len(dirty), streamed=stream_cards):
+                if pending and generation_mode.startswith("Batched"):
+                    prompt = build_batched_prompt(profile, pending)
+                    with st.spinner("Calling AI for all changed categories in one request..."):
+                        batched_raw, generated = run_batched_generation(assessment_llm, pending, prompt, on_update, tracer)
+                    st.session_state["raw_ai_outputs"]["batched"] = batched_raw if batched_raw is not None else "<no raw captured>"
+                    batched_tokens = estimate_tokens(prompt)
+                    per_category_tokens = sum(estimate_tokens(build_category_prompt(profile, c)) for c in pending)
+                    st.caption(f"Batched prompt ≈ {batched_tokens:,} input tokens vs ≈ {per_category_tokens:,} for "
+                               f"{len(pending)} per-category prompts "
+                               f"({1 - batched_tokens / per_category_tokens:.0%} saved).")
+                elif pending:
+                    prompts = [(category, build_category_prompt(profile, category)) for category in pending]
+                    with st.spinner("Calling AI for changed categories..."):
+                        generated = run_category_generation(assessment_llm, prompts, max_in_flight, on_update, tracer)
+                if stream_cards:
+                    # the finished cards are rendered in full below
+                    for preview in previews.values():
+                        preview.empty()
+                by_category = {result["category"]: result for result in generated}
+                by_category.update(prefetched)
+                results = [by_category[category] for category in dirty]
+                # results are in the original category order; errors stay isolated per category
+                fresh_cards, fresh_fragments, raw_outputs, errors = collect_results(profile, results)
+            for category, error in errors:
+                st.error(f"Failed to generate/parse JSON for '{category}': {error}")
+            failed = {category for category, _ in errors}
+            st.session_state["category_fingerprints"] = {c: fingerprints[c] for c in selected if c not in failed}
+            st.session_state["raw_ai_outputs"].update(raw_outputs)
+        if selected:
+            # unchanged cards are carried over, deselected categories dropped
+            st.session_state["recommendation_data"] = merge_results(selected, previous_cards, fresh_cards, dirty)
+            st.session_state["category_fragments"] = merge_results(selected, st.session_state["category_fragments"],
+                                                                   fresh_fragments, dirty)
+            # the roadmap stays valid until a fragment (or the model tier) changes
+            fragments_key = fragments_fingerprint(st.session_state["category_fragments"], model_tier)
+            if fragments_key != st.session_state["consolidated_fingerprint"]:
+                st.session_state["consolidated_json"] = None
+                st.session_state["consolidated_fingerprint"] = None
+            changed = dirty or [i["category"] for i in st.session_state["recommendation_data"]] != \
+                [i["category"] for i in previous_cards]
+            if changed:
+                # carried-over cards keep the tier they were generated with
+                card_tiers = {c: t for c, fp in st.session_state["category_fingerprints"].items() for t in TIERS
+                              if fp == category_fingerprint(profile, c, t)}
+                st.session_state["assessment_id"] = assessment_store.save(
+                    profile, st.session_state["recommendation_data"], st.session_state["category_fragments"],
+                    st.session_state["consolidated_json"], st.session_state["raw_ai_outputs"],
+                    st.session_state["assessment_usage"].summary(), mode=generation_mode, card_tiers=card_tiers
+                ) if st.session_state["recommendation_data"] else None
 
 # -------------------- Display pretty Baseball Cards --------------------
 if st.session_state.get("recommendation_data"):
@@ -480,39 +494,34 @@ if st.session_state.get("recommendation_data"):
     st.markdown("## AI-generated Baseball Cards (Executive & Technical)")
     for item in st.session_state["recommendation_data"]:
         cat = item["category"]
-        normalized = item.get("data_normalized", {})
+        card = item_card(item)
         raw_text = item.get("raw", "")
         st.subheader(cat)
         # Show maturity level when included
         if item.get("show_avg") and item.get("avg") is not None:
             level_label = levels.get(int(round(item["avg"])), "")
             st.caption(f"Reported maturity average: {item['avg']} — {level_label}")
+        if item.get("json_repairs"):
+            st.caption(f"JSON repairs applied to model output: {', '.join(item['json_repairs'])}")
 
         # EXECUTIVE card
         st.markdown("**EXECUTIVE Baseball Card**")
-        exec_block = normalized.get("executive", {}) or {}
+        exec_block = card.executive
         if exec_block:
-            summary = get_field(exec_block, "summary")
-            recommendation = get_field(exec_block, "recommendation")
-            activities = get_field(exec_block, "activities", "project_activities")
-            focus8 = get_field(exec_block, "focus_8w")
-            plan3 = get_field(exec_block, "plan_3y")
-            assumptions = get_field(exec_block, "assumptions")
-
-            if summary: st.markdown(f"- **Summary:** {summary}")
-            if recommendation: st.markdown(f"- **Recommendation:** {recommendation}")
-            if activities and isinstance(activities, list):
+            if exec_block.summary: st.markdown(f"- **Summary:** {exec_block.summary}")
+            if exec_block.recommendation: st.markdown(f"- **Recommendation:** {exec_block.recommendation}")
+            if exec_block.activities:
                 st.markdown("- **Project Activities:**")
-                for a in activities: st.markdown(f"  • {a}")
-            if focus8 and isinstance(focus8, list):
+                for a in exec_block.activities: st.markdown(f"  • {a}")
+            if exec_block.focus_8w:
                 st.markdown("- **8-Week Focus:**")
-                for f in focus8: st.markdown(f"  • {f}")
-            if plan3 and isinstance(plan3, list):
+                for f in exec_block.focus_8w: st.markdown(f"  • {f}")
+            if exec_block.plan_3y:
                 st.markdown("- **3-Year Plan:**")
-                for p in plan3: st.markdown(f"  • {p}")
-            if assumptions and isinstance(assumptions, list):
+                for p in exec_block.plan_3y: st.markdown(f"  • {p}")
+            if exec_block.assumptions:
                 st.markdown("- **Assumptions:**")
-                for a in assumptions: st.markdown(f"  • {a}")
+                for a in exec_block.assumptions: st.markdown(f"  • {a}")
         else:
             st.info("No Executive card generated.")
             with st.expander(f"Raw AI output for '{cat}' (executive missing)"):
@@ -521,33 +530,25 @@ if st.session_state.get("recommendation_data"):
         st.markdown("---")
         # TECHNICAL card
         st.markdown("**TECHNICAL Baseball Card**")
-        tech_block = normalized.get("technical", {}) or {}
+        tech_block = card.technical
         if tech_block:
-            summary = get_field(tech_block, "summary")
-            recommendation = get_field(tech_block, "recommendation")
-            activities = get_field(tech_block, "activities", "project_activities")
-            focus8 = get_field(tech_block, "focus_8w")
-            plan3 = get_field(tech_block, "plan_3y")
-            assumptions = get_field(tech_block, "assumptions")
-            team = get_field(tech_block, "team")
-
-            if summary: st.markdown(f"- **Summary:** {summary}")
-            if recommendation: st.markdown(f"- **Recommendation:** {recommendation}")
-            if activities and isinstance(activities, list):
+            if tech_block.summary: st.markdown(f"- **Summary:** {tech_block.summary}")
+            if tech_block.recommendation: st.markdown(f"- **Recommendation:** {tech_block.recommendation}")
+            if tech_block.activities:
                 st.markdown("- **Project Activities:**")
-                for a in activities: st.markdown(f"  • {a}")
-            if focus8 and isinstance(focus8, list):
+                for a in tech_block.activities: st.markdown(f"  • {a}")
+            if tech_block.focus_8w:
                 st.markdown("- **8-Week Tactical Plan:**")
-                for f in focus8: st.markdown(f"  • {f}")
-            if plan3 and isinstance(plan3, list):
+                for f in tech_block.focus_8w: st.markdown(f"  • {f}")
+            if tech_block.plan_3y:
                 st.markdown("- **3-Year Technical Roadmap:**")
-                for p in plan3: st.markdown(f"  • {p}")
-            if assumptions and isinstance(assumptions, list):
+                for p in tech_block.plan_3y: st.markdown(f"  • {p}")
+            if tech_block.assumptions:
                 st.markdown("- **Assumptions:**")
-                for a in assumptions: st.markdown(f"  • {a}")
-            if team and isinstance(team, list):
+                for a in tech_block.assumptions: st.markdown(f"  • {a}")
+            if tech_block.team:
                 st.markdown("- **Initial Team (3–6 months):**")
-                for t in team: st.markdown(f"  • {t}")
+                for t in tech_block.team: st.markdown(f"  • {t}")
         else:
             st.info("No Technical card generated.")
             with st.expander(f"Raw AI output for '{cat}' (technical missing)"):
@@ -560,61 +561,43 @@ if not st.session_state.get("category_fragments"):
     st.info("No roadmap fragments yet — generate AI recommendations first for at least one category (Include it or add a comment).")
 
 if st.session_state.get("category_fragments"):
-    if st.button("Show Consolidated Roadmap"):
-        # build consolidation prompt
-        fragments = st.session_state["category_fragments"]
-        prompt = f"""
-You are a CTO. Consolidate these category-level fragments into ONE JSON roadmap. Return ONLY JSON matching this structure:
-
-{{
-  "focus_8w": {{
-    "sprint1": ["..."],
-    "sprint2": ["..."],
-    "sprint3": ["..."],
-    "sprint4": ["..."]
-  }},
-  "plan_3y": {{
-    "year1": ["..."],
-    "year2": ["..."],
-    "year3": ["..."]
-  }}
-}}
-
-Category fragments:
-{json.dumps(fragments, indent=2)}
-
-Distribute initiatives sensibly across sprints and years. Return JSON only.
-"""
-        try:
-            raw = call_openai(prompt, max_tokens=800, temperature=0.4)
-            st.session_state["raw_ai_outputs"]["consolidate"] = raw
-            consolidated = try_load_json(raw)
-            # normalize structure
-            consolidated.setdefault("focus_8w", {})
-            consolidated.setdefault("plan_3y", {})
-            for s in ["sprint1", "sprint2", "sprint3", "sprint4"]:
-                if s not in consolidated["focus_8w"] or not isinstance(consolidated["focus_8w"][s], list):
-                    consolidated["focus_8w"][s] = []
-            for y in ["year1", "year2", "year3"]:
-                if y not in consolidated["plan_3y"] or not isinstance(consolidated["plan_3y"][y], list):
-                    consolidated["plan_3y"][y] = []
-            st.session_state["consolidated_json"] = consolidated
-        except Exception as e:
-            st.error(f"Failed to consolidate roadmap: {e}")
+    current_fragments = fragments_fingerprint(st.session_state["category_fragments"], model_tier)
+    if st.session_state.get("consolidated_json") and current_fragments == st.session_state["consolidated_fingerprint"]:
+        st.caption("The roadmap below is up to date with the current category fragments.")
+    elif st.button("Show Consolidated Roadmap"):
+        if st.session_state["assessment_usage"] is None:
+            st.session_state["assessment_usage"] = UsageMeter()
+        with tracer.span("consolidate", fragments=len(st.session_state["category_fragments"])):
+            outcome = consolidate_roadmap(llm.metered(st.session_state["assessment_usage"]),
+                                          st.session_state["category_fragments"], tracer)
+        st.session_state["raw_ai_outputs"]["consolidate"] = outcome["raw"] if outcome["raw"] is not None else "<no raw>"
+        if outcome["error"] is None:
+            st.session_state["consolidated_json"] = outcome["consolidated"]
+            st.session_state["consolidated_fingerprint"] = current_fragments
+            if st.session_state["assessment_id"] is not None:
+                assessment_store.update_consolidated(st.session_state["assessment_id"], outcome["consolidated"],
+                                                     st.session_state["raw_ai_outputs"],
+                                                     st.session_state["assessment_usage"].summary())
+        else:
+            st.error(f"Failed to consolidate roadmap: {outcome['error']}")
             with st.expander("Raw consolidation output"):
                 st.write(st.session_state["raw_ai_outputs"].get("consolidate", "<no raw>"))
 
+if st.session_state.get("assessment_usage") is not None:
+    st.caption(f"Model usage for this assessment: {format_usage(st.session_state['assessment_usage'].summary())}")
+
 # If consolidated exists in session_state, show diagrams and allow PPTX export (persist after download)
 if st.session_state.get("consolidated_json"):
     consolidated = st.session_state["consolidated_json"]
-    fig1 = draw_8week_roadmap_figure(consolidated.get("focus_8w", {}))
-    fig2 = draw_3year_roadmap_figure(consolidated.get("plan_3y", {}))
+    with tracer.span("render_roadmaps"):
+        svg_8w = roadmap_8week_svg(consolidated.get("focus_8w", {}))
+        svg_3y = roadmap_3year_svg(consolidated.get("plan_3y", {}))
 
     st.markdown("### 8-Week Roadmap Diagram")
-    st.pyplot(fig1)
+    st.image(svg_8w, width="stretch")
 
     st.markdown("### 3-Year Roadmap Diagram")
-    st.pyplot(fig2)
+    st.image(svg_3y, width="stretch")
 
     # pretty print consolidated text as well
     st.markdown("### Consolidated 8-Week Focus")
@@ -629,13 +612,65 @@ if st.session_state.get("consolidated_json"):
         for it in consolidated["plan_3y"].get(y, []):
             st.markdown(f"- {it}")
 
-    # PPTX export (cons + per-category normalized cards)
-    try:
-        pptx_bytes = export_to_pptx(consolidated, fig1, fig2, st.session_state["recommendation_data"])
-        st.download_button("📥 Download Roadmap and Baseball Cards (PowerPoint)", data=pptx_bytes,
+    # PPTX export (cons + per-category normalized cards), built only on request and
+    # reused until the roadmap or cards change
+    deck_key = deck_fingerprint(consolidated, st.session_state["recommendation_data"])
+    deck = st.session_state.get("pptx_deck")
+    draft_cards = [item["category"] for item in st.session_state["recommendation_data"]
+                   if st.session_state["category_fingerprints"].get(item["category"])
+                   != category_fingerprint(profile, item["category"], FINAL)]
+    if draft_cards:
+        st.warning(f"{len(draft_cards)} card(s) were not generated with the Final model tier for the current inputs "
+                   f"({', '.join(draft_cards)}). Switch Model tier to Final and generate again before sending the deck.")
+    if deck is None or deck["key"] != deck_key:
+        deck = None
+        # draft output is only exported on explicit confirmation
+        export_drafts = bool(draft_cards) and st.checkbox("Export the draft cards anyway", key="export_drafts")
+        if st.button("Prepare PowerPoint export", disabled=bool(draft_cards) and not export_drafts):
+            try:
+                with st.spinner("Building PowerPoint deck..."), tracer.span("export_pptx"):
+                    png_8w, png_3y = render_roadmap_png_pair(json.dumps(
+                        {k: consolidated.get(k, {}) for k in ("focus_8w", "plan_3y")}, sort_keys=True))
+                    pptx_bytes = export_to_pptx(consolidated, png_8w, png_3y, st.session_state["recommendation_data"])
+                deck = {"key": deck_key, "bytes": pptx_bytes.getvalue()}
+                st.session_state["pptx_deck"] = deck
+            except Exception as e:
+                st.error(f"PPTX export failed: {e}")
+    if deck is not None:
+        st.download_button("📥 Download Roadmap and Baseball Cards (PowerPoint)", data=deck["bytes"],
                            file_name="Consolidated_Roadmap_and_Cards.pptx",
                            mime="application/vnd.openxmlformats-officedocument.presentationml.presentation")
-    except Exception as e:
-        st.error(f"PPTX export failed: {e}")
 
 st.markdown("---")
+
+# -------------------- Model routing panel --------------------
+# Rendered last so it includes the calls routed during this run
+with st.sidebar.expander("Model routing"):
+    routes = model_router.routes[model_tier]
+    st.caption(" · ".join(f"{stage}: {model} (≤{cap} tokens)" for stage, (model, cap) in routes.items()))
+    model_stats = model_router.model_stats()
+    if not model_stats:
+        st.caption("No routed calls yet.")
+    else:
+        st.table([{"model": model, "calls": v["calls"], "cached": v["cached"], "p50 ms": round(v["p50_ms"]),
+                   "p95 ms": round(v["p95_ms"]), "mean ms": round(v["mean_ms"])}
+                  for model, v in sorted(model_stats.items())])
+        # most recent routing decisions first
+        st.dataframe([dict(d, time=datetime.fromtimestamp(d["time"]).strftime("%H:%M:%S"), seconds=round(d["seconds"], 2))
+                       for d in list(model_router.decisions)[-20:][::-1]], hide_index=True)
+
+# -------------------- Performance panel --------------------
+# Rendered last so it includes the spans recorded during this run
+with st.sidebar.expander("Performance"):
+    stage_stats = tracer.stage_stats()
+    if not stage_stats:
+        st.caption("No stages timed yet in this session.")
+    else:
+        st.table([{"stage": name, "runs": v["count"], "errors": v["errors"], "p50 ms": round(v["p50_ms"], 1),
+                   "p95 ms": round(v["p95_ms"], 1), "max ms": round(v["max_ms"], 1)}
+                  for name, v in sorted(stage_stats.items())])
+        st.download_button("Download spans (JSON)", data=json.dumps(tracer.records(), indent=2),
+                           file_name="maturity_spans.json", mime="application/json")
+        st.download_button("Download spans (OpenTelemetry)", data=json.dumps(tracer.to_otlp()),
+                           file_name="maturity_spans_otlp.json", mime="application/json")
+        st.button("Reset timings", on_click=tracer.clear)
@@ -0,0 +1,208 @@
+# assessment_store.py
+# Persistent SQLite store of finished assessments: profile, score vector, generated cards,
+# roadmap fragments, consolidated roadmap and raw model output, so a paid-for run survives a
+# browser refresh and can be reloaded without calling the model again.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client TEXT NOT NULL COLLATE NOCASE,
+    industry TEXT NOT NULL,
+    created REAL NOT NULL,
+    mode TEXT,
+    tier TEXT,
+    profile TEXT NOT NULL,
+    fragments TEXT NOT NULL,
+    consolidated TEXT,
+    raw_outputs TEXT NOT NULL,
+    usage TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_assessments_created ON assessments(created);
+CREATE INDEX IF NOT EXISTS idx_assessments_industry ON assessments(industry, created);
+CREATE INDEX IF NOT EXISTS idx_assessments_client ON assessments(client, created);
+
+CREATE TABLE IF NOT EXISTS scores (
+    assessment_id INTEGER NOT NULL REFERENCES assessments(id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    sub_capability TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (assessment_id, category, sub_capability)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_scores_category ON scores(category, sub_capability, score);
+
+CREATE TABLE IF NOT EXISTS cards (
+    assessment_id INTEGER NOT NULL REFERENCES assessments(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    average REAL,
+    included INTEGER NOT NULL,
+    tier TEXT,
+    item TEXT NOT NULL,
+    PRIMARY KEY (assessment_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cards_category ON cards(category, assessment_id);
+"""
+
+# columns added after the first release, with their types; added to older store files on open
+_ADDED_COLUMNS = {"assessments": {"tier": "TEXT"}, "cards": {"tier": "TEXT"}}
+
+
+MIN_SCORE, MAX_SCORE = 1, 5
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class AssessmentStore:
+    """
+    One row per assessment plus normalized score and card rows, indexed for filtering by
+    industry, client, category and time. Safe to share between threads (one connection, one lock).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        for table, columns in _ADDED_COLUMNS.items():
+            existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for column, kind in columns.items():
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+        self._conn.commit()
+
+    def save(self, profile, recommendation_data, category_fragments, consolidated_json=None, raw_ai_outputs=None,
+             usage=None, mode=None, tier=None, card_tiers=None):
+        """
+        Store one assessment (the same shapes the app keeps in session state). Returns its id.
+        Cards are stored as data_normalized only; the BaseballCard ("card") is rebuilt from it on use.
+        tier is the model tier the cards were generated with; card_tiers {category: tier} overrides
+        it per card when an incremental run mixed tiers. The assessment's tier is the one all its
+        cards share (None when they differ), so a mixed or unknown run never loads as Final.
+        Raises ValueError, storing nothing, if a score is outside MIN_SCORE..MAX_SCORE.
+        """
+        client = str(profile.get("client") or "Unnamed client")
+        scores = [(category, sub_cap, int(score)) for category, values in profile.get("scores", {}).items()
+                  for sub_cap, score in values.get("sub_capabilities", {}).items()]
+        invalid = [f"{category}/{sub_cap}={score}" for category, sub_cap, score in scores
+                   if not MIN_SCORE <= score <= MAX_SCORE]
+        if invalid:
+            raise ValueError(f"Scores must be {MIN_SCORE}-{MAX_SCORE}: {', '.join(invalid)}")
+        tiers = {item["category"]: (card_tiers or {}).get(item["category"], tier) for item in recommendation_data}
+        shared_tier = next(iter(tiers.values())) if len(set(tiers.values())) == 1 else None
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO assessments (client, industry, created, mode, tier, profile, fragments, consolidated,"
+                " raw_outputs, usage) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (client, str(profile.get("industry") or ""), time.time(), mode, shared_tier, _dumps(profile),
+                 _dumps(category_fragments), _dumps(consolidated_json) if consolidated_json is not None else None,
+                 _dumps(raw_ai_outputs or {}), _dumps(usage) if usage is not None else None))
+            assessment_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO scores (assessment_id, category, sub_capability, score) VALUES (?, ?, ?, ?)",
+                [(assessment_id, category, sub_cap, score) for category, sub_cap, score in scores])
+            self._conn.executemany(
+                "INSERT INTO cards (assessment_id, position, category, average, included, tier, item)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(assessment_id, i, item["category"], profile.get("scores", {}).get(item["category"], {}).get("average"),
+                  1 if item.get("show_avg") else 0, tiers[item["category"]],
+                  _dumps({k: v for k, v in item.items() if k != "card"}))
+                 for i, item in enumerate(recommendation_data)])
+        return assessment_id
+
+    def update_consolidated(self, assessment_id, consolidated_json, raw_ai_outputs=None, usage=None):
+        """Attach a roadmap consolidated after the cards were saved."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE assessments SET consolidated = ?, raw_outputs = COALESCE(?, raw_outputs),"
+                " usage = COALESCE(?, usage) WHERE id = ?",
+                (_dumps(consolidated_json) if consolidated_json is not None else None,
+                 _dumps(raw_ai_outputs) if raw_ai_outputs is not None else None,
+                 _dumps(usage) if usage is not None else None, assessment_id))
+
+    def search(self, industry=None, client=None, category=None, since=None, until=None, limit=50):
+        """
+        Newest-first summaries {id, client, industry, created, mode, tier, categories, has_roadmap}.
+        client matches as a case-insensitive prefix; category keeps assessments with a card for it.
+        """
+        clauses, params = [], []
+        if industry:
+            clauses.append("a.industry = ?")
+            params.append(industry)
+        if client:
+            clauses.append("a.client LIKE ? ESCAPE '\\'")
+            params.append(client.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if category:
+            clauses.append("a.id IN (SELECT assessment_id FROM cards WHERE category = ?)")
+            params.append(category)
+        if since is not None:
+            clauses.append("a.created >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("a.created < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.id, a.client, a.industry, a.created, a.mode, a.tier, a.consolidated IS NOT NULL,"
+                " (SELECT group_concat(category, '|') FROM cards c WHERE c.assessment_id = a.id)"
+                f" FROM assessments a {where} ORDER BY a.created DESC LIMIT ?",
+                (*params, limit)).fetchall()
+        return [{"id": r[0], "client": r[1], "industry": r[2], "created": r[3], "mode": r[4], "tier": r[5],
+                 "has_roadmap": bool(r[6]), "categories": r[7].split("|") if r[7] else []} for r in rows]
+
+    def load(self, assessment_id):
+        """
+        The stored assessment in session-state shapes, or None if the id is unknown.
+        "tier" and "card_tiers" {category: tier} are None for rows saved before tiers were recorded.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT client, industry, created, mode, tier, profile, fragments, consolidated, raw_outputs, usage"
+                " FROM assessments WHERE id = ?", (assessment_id,)).fetchone()
+            if row is None:
+                return None
+            items = self._conn.execute(
+                "SELECT category, tier, item FROM cards WHERE assessment_id = ? ORDER BY position",
+                (assessment_id,)).fetchall()
+        return {
+            "id": assessment_id, "client": row[0], "industry": row[1], "created": row[2], "mode": row[3],
+            "tier": row[4],
+            "profile": json.loads(row[5]),
+            "recommendation_data": [json.loads(item) for _, _, item in items],
+            "card_tiers": {category: tier for category, tier, _ in items},
+            "category_fragments": json.loads(row[6]),
+            "consolidated_json": json.loads(row[7]) if row[7] is not None else None,
+            "raw_ai_outputs": json.loads(row[8]),
+            "usage": json.loads(row[9]) if row[9] is not None else None,
+        }
+
+    def score_rows(self, since_id=0):
+        """
+        (assessment_id, client, industry, category, sub_capability, score) for every stored score
+        with assessment_id > since_id, grouped by assessment in id order (for bulk loading).
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT a.id, a.client, a.industry, s.category, s.sub_capability, s.score"
+                " FROM assessments a JOIN scores s ON s.assessment_id = a.id WHERE a.id > ? ORDER BY a.id",
+                (since_id,)).fetchall()
+
+    def delete(self, assessment_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM assessments WHERE id = ?", (assessment_id,))
+
+    def stats(self):
+        with self._lock:
+            count, clients = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT client) FROM assessments").fetchone()
+        return {"assessments": count, "clients": clients}
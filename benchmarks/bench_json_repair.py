@@ -0,0 +1,145 @@
+# bench_json_repair.py
+# Compare json_repair.repair_json with the previous multi-attempt try_load_json.
+#
+#   python benchmarks/bench_json_repair.py                       # built-in corpus
+#   python benchmarks/bench_json_repair.py --corpus outputs.jsonl  # one {"text": ...} (or raw string) per line
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from json_repair import repair_json  # noqa: E402
+
+
+def legacy_try_load_json(text):
+    """The fallback chain previously used by MaturityLevelEvaluation+AI7_v2.py (kept for comparison)."""
+    if text is None:
+        raise ValueError("No text provided")
+    t = str(text).strip()
+    fence = re.search(r"```(?:json)?\s*([\s\S]*?)\s*```", t, re.IGNORECASE)
+    if fence:
+        t = fence.group(1).strip()
+    try:
+        return json.loads(t)
+    except Exception:
+        pass
+    try:
+        return json.loads(t.replace("'", '"'))
+    except Exception:
+        pass
+    try:
+        return json.loads(re.sub(r",\s*([}\]])", r"\1", t))
+    except Exception:
+        pass
+    start = t.find("{"); end = t.rfind("}")
+    if start != -1 and end != -1 and end > start:
+        candidate = t[start:end + 1]
+        try:
+            return json.loads(candidate)
+        except Exception:
+            try:
+                return json.loads(candidate.replace("'", '"'))
+            except Exception:
+                pass
+    raise ValueError("Could not parse JSON from the model output.")
+
+
+SAMPLE_CARD = {
+    "executive": {
+        "summary": "The client's data estate is fragmented across ~10 ERPs, which slows reporting.",
+        "recommendation": "Consolidate finance and sales data into a governed lakehouse. It's the fastest route to one view of the business.",
+        "activities": ["Stand up landing zone", "Ingest top 3 ERPs", "Publish executive KPI dashboard"],
+        "focus_8w": ["Discovery workshops", "Landing zone", "First ingestion pipeline", "KPI dashboard MVP"],
+        "plan_3y": ["Unify core data", "Self-service analytics", "Predictive demand models"],
+        "assumptions": ["Executive sponsor is available", "Azure remains the platform"],
+    },
+    "technical": {
+        "summary": "No shared data platform; each business unit runs its own ERP reporting.",
+        "recommendation": "Adopt a medallion architecture with automated ingestion and data quality checks.",
+        "activities": ["Provision ADLS and Databricks", "Build bronze/silver pipelines", "Add DQ rules"],
+        "focus_8w": ["IaC baseline", "CDC from ERP A", "Silver model for orders", "DQ dashboards"],
+        "plan_3y": ["Platform hardening", "MLOps foundation", "Real-time inventory"],
+        "assumptions": ["Source system access granted"],
+        "team": ["Data architect: 1", "Data engineer: 3", "BI developer: 1"],
+    },
+}
+
+
+def builtin_corpus():
+    """Typical model-output shapes: clean, fenced, chatty, trailing commas, single quotes, truncated."""
+    clean = json.dumps(SAMPLE_CARD, indent=2)
+    single = clean.replace('"', "'")
+    trailing = re.sub(r"(\])", r",\1", clean, count=3).replace('"\n  }', '",\n  }')
+    corpus = [
+        ("clean", clean, SAMPLE_CARD),
+        ("fenced", "```json\n" + clean + "\n```", SAMPLE_CARD),
+        ("chatty", "Here is the assessment you asked for:\n\n" + clean + "\n\nLet me know if you need changes.", SAMPLE_CARD),
+        ("trailing_commas", trailing, SAMPLE_CARD),
+        ("single_quotes", single, SAMPLE_CARD),
+        ("truncated", clean[: int(len(clean) * 0.8)], None),
+    ]
+    return corpus
+
+
+def load_corpus(path):
+    corpus = []
+    with open(path, encoding="utf-8") as fh:
+        for n, line in enumerate(fh):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = line
+            if isinstance(record, dict):
+                corpus.append((record.get("name", f"line{n}"), record.get("text", ""), record.get("expected")))
+            else:
+                corpus.append((f"line{n}", str(record), None))
+    return corpus
+
+
+def time_call(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        try:
+            result = fn(text)
+        except ValueError:
+            result = None
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", help="JSONL file of raw model outputs")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    corpus = load_corpus(args.corpus) if args.corpus else builtin_corpus()
+
+    print(f"{'sample':<18}{'bytes':>7}{'legacy us':>11}{'repair us':>11}  legacy      repair      repairs")
+    totals = {"legacy": 0.0, "repair": 0.0}
+    for name, text, expected in corpus:
+        legacy_t, legacy_obj = time_call(legacy_try_load_json, text, args.repeat)
+        repair_t, repaired = time_call(repair_json, text, args.repeat)
+        repair_obj, repairs = repaired if repaired else (None, [])
+        totals["legacy"] += legacy_t
+        totals["repair"] += repair_t
+
+        def verdict(obj):
+            if obj is None:
+                return "failed"
+            if expected is None:
+                return "parsed"
+            return "exact" if obj == expected else "CORRUPTED"
+
+        print(f"{name:<18}{len(text):>7}{legacy_t * 1e6:>11.1f}{repair_t * 1e6:>11.1f}  "
+              f"{verdict(legacy_obj):<12}{verdict(repair_obj):<12}{','.join(repairs)}")
+    print(f"{'total':<25}{totals['legacy'] * 1e6:>11.1f}{totals['repair'] * 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# bench_pipeline.py
+# End-to-end throughput of the evaluation pipeline (card generation → JSON repair → consolidation
+# → roadmap diagrams → PPTX), driven headlessly through evaluate_batch against the local fake
+# OpenAI server, so it needs no network and spends no tokens.
+#
+#   python benchmarks/bench_pipeline.py                                   # 12 assessments, defaults
+#   python benchmarks/bench_pipeline.py --assessments 40 --workers 8 --latency 0.8 --error-rate 0.05
+#   python benchmarks/bench_pipeline.py --mode batched --structured tool --malformed-rate 0.3
+#   python benchmarks/bench_pipeline.py --tier draft                      # per-stage model routing
+#   python benchmarks/bench_pipeline.py --json-out before.json            # keep results to compare runs
+#
+# Reports assessments/min, per-stage p50/p95 (from perf_trace spans), API calls/retries,
+# token usage, peak RSS and (with --tracemalloc) peak Python heap.
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai_server import FakeOpenAIConfig, load_responses, start_server  # noqa: E402
+
+INDUSTRIES = ["Homebuilding & Real Estate", "Healthcare", "Financial Services", "Retail", "Manufacturing"]
+
+
+def synthetic_profiles(count, seed):
+    from evaluate_batch import profile_from_record
+    from maturity_engine import categories_structure
+
+    rng = random.Random(seed)
+    profiles = []
+    for i in range(count):
+        record = {"client": f"Client {i + 1:04d}", "industry": rng.choice(INDUSTRIES),
+                  "company_size": rng.choice(["50-200", "200-1000", "1000+"]), "it_size": str(rng.randint(5, 200)),
+                  "uses_cloud": rng.choice(["Yes", "No"]), "cloud_platform": rng.choice(["AWS", "Azure", "GCP"]),
+                  "priority_projects": "Modernise reporting", "overall_input": "Budget constrained."}
+        for category, sub_caps in categories_structure.items():
+            for sub_cap in sub_caps:
+                record[f"{category}/{sub_cap}"] = rng.randint(1, 5)
+            record[f"include:{category}"] = rng.random() < 0.85
+            if rng.random() < 0.3:
+                record[f"comment:{category}"] = f"Pain points around {category.lower()}."
+        profiles.append(profile_from_record(record))
+    return profiles
+
+
+def run(args):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from openai import OpenAI
+
+    from evaluate_batch import evaluate_client
+    from maturity_engine import CompletionClient
+    from model_routing import ModelRouter
+    from perf_trace import Tracer
+    from request_scheduler import RequestScheduler
+    from response_cache import ResponseCache
+
+    config = FakeOpenAIConfig(args.latency, args.jitter, args.error_rate, args.malformed_rate,
+                              load_responses(args.responses) if args.responses else None,
+                              args.tokens_per_second, args.seed)
+    server, base_url = start_server(config)
+    profiles = synthetic_profiles(args.assessments, args.seed)
+    with tempfile.TemporaryDirectory() as out_dir:
+        cache = ResponseCache(os.path.join(out_dir, "cache.sqlite3")) if args.cache else None
+        scheduler = RequestScheduler(args.rpm, args.tpm, base_delay=0.1, max_delay=2.0)
+        router = ModelRouter()
+        llm = CompletionClient(OpenAI(api_key="bench", base_url=base_url, max_retries=0), cache,
+                               use_cache=args.cache, structured_mode=args.structured, model=args.model,
+                               scheduler=scheduler, router=router, tier=args.tier)
+        tracer = Tracer(max_spans=100000)
+        if args.tracemalloc:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            statuses = list(pool.map(
+                lambda p: evaluate_client(llm, p, out_dir, args.mode == "batched", args.max_in_flight, tracer),
+                profiles))
+        wall = time.perf_counter() - start
+        heap_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+        if args.tracemalloc:
+            tracemalloc.stop()
+    server.shutdown()
+
+    usages = [s["usage"] for s in statuses if s["usage"]]
+    return {
+        "settings": {k: v for k, v in vars(args).items() if k != "json_out"},
+        "assessments": len(statuses),
+        "failed": sum(not s["ok"] for s in statuses),
+        "wall_seconds": wall,
+        "assessments_per_min": len(statuses) / wall * 60 if wall else None,
+        "assessment_p50_s": sorted(s["seconds"] for s in statuses)[len(statuses) // 2] if statuses else None,
+        "server": {"requests": config.requests, "errors": config.errors, "malformed": config.malformed},
+        "scheduler": scheduler.stats(),
+        "tokens": {"prompt": sum(u["prompt_tokens"] for u in usages),
+                   "completion": sum(u["completion_tokens"] for u in usages)},
+        "stages": tracer.stage_stats(),
+        "models": router.model_stats(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_heap_mb": heap_peak / 1024 / 1024 if heap_peak is not None else None,
+        "errors": sorted({f"{name}: {error}" for s in statuses for name, error in s["errors"]})[:10],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark against a fake OpenAI server.")
+    parser.add_argument("--assessments", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4, help="assessments evaluated in parallel")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="concurrent category calls per assessment")
+    parser.add_argument("--mode", choices=["per-category", "batched"], default="per-category")
+    parser.add_argument("--structured", choices=["json_schema", "tool"], default=None)
+    parser.add_argument("--model", default="gpt-3.5-turbo")
+    parser.add_argument("--tier", choices=["draft", "final"], help="route stages through model_routing instead of --model")
+    parser.add_argument("--cache", action="store_true", help="use a (fresh) response cache")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake server seconds to first token")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.1)
+    parser.add_argument("--responses", help="JSONL of recorded model outputs to replay (see fake_openai_server.py)")
+    parser.add_argument("--rpm", type=float, default=10000)
+    parser.add_argument("--tpm", type=float, default=10000000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--tracemalloc", action="store_true", help="also report peak Python heap (slower)")
+    parser.add_argument("--json-out", help="write the full result as JSON")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(f"{result['assessments']} assessment(s), {result['failed']} failed, in {result['wall_seconds']:.1f}s "
+          f"→ {result['assessments_per_min']:.1f} assessments/min (p50 {result['assessment_p50_s']:.2f}s each)")
+    print(f"server: {result['server']['requests']} requests, {result['server']['errors']} injected errors, "
+          f"{result['server']['malformed']} malformed · retries: {result['scheduler']['retries']} · "
+          f"tokens: {result['tokens']['prompt']:,} prompt + {result['tokens']['completion']:,} completion")
+    memory = f"peak RSS {result['peak_rss_mb']:.0f} MB"
+    if result["peak_heap_mb"] is not None:
+        memory += f" · peak heap {result['peak_heap_mb']:.1f} MB"
+    print(memory)
+    print(f"{'stage':<26}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, v in sorted(result["stages"].items()):
+        print(f"{name:<26}{v['count']:>6}{v['p50_ms']:>10.1f}{v['p95_ms']:>10.1f}{v['max_ms']:>10.1f}")
+    for model, v in sorted(result["models"].items()):
+        print(f"model {model:<20}{v['calls']:>6}{v['p50_ms']:>10.1f}{v['p95_ms']:>10.1f}")
+    for error in result["errors"]:
+        print(f"  error: {error}")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# bench_portfolio.py
+# Portfolio scoring cost: per-client Python loops over score dicts (how the app variants compute
+# averages and strength/priority lists) versus the vectorized Portfolio engine, for a whole
+# portfolio and for one client benchmarked against its industry peers (histogram index lookups),
+# plus fingerprinting every client: json.dumps + sha256 of the score dicts versus the
+# score_model.Assessment hex fingerprint.
+#
+#   python benchmarks/bench_portfolio.py --clients 5000 --industries 7
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from maturity_engine import categories_structure  # noqa: E402
+from portfolio_scoring import Portfolio  # noqa: E402
+from score_model import Assessment  # noqa: E402
+
+
+def synthetic(count, industries, seed):
+    rng = random.Random(seed)
+    return [(f"Client {i}", f"Industry {rng.randrange(industries)}",
+             {c: {"sub_capabilities": {s: rng.randint(1, 5) for s in subs}} for c, subs in categories_structure.items()})
+            for i in range(count)]
+
+
+def loop_portfolio(clients):
+    out = []
+    for _, _, scores in clients:
+        averages = {c: np.mean(list(v["sub_capabilities"].values())) for c, v in scores.items()}
+        out.append((averages, [c for c, a in averages.items() if a >= 4], [c for c, a in averages.items() if a <= 2],
+                    {c: sum(max(0, 5 - s) for s in v["sub_capabilities"].values()) / len(v["sub_capabilities"])
+                     for c, v in scores.items()}))
+    return out
+
+
+def loop_benchmark(clients, current, industry):
+    peers = [scores for _, ind, scores in clients if ind == industry]
+    ranks = {}
+    for c, v in current.items():
+        for s, score in v["sub_capabilities"].items():
+            column = [p[c]["sub_capabilities"][s] for p in peers]
+            ranks[(c, s)] = (sum(x < score for x in column) + 0.5 * sum(x == score for x in column)) / len(column) * 100
+    return ranks
+
+
+def dict_fingerprints(clients):
+    return [hashlib.sha256(json.dumps(scores, sort_keys=True).encode("utf-8")).hexdigest() for _, _, scores in clients]
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Python loops vs vectorized Portfolio scoring.")
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--industries", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    clients = synthetic(args.clients, args.industries, args.seed)
+    start = time.perf_counter()
+    portfolio = Portfolio(categories_structure)
+    for client, industry, scores in clients:
+        portfolio.add(client, industry, scores)
+    build_ms = (time.perf_counter() - start) * 1000
+    current, industry = clients[0][2], clients[0][1]
+    category, sub_caps = next(iter(categories_structure.items()))
+    sub_cap = sub_caps[0]
+
+    def vector_portfolio():
+        averages = portfolio.averages()
+        return averages, averages >= 4, averages <= 2, portfolio.category_gaps()
+
+    rows = [
+        ("portfolio: averages, classes, gaps", best_of(lambda: loop_portfolio(clients), args.repeat),
+         best_of(vector_portfolio, args.repeat)),
+        ("one client vs industry peers (36 ranks)", best_of(lambda: loop_benchmark(clients, current, industry), args.repeat),
+         best_of(lambda: portfolio.percentile_ranks(current, industry), args.repeat)),
+        ("one client benchmark table", None, best_of(lambda: portfolio.benchmark(current, industry), args.repeat)),
+        ("one slider value rank (histogram index)", None,
+         best_of(lambda: portfolio.sub_capability_rank(industry, category, sub_cap, 3), args.repeat)),
+        ("fingerprint every client", best_of(lambda: dict_fingerprints(clients), args.repeat),
+         best_of(lambda: [portfolio.assessment(row).fingerprint() for row in range(portfolio.n)], args.repeat)),
+        ("fingerprint every client (from dicts)", None,
+         best_of(lambda: [Assessment.from_dict(portfolio.layout, scores).fingerprint() for _, _, scores in clients],
+                 args.repeat)),
+    ]
+    print(f"{args.clients} clients × {len(categories_structure)} categories, {args.industries} industries "
+          f"(array {portfolio.scores.nbytes / 1024:.0f} KB, built in {build_ms:.0f} ms)")
+    print(f"{'operation':<42}{'loops ms':>10}{'numpy ms':>10}{'speedup':>9}")
+    for name, loop_ms, vector_ms in rows:
+        loop = f"{loop_ms:10.2f}" if loop_ms is not None else f"{'-':>10}"
+        speedup = f"{loop_ms / vector_ms:8.0f}x" if loop_ms is not None else f"{'-':>9}"
+        print(f"{name:<42}{loop}{vector_ms:10.2f}{speedup}")
+
+
+if __name__ == "__main__":
+    main()
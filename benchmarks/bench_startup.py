@@ -0,0 +1,67 @@
+# bench_startup.py
+# Cold-start and warm-rerun time of each Streamlit app variant, measured with Streamlit's AppTest
+# (the script is executed exactly as `streamlit run` would, without a browser).
+#
+#   python benchmarks/bench_startup.py               # all variants
+#   python benchmarks/bench_startup.py --reruns 20 "MaturityLevelEvaluation+AI7_v2.py"
+#
+# "cold" is the first run in a fresh interpreter (module imports included);
+# "warm" is the mean of the following reruns in the same process, i.e. what every widget interaction costs.
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(script, reruns):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    warm = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - start)
+    errors = [str(e.value) for e in at.exception]
+    return {"cold": cold, "warm": sum(warm) / len(warm) if warm else None, "errors": errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import and warm rerun time per app variant.")
+    parser.add_argument("scripts", nargs="*", help="app scripts (default: every MaturityLevelEvaluation*.py)")
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.scripts[0], args.reruns)))
+        return
+
+    scripts = args.scripts or sorted(os.path.basename(p) for p in glob.glob(os.path.join(ROOT, "MaturityLevelEvaluation*.py")))
+    print(f"{'app variant':<42}{'cold ms':>10}{'warm ms':>10}")
+    for script in scripts:
+        # each variant gets a fresh interpreter so its imports are really cold
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", "--reruns", str(args.reruns), script],
+                              capture_output=True, text=True, cwd=ROOT)
+        lines = proc.stdout.strip().splitlines()
+        if proc.returncode != 0 or not lines:
+            reason = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+            print(f"{script:<42}{'-':>10}{'-':>10}  {reason}")
+            continue
+        result = json.loads(lines[-1])
+        warm = f"{result['warm'] * 1000:.0f}" if result["warm"] is not None else "-"
+        note = f"  ({len(result['errors'])} script error(s): {result['errors'][0][:60]})" if result["errors"] else ""
+        print(f"{script:<42}{result['cold'] * 1000:>10.0f}{warm:>10}{note}")
+
+
+if __name__ == "__main__":
+    main()
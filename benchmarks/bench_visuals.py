@@ -0,0 +1,157 @@
+# bench_visuals.py
+# Render time per figure: the matplotlib versions (figure + PNG encoding, as st.pyplot / st.image
+# used to receive them) versus the svg_render strings the apps now send to the browser, for the
+# AI3 heatmap, one AI5/AI6 category radar, the AI5/AI6 phase roadmaps and the AI7 roadmaps.
+#
+#   python benchmarks/bench_visuals.py --repeat 5
+
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import matplotlib  # noqa: E402
+
+matplotlib.use("Agg")
+
+import matplotlib.patches as patches  # noqa: E402
+import matplotlib.pyplot as plt  # noqa: E402
+
+from maturity_engine import SPRINTS, YEARS, categories_structure, levels  # noqa: E402
+from radar_charts import radar_png, radar_svg  # noqa: E402
+from roadmap_export import (  # noqa: E402
+    draw_3year_roadmap_figure, draw_8week_roadmap_figure, figure_to_png, roadmap_3year_svg, roadmap_8week_svg
+)
+from svg_render import heatmap_svg, phase_roadmap_svg  # noqa: E402
+
+PHASES = [
+    {"name": "Foundation\n(0-6 months)", "color": "#e3f2fd", "border": "#1976d2",
+     "items": ["Infrastructure Assessment", "Data Quality Baseline", "Governance Framework"]},
+    {"name": "Development\n(6-12 months)", "color": "#f3e5f5", "border": "#7b1fa2",
+     "items": ["Cloud Migration", "Analytics Platform", "Initial AI Pilots"]},
+    {"name": "Integration\n(12-18 months)", "color": "#e8f5e8", "border": "#388e3c",
+     "items": ["Advanced Analytics", "ML Operations", "Business Integration"]},
+    {"name": "Optimization\n(18+ months)", "color": "#fff3e0", "border": "#f57c00",
+     "items": ["AI Excellence", "Continuous Innovation", "Strategic Advantage"]},
+]
+
+
+def pyplot_png(fig):
+    # what st.pyplot does with a figure (PNG, tight bbox, dpi 200)
+    img = BytesIO()
+    fig.savefig(img, format="png", bbox_inches="tight", dpi=200)
+    plt.close(fig)
+    return img.getvalue()
+
+
+def mpl_heatmap(scores):
+    # AI3's former draw_cube_heatmap
+    fig, ax = plt.subplots(figsize=(10, 2))
+    ax.set_xlim(0, len(scores))
+    ax.set_ylim(0, 1)
+    ax.axis("off")
+    color_map = {1: "#d6e4f0", 2: "#a9c9e2", 3: "#78abd5", 4: "#4f90c6", 5: "#2d72b8"}
+    for i, (category, level) in enumerate(scores.items()):
+        ax.add_patch(patches.Rectangle((i, 0), 1, 1, linewidth=1, edgecolor="white", facecolor=color_map[level]))
+        ax.text(i + 0.5, 0.75, category, ha="center", va="center", fontsize=8, wrap=True)
+        ax.text(i + 0.5, 0.25, f"Level {level}\n({levels[level]})", ha="center", va="center", fontsize=8)
+    return pyplot_png(fig)
+
+
+def mpl_phase_roadmap(phases, vertical=False):
+    # AI5's (horizontal) and AI6's (vertical) former draw_roadmap_diagram
+    if not vertical:
+        fig, ax = plt.subplots(figsize=(14, 8))
+        box_width, box_height, spacing = 3, 2, 1
+        for i, phase in enumerate(phases):
+            x = i * (box_width + spacing)
+            ax.add_patch(patches.FancyBboxPatch((x, 2), box_width, box_height, boxstyle="round,pad=0.1",
+                                                facecolor=phase["color"], edgecolor=phase["border"], linewidth=2))
+            ax.text(x + box_width / 2, 3.5, phase["name"], ha="center", va="center", fontsize=12, fontweight="bold")
+            for j, item in enumerate(phase["items"]):
+                ax.text(x + box_width / 2, 2.8 - j * 0.3, f"• {item}", ha="center", va="center", fontsize=9)
+            if i < len(phases) - 1:
+                ax.add_patch(patches.FancyArrowPatch((x + box_width, 3), (x + box_width + spacing, 3),
+                                                     arrowstyle="->", mutation_scale=20, color="#666666"))
+        ax.set_xlim(-0.5, len(phases) * (box_width + spacing))
+        ax.set_ylim(1, 5)
+        ax.set_title("18-Month Strategic Roadmap", fontsize=16, fontweight="bold", pad=20)
+        ax.axis("off")
+        plt.tight_layout()
+        return pyplot_png(fig)
+    fig, ax = plt.subplots(figsize=(8, 7))
+    box_width, box_height, spacing, y_start = 7, 1.2, 0.5, 7.5
+    for i, phase in enumerate(phases):
+        y = y_start - i * (box_height + spacing)
+        ax.add_patch(patches.FancyBboxPatch((0.7, y), box_width, box_height, boxstyle="round,pad=0.1",
+                                            facecolor=phase["color"], edgecolor=phase["border"],
+                                            linewidth=3 if i == 0 else 2))
+        ax.text(0.7 + box_width / 2, y + box_height - 0.2, phase["name"], ha="center", va="center", fontsize=12,
+                fontweight="bold", color=phase["border"])
+        for j, item in enumerate(phase["items"]):
+            ax.text(0.7 + box_width / 2, y + box_height - 0.5 - j * 0.28, f"• {item}", ha="center", va="center",
+                    fontsize=10, color=phase["border"])
+        if i < len(phases) - 1:
+            ax.add_patch(patches.FancyArrowPatch((0.7 + box_width / 2, y), (0.7 + box_width / 2, y - spacing + 0.1),
+                                                 arrowstyle="->", mutation_scale=13, color="#666666", linewidth=1.2))
+    ax.set_xlim(0, 8)
+    ax.set_ylim(0, 9)
+    ax.set_title("18-Month Strategic Roadmap", fontsize=15, fontweight="bold", pad=25, color="#1565c0")
+    ax.axis("off")
+    plt.subplots_adjust(top=0.93, bottom=0.03, left=0.05, right=0.95, hspace=0)
+    return pyplot_png(fig)
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, len(result if isinstance(result, bytes) else result.encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="matplotlib PNG vs SVG string render time per figure.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    heatmap = {c: i % 5 + 1 for i, c in enumerate(categories_structure)}
+    category, sub_caps = next(iter(categories_structure.items()))
+    values = tuple(i % 5 + 1 for i in range(len(sub_caps)))
+    average = round(sum(values) / len(values))
+    focus = {s: [f"Sprint deliverable {i + 1}.{j + 1} for the data platform team" for j in range(3)]
+             for i, s in enumerate(SPRINTS)}
+    plan = {y: [f"Year {i + 1} initiative {j + 1} across cloud, data and AI" for j in range(3)]
+            for i, y in enumerate(YEARS)}
+
+    rows = [
+        ("AI3 heatmap", lambda: mpl_heatmap(heatmap), lambda: heatmap_svg(heatmap, levels)),
+        ("AI5/AI6 category radar",
+         lambda: radar_png(category, sub_caps, values, average, levels[average]),
+         lambda: radar_svg(category, sub_caps, values, average, levels[average])),
+        ("AI5 phase roadmap", lambda: mpl_phase_roadmap(PHASES),
+         lambda: phase_roadmap_svg(PHASES, "18-Month Strategic Roadmap")),
+        ("AI6 phase roadmap (vertical)", lambda: mpl_phase_roadmap(PHASES, vertical=True),
+         lambda: phase_roadmap_svg(PHASES, "18-Month Strategic Roadmap", vertical=True)),
+        ("AI7 8-week roadmap", lambda: figure_to_png(draw_8week_roadmap_figure(focus)),
+         lambda: roadmap_8week_svg(focus)),
+        ("AI7 3-year roadmap", lambda: figure_to_png(draw_3year_roadmap_figure(plan)),
+         lambda: roadmap_3year_svg(plan)),
+    ]
+    # one untimed pass so font cache and import costs are not charged to the first figure
+    for _, mpl, svg in rows:
+        mpl(), svg()
+    print(f"{'figure':<32}{'mpl ms':>9}{'svg ms':>9}{'speedup':>9}{'png KB':>9}{'svg KB':>9}")
+    for name, mpl, svg in rows:
+        mpl_ms, png_bytes = best_of(mpl, args.repeat)
+        svg_ms, svg_bytes = best_of(svg, args.repeat)
+        print(f"{name:<32}{mpl_ms:9.1f}{svg_ms:9.2f}{mpl_ms / svg_ms:8.0f}x{png_bytes / 1024:9.1f}{svg_bytes / 1024:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
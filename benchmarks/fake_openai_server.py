@@ -0,0 +1,232 @@
+# fake_openai_server.py
+# Local stand-in for the OpenAI chat completions endpoint, for benchmarks that must not spend
+# tokens or need a network. Answers the app's three prompt kinds (per-category card, batched
+# cards, roadmap consolidation) with synthetic or recorded JSON, optionally malformed, after a
+# configurable latency, and fails a configurable share of requests with 429/500.
+#
+#   python benchmarks/fake_openai_server.py --port 8765 --latency 0.8 --error-rate 0.05 --malformed-rate 0.2
+#   OPENAI_BASE_URL=http://127.0.0.1:8765/v1 ...
+#
+# --responses takes a JSONL file of recorded model outputs: {"kind": "card"|"batched"|"consolidate", "text": "..."}.
+# Supports non-streaming and streaming (SSE, with the include_usage final chunk), json_schema
+# response_format and forced function calls (the answer is returned as tool-call arguments).
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_CATEGORY_LINE = re.compile(r"^Category: (.+)$", re.MULTILINE)
+
+
+def synthetic_card(category, rng):
+    n = rng.randint(2, 5)
+    block = lambda kind: {
+        "summary": f"{category}: {kind} summary of the current state and the main gap.",
+        "recommendation": f"Prioritise {category.lower()} foundations before scaling. This reduces delivery risk.",
+        "activities": [f"{kind} activity {i + 1} for {category}" for i in range(n)],
+        "focus_8w": [f"Sprint {i + 1}: {kind} task for {category}" for i in range(min(n, 4))],
+        "plan_3y": [f"Year {i + 1}: {kind} milestone for {category}" for i in range(3)],
+        "assumptions": [f"{kind} assumption {i + 1}" for i in range(2)],
+    }
+    card = {"executive": block("Executive"), "technical": block("Technical")}
+    card["technical"]["team"] = ["Data Engineer: 2", "Cloud Architect: 1", "Analyst: 1"]
+    return card
+
+
+def synthetic_roadmap(prompt):
+    items = re.findall(r'"(Sprint \d: [^"]+|Year \d: [^"]+)"', prompt)
+    sprints = [i for i in items if i.startswith("Sprint")] or ["Baseline assessment"]
+    years = [i for i in items if i.startswith("Year")] or ["Platform foundation"]
+    return {
+        "focus_8w": {f"sprint{k + 1}": sprints[k::4] for k in range(4)},
+        "plan_3y": {f"year{k + 1}": years[k::3] for k in range(3)},
+    }
+
+
+def malform(text, rng):
+    """One of the damage patterns seen in real model output (all handled by json_repair)."""
+    kind = rng.choice(["fence", "prose", "trailing_comma", "single_quotes", "truncated", "missing_comma"])
+    if kind == "fence":
+        return f"```json\n{text}\n```"
+    if kind == "prose":
+        return f"Here is the JSON you asked for:\n{text}\nLet me know if you need changes."
+    if kind == "trailing_comma":
+        return text.replace("]", ",]", 1).replace("}", ",}", 1)
+    if kind == "single_quotes":
+        return text.replace('"summary"', "'summary'")
+    if kind == "truncated":
+        return text[: max(1, int(len(text) * rng.uniform(0.85, 0.98)))]
+    return text.replace('", "', '" "', 1)
+
+
+class FakeOpenAIConfig:
+    def __init__(self, latency=0.5, jitter=0.25, error_rate=0.0, malformed_rate=0.0, responses=None,
+                 tokens_per_second=400.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.tokens_per_second = tokens_per_second
+        self.recorded = {}
+        for record in responses or []:
+            self.recorded.setdefault(record["kind"], []).append(record["text"])
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.malformed = 0
+
+    def answer(self, prompt):
+        """(kind, text) for a prompt: recorded output when available, else synthetic."""
+        with self.lock:
+            rng = random.Random(self.rng.random())
+        if "Consolidate these category-level fragments" in prompt:
+            kind = "consolidate"
+        elif "\nCategories:\n" in prompt:
+            kind = "batched"
+        else:
+            kind = "card"
+        if self.recorded.get(kind):
+            text = rng.choice(self.recorded[kind])
+        elif kind == "consolidate":
+            text = json.dumps(synthetic_roadmap(prompt))
+        elif kind == "batched":
+            text = json.dumps({c: synthetic_card(c, rng) for c in _CATEGORY_LINE.findall(prompt)})
+        else:
+            categories = _CATEGORY_LINE.findall(prompt) or ["General"]
+            text = json.dumps(synthetic_card(categories[0], rng))
+        if rng.random() < self.malformed_rate:
+            with self.lock:
+                self.malformed += 1
+            text = malform(text, rng)
+        return kind, text
+
+
+class _Handler(BaseHTTPRequestHandler):
+    config = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        config = self.config
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+        with config.lock:
+            config.requests += 1
+            fail = config.rng.random() < config.error_rate
+            delay = max(0.0, config.latency + config.rng.uniform(-config.jitter, config.jitter))
+            status = config.rng.choice([429, 500]) if fail else 200
+            if fail:
+                config.errors += 1
+        if fail:
+            time.sleep(delay / 4)
+            self._send_json(status, {"error": {"message": "Simulated failure", "type": "server_error", "code": None}},
+                            headers={"retry-after-ms": "200"} if status == 429 else None)
+            return
+
+        prompt = request["messages"][-1]["content"]
+        _, text = config.answer(prompt)
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(text) // 4)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        tool = (request.get("tool_choice") or {}).get("function", {}).get("name") if request.get("tools") else None
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "created": int(time.time()), "model": request.get("model")}
+
+        # time to first token, then output at tokens_per_second
+        generation = completion_tokens / config.tokens_per_second
+        time.sleep(delay)
+        if not request.get("stream"):
+            time.sleep(generation)
+            if tool:
+                message = {"role": "assistant", "content": None, "tool_calls": [{
+                    "id": "call_0", "type": "function", "function": {"name": tool, "arguments": text}}]}
+            else:
+                message = {"role": "assistant", "content": text}
+            self._send_json(200, dict(base, object="chat.completion", usage=usage,
+                                      choices=[{"index": 0, "message": message, "finish_reason": "stop"}]))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        pieces = [text[i:i + 64] for i in range(0, len(text), 64)] or [""]
+        for piece in pieces:
+            if tool:
+                delta = {"tool_calls": [{"index": 0, "function": {"arguments": piece}}]}
+            else:
+                delta = {"content": piece}
+            chunk = dict(base, object="chat.completion.chunk",
+                         choices=[{"index": 0, "delta": delta, "finish_reason": None}])
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(generation / len(pieces))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            chunk = dict(base, object="chat.completion.chunk", choices=[], usage=usage)
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def start_server(config, host="127.0.0.1", port=0):
+    """
+    Serve config on a background thread. Returns (server, base_url); call server.shutdown() to stop.
+    """
+    handler = type("FakeOpenAIHandler", (_Handler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def load_responses(path):
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat completions stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=0.25, help="± seconds added to the latency")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429/500")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of answers with damaged JSON")
+    parser.add_argument("--responses", help="JSONL of recorded outputs to replay")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = FakeOpenAIConfig(args.latency, args.jitter, args.error_rate, args.malformed_rate,
+                              load_responses(args.responses) if args.responses else None,
+                              args.tokens_per_second, args.seed)
+    server, base_url = start_server(config, args.host, args.port)
+    print(f"Fake OpenAI server on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
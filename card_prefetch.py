@@ -0,0 +1,142 @@
+# card_prefetch.py
+# Speculative background generation of baseball cards while the consultant is still scoring.
+# A category whose inputs have settled is generated on a worker and the result is kept under its
+# input fingerprint (maturity_engine.category_fingerprint), so Generate can take it instead of
+# calling the model. A prefetch whose inputs change again is cancelled: a queued job never starts
+# and a running one stops at the next streamed chunk. Prefetches that finished but were never
+# used are counted as wasted; wasted_usage holds the tokens and cost of every discarded prefetch,
+# including what a cancelled one had streamed before it stopped. All prefetchers (one per app
+# session) share one process-wide worker pool.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from maturity_engine import generate_category_card
+from token_budget import UsageMeter
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def shared_pool(max_workers=4):
+    """The process-wide prefetch pool, created on first use; max_workers only applies then."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="card-prefetch")
+        return _pool
+
+
+class PrefetchCancelled(Exception):
+    """Raised inside a prefetch worker to stop its stream once the prefetch is no longer wanted."""
+
+
+class CardPrefetcher:
+    """
+    At most one prefetch job per category, for the latest fingerprint it was asked about.
+    Jobs run on shared_pool() unless a pool is given. Workers never touch UI state. Safe to share
+    between threads.
+    """
+
+    def __init__(self, pool=None):
+        self._pool = pool or shared_pool()
+        self._jobs = {}
+        # re-entrant: Future.cancel() runs done callbacks (which take the lock) on the cancelling thread
+        self._lock = threading.RLock()
+        self.counts = {"started": 0, "used": 0, "cancelled": 0, "wasted": 0, "failed": 0}
+        self.wasted_usage = UsageMeter()
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _settle(self, job):
+        # accounting for a job discarded before anyone claimed it, once it is both discarded and done
+        with self._lock:
+            if not job["discarded"] or not job["future"].done() or job["settled"]:
+                return
+            job["settled"] = True
+        if job["future"].cancelled():
+            self._count("cancelled")
+            return
+        result = job["future"].result()
+        # whatever the job spent before it was cancelled, finished unused or failed
+        self.wasted_usage.merge(job["usage"])
+        if isinstance(result["error"], PrefetchCancelled):
+            self._count("cancelled")
+        elif result["error"] is None:
+            self._count("wasted")
+        else:
+            self._count("failed")
+
+    def _discard(self, job):
+        job["discarded"] = True
+        job["cancel"].set()
+        job["future"].cancel()
+        self._settle(job)
+
+    def prefetch(self, llm, category, fingerprint, prompt):
+        """
+        Start generating category's card for fingerprint unless that job already exists; an older
+        job for the category is cancelled. Returns True if a new job was started.
+        """
+        with self._lock:
+            job = self._jobs.get(category)
+            if job is not None and job["fingerprint"] == fingerprint:
+                return False
+            if job is not None:
+                self._discard(job)
+            cancel = threading.Event()
+
+            def stop_if_cancelled(_category, _text):
+                if cancel.is_set():
+                    raise PrefetchCancelled(f"Prefetch of '{category}' cancelled.")
+
+            job = {"fingerprint": fingerprint, "cancel": cancel, "usage": UsageMeter(), "discarded": False,
+                   "settled": False}
+            # streaming, so a cancelled job stops at its next chunk instead of running to the end
+            job["future"] = self._pool.submit(generate_category_card, llm.metered(job["usage"]), category, prompt,
+                                              stop_if_cancelled)
+            self._jobs[category] = job
+            self.counts["started"] += 1
+        job["future"].add_done_callback(lambda _: self._settle(job))
+        return True
+
+    def invalidate(self, fingerprints):
+        """Cancel jobs whose category is gone from fingerprints or has a different fingerprint now."""
+        with self._lock:
+            stale = [c for c, job in self._jobs.items() if fingerprints.get(c) != job["fingerprint"]]
+            for category in stale:
+                self._discard(self._jobs.pop(category))
+        return len(stale)
+
+    def cancel_all(self):
+        return self.invalidate({})
+
+    def claim(self, category, fingerprint, meter=None):
+        """
+        The prefetched result for (category, fingerprint), waiting for it if it is still running,
+        or None when there is none or it failed. The job's usage is added to meter.
+        """
+        with self._lock:
+            job = self._jobs.get(category)
+            if job is None or job["fingerprint"] != fingerprint:
+                return None
+            del self._jobs[category]
+        result = job["future"].result()
+        if meter is not None:
+            meter.merge(job["usage"])
+        self._count("used" if result["error"] is None else "failed")
+        return result if result["error"] is None else None
+
+    def status(self):
+        """{category: "running" | "ready"} for the jobs not yet claimed or cancelled."""
+        with self._lock:
+            return {c: "ready" if job["future"].done() else "running" for c, job in self._jobs.items()}
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.counts)
+        counts["wasted_usage"] = self.wasted_usage.summary()
+        return counts
@@ -0,0 +1,270 @@
+# evaluate_batch.py
+# Headless batch mode: evaluate many client assessments without Streamlit.
+#
+#   OPENAI_API_KEY=sk-... python evaluate_batch.py prospects.csv --out-dir batch_output --workers 4
+#
+# Input is either
+#   * JSON: a list of client objects (or {"clients": [...]}) with the keys
+#       client, industry, company_size, it_size, uses_cloud, cloud_platform, priority_projects,
+#       overall_input, seed_scenario, scores {category: {sub_capability: 1-5}},
+#       comments {category: text}, inclusion {category: true/false}
+#   * CSV: one row per client with the same context columns, one "<Category>/<Sub-capability>"
+#     column per score, and optional "comment:<Category>" / "include:<Category>" columns.
+# Missing scores default to 3 and categories are included by default, like the sliders; a blank
+# include cell counts as included. Scores must be 1-5 (numeric text such as "3.0" is accepted);
+# a record with any other score is skipped and reported, and the rest of the batch still runs.
+# For every client one <client>.json (cards, fragments, consolidated roadmap, raw outputs)
+# and, when a roadmap was produced, one <client>.pptx are written to the output folder. Clients
+# whose names give the same file name get a _2, _3, ... suffix in input order.
+# Each assessment is also saved to the assessment store the app reads (--store-path, or --no-store).
+# --tier draft|final routes each stage to the tier's model (see model_routing.py) instead of --model.
+
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+from assessment_store import AssessmentStore
+from maturity_engine import STRUCTURED_MODES, BaseballCard, CompletionClient, categories_structure, evaluate_profile
+from model_routing import TIERS, ModelRouter, build_routes
+from perf_trace import NULL_TRACER, Tracer
+from request_scheduler import RequestScheduler
+from response_cache import ResponseCache
+from token_budget import format_usage
+from roadmap_export import export_to_pptx, render_roadmap_pngs
+
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+MIN_SCORE, MAX_SCORE = 1, 5
+
+
+def _score(value, label):
+    # numeric strings like "3.0" are accepted; anything outside the slider range is rejected
+    if value in (None, ""):
+        return 3
+    try:
+        score = int(float(value))
+    except (TypeError, ValueError):
+        raise ValueError(f"{label}: {value!r} is not a score") from None
+    if not MIN_SCORE <= score <= MAX_SCORE:
+        raise ValueError(f"{label}: {value!r} is outside {MIN_SCORE}-{MAX_SCORE}")
+    return score
+
+
+def profile_from_record(record):
+    """
+    Build an assessment profile (see maturity_engine) from one input record.
+    Raises ValueError listing every invalid score in the record.
+    """
+    scores, comments, inclusion, problems = {}, {}, {}, []
+    raw_scores = record.get("scores") or {}
+    raw_comments = record.get("comments") or {}
+    raw_inclusion = record.get("inclusion") or {}
+    for category, sub_caps in categories_structure.items():
+        category_scores = raw_scores.get(category) or {}
+        sub_scores = {}
+        for sub_cap in sub_caps:
+            value = category_scores.get(sub_cap, record.get(f"{category}/{sub_cap}"))
+            try:
+                sub_scores[sub_cap] = _score(value, f"{category}/{sub_cap}")
+            except ValueError as e:
+                problems.append(str(e))
+                sub_scores[sub_cap] = 3
+        scores[category] = {"average": round(sum(sub_scores.values()) / len(sub_scores), 1), "sub_capabilities": sub_scores}
+        comments[category] = str(raw_comments.get(category, record.get(f"comment:{category}", "")) or "")
+        include = raw_inclusion.get(category, record.get(f"include:{category}"))
+        if include is None or str(include).strip() == "":
+            include = True
+        inclusion[category] = include if isinstance(include, bool) else str(include).strip().lower() in TRUE_VALUES
+    if problems:
+        raise ValueError("; ".join(problems))
+    uses_cloud = str(record.get("uses_cloud", "Yes") or "Yes")
+    return {
+        "client": str(record.get("client") or "client"),
+        "industry": record.get("industry", "Homebuilding & Real Estate"),
+        "company_size": record.get("company_size", ""),
+        "it_size": record.get("it_size", ""),
+        "uses_cloud": uses_cloud,
+        "cloud_platform": record.get("cloud_platform", "") if uses_cloud == "Yes" else "",
+        "priority_projects": record.get("priority_projects", ""),
+        "overall_input": record.get("overall_input", ""),
+        "seed_scenario": record.get("seed_scenario", ""),
+        "scores": scores,
+        "comments": comments,
+        "inclusion": inclusion
+    }
+
+
+def load_profiles(path):
+    """
+    (profiles, rejected) for an input file; rejected lists (where, client, problem) for every
+    record with invalid scores, so one bad row does not stop the batch.
+    """
+    is_csv = path.lower().endswith(".csv")
+    if is_csv:
+        with open(path, newline="", encoding="utf-8-sig") as fh:
+            records = list(csv.DictReader(fh))
+    else:
+        with open(path, encoding="utf-8") as fh:
+            records = json.load(fh)
+        if isinstance(records, dict):
+            records = records.get("clients", [records])
+    profiles, rejected = [], []
+    # CSV rows are numbered by file line (the header is line 1), JSON records from 1
+    for n, record in enumerate(records, start=2 if is_csv else 1):
+        try:
+            profiles.append(profile_from_record(record))
+        except ValueError as e:
+            rejected.append((f"{'line' if is_csv else 'record'} {n}",
+                             str(record.get("client") or ""), str(e)))
+    return profiles, rejected
+
+
+def slugify(name):
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_") or "client"
+
+
+def output_names(profiles):
+    """
+    One file name (without extension) per profile, unique case-insensitively so no client's
+    output overwrites another's: repeated slugs get _2, _3, ... in input order.
+    """
+    names, taken = [], set()
+    for profile in profiles:
+        base = slugify(profile["client"])
+        name, n = base, 1
+        while name.lower() in taken:
+            n += 1
+            name = f"{base}_{n}"
+        taken.add(name.lower())
+        names.append(name)
+    return names
+
+
+def evaluate_client(llm, profile, out_dir, batched, max_in_flight, tracer=NULL_TRACER, store=None, name=None):
+    """
+    Evaluate one client and write its JSON (and PPTX) as <name>.json / <name>.pptx (default: the
+    slugified client name); also saved to store when given. Returns a one-line status dict.
+    """
+    with tracer.span("assessment", client=profile["client"]):
+        return _evaluate_client(llm, profile, out_dir, batched, max_in_flight, tracer, store,
+                                name or slugify(profile["client"]))
+
+
+def _json_default(value):
+    # BaseballCard objects are written in their canonical dict form; anything else (errors) as text
+    return value.to_dict() if isinstance(value, BaseballCard) else str(value)
+
+
+def _evaluate_client(llm, profile, out_dir, batched, max_in_flight, tracer, store, slug):
+    start = time.perf_counter()
+    try:
+        result = evaluate_profile(llm, profile, batched=batched, max_in_flight=max_in_flight, tracer=tracer)
+    except Exception as e:
+        return {"client": profile["client"], "ok": False, "errors": [("evaluate", str(e))], "usage": None,
+                "seconds": time.perf_counter() - start}
+    pptx_path = None
+    if result["consolidated_json"] is not None:
+        try:
+            with tracer.span("render_roadmaps"):
+                png_8w, png_3y = render_roadmap_pngs(result["consolidated_json"])
+            with tracer.span("export_pptx"):
+                deck = export_to_pptx(result["consolidated_json"], png_8w, png_3y, result["recommendation_data"])
+            pptx_path = os.path.join(out_dir, f"{slug}.pptx")
+            with open(pptx_path, "wb") as fh:
+                fh.write(deck.getvalue())
+        except Exception as e:
+            result["errors"].append(("pptx", str(e)))
+    if store is not None and result["recommendation_data"]:
+        try:
+            store.save(profile, result["recommendation_data"], result["category_fragments"],
+                       result["consolidated_json"], result["raw_ai_outputs"], result["usage"],
+                       mode="batched" if batched else "per-category", tier=llm.tier)
+        except Exception as e:
+            # e.g. the store file is locked by the app: this client fails, the batch carries on
+            result["errors"].append(("store", str(e)))
+    with open(os.path.join(out_dir, f"{slug}.json"), "w", encoding="utf-8") as fh:
+        json.dump({"profile": profile, **result, "pptx": pptx_path}, fh, indent=2, default=_json_default)
+    return {"client": profile["client"], "ok": not result["errors"], "errors": result["errors"],
+            "usage": result["usage"], "seconds": time.perf_counter() - start}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate many client maturity assessments without Streamlit.")
+    parser.add_argument("input", help="CSV or JSON file of client profiles")
+    parser.add_argument("--out-dir", default="batch_output")
+    parser.add_argument("--workers", type=int, default=4, help="clients evaluated in parallel")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="concurrent category calls per client")
+    parser.add_argument("--mode", choices=["per-category", "batched"], default="per-category")
+    parser.add_argument("--structured", choices=["off"] + sorted(STRUCTURED_MODES.values()), default="off")
+    parser.add_argument("--model", default="gpt-3.5-turbo", help="model for every stage when no --tier is given")
+    parser.add_argument("--tier", choices=TIERS, help="route each stage to the tier's model and max_tokens")
+    parser.add_argument("--draft-model", default="gpt-4o-mini")
+    parser.add_argument("--final-model", default="gpt-4o")
+    parser.add_argument("--log-routing", action="store_true", help="log every routed call (model, latency) to stderr")
+    parser.add_argument("--no-cache", action="store_true", help="always call the model")
+    parser.add_argument("--cache-path", default=os.path.join(".cache", "ai_responses.sqlite3"))
+    parser.add_argument("--rpm", type=float, default=500, help="requests per minute allowed for the API key")
+    parser.add_argument("--tpm", type=float, default=200000, help="tokens per minute allowed for the API key")
+    parser.add_argument("--max-retries", type=int, default=6, help="retries per call on 429/5xx/connection errors")
+    parser.add_argument("--deadline", type=float, default=120, help="seconds per call, including waits and retries")
+    parser.add_argument("--store-path", default=os.path.join(".cache", "assessments.sqlite3"),
+                        help="assessment store shared with the app")
+    parser.add_argument("--no-store", action="store_true", help="do not save assessments to the store")
+    parser.add_argument("--trace-out", help="write per-stage timing spans to this file (OpenTelemetry JSON)")
+    args = parser.parse_args(argv)
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        parser.error("OPENAI_API_KEY is not set.")
+    profiles, rejected = load_profiles(args.input)
+    for where, client, problem in rejected:
+        print(f"SKIP {client or '(no client)'} ({where}) — {problem}")
+    os.makedirs(args.out_dir, exist_ok=True)
+    cache = None if args.no_cache else ResponseCache(args.cache_path)
+    scheduler = RequestScheduler(args.rpm, args.tpm, max_retries=args.max_retries, deadline_seconds=args.deadline)
+    router = ModelRouter(build_routes(args.draft_model, args.final_model))
+    if args.log_routing:
+        logging.basicConfig(format="%(asctime)s %(name)s %(message)s")
+        logging.getLogger("maturity.routing").setLevel(logging.INFO)
+    llm = CompletionClient(OpenAI(api_key=api_key, max_retries=0), cache, use_cache=not args.no_cache,
+                           structured_mode=None if args.structured == "off" else args.structured, model=args.model,
+                           scheduler=scheduler, router=router, tier=args.tier)
+
+    tracer = Tracer() if args.trace_out else NULL_TRACER
+    store = None if args.no_store else AssessmentStore(args.store_path)
+    start = time.perf_counter()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = [pool.submit(evaluate_client, llm, profile, args.out_dir, args.mode == "batched", args.max_in_flight,
+                               tracer, store, name)
+                   for profile, name in zip(profiles, output_names(profiles))]
+        for future in futures:
+            status = future.result()
+            failed += 0 if status["ok"] else 1
+            detail = "; ".join(f"{name}: {error}" for name, error in status["errors"])
+            print(f"{'OK  ' if status['ok'] else 'FAIL'} {status['client']} ({status['seconds']:.1f}s){' — ' + detail if detail else ''}")
+            if status["usage"] is not None:
+                print(f"     {format_usage(status['usage'])}")
+    print(f"{len(profiles)} client(s) in {time.perf_counter() - start:.1f}s, {failed} with errors"
+          f"{f', {len(rejected)} skipped' if rejected else ''}. Output: {args.out_dir}")
+    stats = scheduler.stats()
+    print(f"API calls: {stats['calls']}, retries: {stats['retries']}, throttled: {stats['throttled_seconds']:.1f}s")
+    for model, v in sorted(router.model_stats().items()):
+        print(f"  {model:<24} calls={v['calls']:<4} cached={v['cached']:<4} p50={v['p50_ms']:8.1f}ms  p95={v['p95_ms']:8.1f}ms")
+    if args.trace_out:
+        with open(args.trace_out, "w", encoding="utf-8") as fh:
+            json.dump(tracer.to_otlp(), fh)
+        for name, v in sorted(tracer.stage_stats().items()):
+            print(f"  {name:<24} n={v['count']:<4} p50={v['p50_ms']:8.1f}ms  p95={v['p95_ms']:8.1f}ms")
+    return 1 if failed or rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
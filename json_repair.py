@@ -0,0 +1,301 @@
+# json_repair.py
+# Helpers for reading JSON produced by language models.
+
+import json
+import re
+
+
+_FENCE_OPEN = re.compile(r"```(?:json)?", re.IGNORECASE)
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_BARE_WORD = re.compile(r"[A-Za-z_$][\w$\-]*")
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_STRING_STOP = {'"': re.compile(r'["\\]'), "'": re.compile(r"['\\]")}
+_LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+_DECODER = json.JSONDecoder()
+# repairs that usually affect the whole document, so retrying the C decoder on sub-values is wasted
+_PERVASIVE = {"single_quotes", "unquoted_key", "python_literal"}
+# trailing commas removed in front of a strict re-parse before falling back to the tolerant pass
+_MAX_COMMA_FIXES = 16
+
+
+class _Truncated(Exception):
+    """The input ended before a value started (or mid-literal)."""
+
+
+class _RepairParser:
+    """
+    Tolerant recursive-descent JSON reader. Every character is visited once by the tolerant
+    pass; well-formed nested objects and arrays are handed to the C decoder whole. Repairs are
+    recorded by name in self.repairs instead of being applied as separate text rewrites.
+    """
+
+    def __init__(self, text, pos):
+        self.t = text
+        self.n = len(text)
+        self.pos = pos
+        self.repairs = []
+
+    def note(self, repair):
+        if repair not in self.repairs:
+            self.repairs.append(repair)
+
+    def skip_ws(self):
+        self.pos = _WHITESPACE.match(self.t, self.pos).end()
+        return self.pos >= self.n
+
+    def value(self, strict_first=True):
+        if self.skip_ws():
+            raise _Truncated()
+        c = self.t[self.pos]
+        if c == "{" or c == "[":
+            if strict_first and _PERVASIVE.isdisjoint(self.repairs):
+                # usually only one container on the path to the damage is malformed
+                try:
+                    obj, self.pos = _DECODER.raw_decode(self.t, self.pos)
+                    return obj
+                except ValueError:
+                    pass
+            return self.obj() if c == "{" else self.arr()
+        if c == '"' or c == "'":
+            return self.string(c)
+        m = _NUMBER.match(self.t, self.pos)
+        if m:
+            self.pos = m.end()
+            text = m.group(0)
+            return float(text) if any(ch in text for ch in ".eE") else int(text)
+        m = _BARE_WORD.match(self.t, self.pos)
+        if m:
+            word = m.group(0)
+            if word in _LITERALS:
+                if word[0].isupper():
+                    self.note("python_literal")
+                self.pos = m.end()
+                return _LITERALS[word]
+            if m.end() >= self.n and any(lit.startswith(word) for lit in _LITERALS):
+                self.pos = self.n
+                raise _Truncated()
+        raise ValueError(f"Unexpected character {c!r} at position {self.pos}")
+
+    def obj(self):
+        self.pos += 1
+        result = {}
+        while True:
+            if self.skip_ws():
+                self.note("truncated")
+                return result
+            c = self.t[self.pos]
+            if c == "}":
+                self.pos += 1
+                return result
+            if c == ",":
+                self.pos += 1
+                self.note("extra_comma")
+                continue
+            if c == '"' or c == "'":
+                key = self.string(c)
+            else:
+                m = _BARE_WORD.match(self.t, self.pos)
+                if not m:
+                    raise ValueError(f"Expected object key at position {self.pos}")
+                self.note("unquoted_key")
+                key = m.group(0)
+                self.pos = m.end()
+            if self.skip_ws():
+                self.note("truncated")
+                return result
+            if self.t[self.pos] != ":":
+                raise ValueError(f"Expected ':' at position {self.pos}")
+            self.pos += 1
+            try:
+                result[str(key)] = self.value()
+            except _Truncated:
+                self.note("truncated")
+                return result
+            if self.skip_ws():
+                self.note("truncated")
+                return result
+            c = self.t[self.pos]
+            if c == ",":
+                self.pos += 1
+                if not self.skip_ws() and self.t[self.pos] == "}":
+                    self.note("trailing_comma")
+            elif c != "}":
+                self.note("missing_comma")
+
+    def arr(self):
+        self.pos += 1
+        result = []
+        while True:
+            if self.skip_ws():
+                self.note("truncated")
+                return result
+            c = self.t[self.pos]
+            if c == "]":
+                self.pos += 1
+                return result
+            if c == ",":
+                self.pos += 1
+                self.note("extra_comma")
+                continue
+            try:
+                result.append(self.value())
+            except _Truncated:
+                self.note("truncated")
+                return result
+            if self.skip_ws():
+                self.note("truncated")
+                return result
+            c = self.t[self.pos]
+            if c == ",":
+                self.pos += 1
+                if not self.skip_ws() and self.t[self.pos] == "]":
+                    self.note("trailing_comma")
+            elif c != "]":
+                self.note("missing_comma")
+
+    def string(self, quote):
+        t, n = self.t, self.n
+        start = i = self.pos + 1
+        stop = _STRING_STOP[quote]
+        if quote == "'":
+            self.note("single_quotes")
+        while True:
+            m = stop.search(t, i)
+            if m is None:
+                i = n
+                break
+            i = m.start()
+            if t[i] == "\\":
+                i += 2
+                continue
+            if quote == '"':
+                break
+            # a single quote only closes the string if structure follows (keeps apostrophes)
+            j = _WHITESPACE.match(t, i + 1).end()
+            if j >= n or t[j] in ",:}]":
+                break
+            i += 1
+        if i >= n:
+            self.note("truncated")
+            segment = t[start:n]
+            if segment.endswith("\\") and not segment.endswith("\\\\"):
+                segment = segment[:-1]
+            self.pos = n
+        else:
+            segment = t[start:i]
+            self.pos = i + 1
+        if "\\" not in segment:
+            return segment
+        if quote == "'":
+            segment = segment.replace("\\'", "'").replace('"', '\\"')
+        try:
+            return json.loads('"' + segment + '"', strict=False)
+        except ValueError:
+            return segment
+
+
+def repair_json(text):
+    """
+    Parse model output that is meant to be JSON, tolerating code fences, leading/trailing prose,
+    trailing or missing commas, single-quoted strings, unquoted keys, Python literals and a
+    truncated tail. Strict json.loads of the whole (unfenced) text comes first, so any clean
+    top-level value is returned as is; then the C decoder from the first brace or bracket
+    (dropping trailing commas it stops at), then at most one tolerant pass.
+    Returns (obj, repairs) where repairs lists the fixes that were needed; raises ValueError.
+    """
+    if text is None:
+        raise ValueError("No text provided")
+    t = str(text)
+
+    # fast path: the whole (possibly fenced) output is strict JSON, whatever its top-level type
+    stripped = t.strip()
+    fenced = stripped.startswith("```") and stripped.endswith("```") and len(stripped) > 6
+    if fenced:
+        stripped = _FENCE_OPEN.sub("", stripped[:-3], count=1).strip()
+    try:
+        return json.loads(stripped), ["code_fence"] if fenced else []
+    except ValueError:
+        pass
+
+    # otherwise start at the first brace or bracket. A bracketed value that ends before the first
+    # brace is taken to be prose ("see [1]: {...}"), so the object is preferred when it parses.
+    starts = sorted(i for i in (t.find("{"), t.find("[")) if i != -1)
+    if not starts:
+        raise ValueError("Could not parse JSON from the model output.")
+    try:
+        result = _parse_from(t, starts[0])
+    except ValueError as e:
+        if len(starts) == 1:
+            raise
+        return _parse_from(t, starts[1])[:2]
+    if len(starts) == 2 and result[2] <= starts[1]:
+        try:
+            return _parse_from(t, starts[1])[:2]
+        except ValueError:
+            pass
+    return result[:2]
+
+
+def _parse_from(t, start):
+    # (obj, repairs, end offset) for the value starting at start; raises ValueError
+    repairs = []
+    prefix = t[:start]
+    if "```" in prefix:
+        repairs.append("code_fence")
+        prefix = _FENCE_OPEN.sub("", prefix)
+    if prefix.strip():
+        repairs.append("leading_text")
+
+    obj, end = _strict_from(t, start, repairs)
+    if end is None:
+        parser = _RepairParser(t, start)
+        try:
+            obj = parser.value(strict_first=False)
+        except (ValueError, _Truncated) as e:
+            raise ValueError(f"Could not parse JSON from the model output: {e}")
+        repairs.extend(parser.repairs)
+        end = parser.pos
+
+    suffix = t[end:]
+    if "```" in suffix:
+        if "code_fence" not in repairs:
+            repairs.append("code_fence")
+        suffix = suffix.replace("```", "")
+    if suffix.strip():
+        repairs.append("trailing_text")
+    return obj, repairs, end
+
+
+def _strict_from(t, start, repairs):
+    # C decoder from start, dropping up to _MAX_COMMA_FIXES trailing commas at the positions it
+    # reports (they are outside strings by construction). Returns (obj, end) or (None, None).
+    text = t
+    for _ in range(_MAX_COMMA_FIXES + 1):
+        try:
+            obj, end = _DECODER.raw_decode(text, start)
+        except json.JSONDecodeError as e:
+            comma = len(text[:e.pos].rstrip()) - 1
+            if e.pos >= len(text) or text[e.pos] not in "}]" or comma <= start or text[comma] != ",":
+                return None, None
+            text = text[:comma] + text[comma + 1:]
+            continue
+        if text is not t:
+            repairs.append("trailing_comma")
+            # end is an offset into the shortened text; map it back by the number of commas removed
+            end += len(t) - len(text)
+        return obj, end
+    return None, None
+
+
+def parse_partial_json(text):
+    """
+    Best-effort parse of a JSON object that is still being streamed: open strings and
+    containers are closed and a dangling key is dropped. Returns None if nothing usable yet.
+    """
+    if not text or "{" not in text:
+        return None
+    try:
+        obj, _ = repair_json(text)
+    except ValueError:
+        return None
+    return obj if isinstance(obj, dict) else None
@@ -0,0 +1,934 @@
+# maturity_engine.py
+# Streamlit-free evaluation logic shared by the AI7_v2 app and the batch CLI:
+# prompt construction, model calls (cache / structured output / streaming),
+# JSON parsing + card normalization, and roadmap consolidation.
+#
+# Generated cards are kept as normalize_baseball_card dicts (stored, exported to JSON) and as a
+# BaseballCard built once at parse time, which display and export read by attribute.
+#
+# An assessment "profile" is a plain dict:
+#   industry, company_size, it_size, uses_cloud, cloud_platform, priority_projects,
+#   overall_input, seed_scenario   -> sidebar / free-text context (strings)
+#   scores     {category: {"average": float, "sub_capabilities": {sub_cap: int}}}
+#   comments   {category: str}
+#   inclusion  {category: bool}
+
+import copy
+import hashlib
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import closing
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from json_repair import parse_partial_json, repair_json
+from perf_trace import NULL_TRACER
+from response_cache import make_cache_key
+from token_budget import UsageMeter, context_window, count_tokens
+
+# -------------------- Structures --------------------
+levels = {1: "Greenfield", 2: "Emerging", 3: "Developing", 4: "Established", 5: "Optimized"}
+categories_structure = {
+    "Cloud Architecture": ["Infrastructure Design","Scalability & Performance","Multi-cloud Strategy","Cost Optimization","Disaster Recovery","Service Architecture"],
+    "Data Management": ["Data Quality","Data Integration","Master Data Management","Data Lifecycle","Data Storage Strategy","Real-time Processing"],
+    "Data Visualization & Insights": ["Dashboard Design","Data Storytelling","Interactive Visualizations","Advanced Analytics Techniques","Self-Service Analytics","Insight Communication"],
+    "AI/ML Integration": ["Model Development","MLOps & Deployment","AI Ethics & Bias","Business Integration","AutoML Capabilities","AI Governance"],
+    "Governance & Security": ["Data Privacy","Compliance Management","Access Controls","Risk Management","Audit & Monitoring","Policy Enforcement"],
+    "Business Engagement": ["Stakeholder Alignment","Change Management","Skills & Training","Value Measurement","Business Process Integration","Strategic Planning"]
+}
+
+SPRINTS = ["sprint1", "sprint2", "sprint3", "sprint4"]
+YEARS = ["year1", "year2", "year3"]
+
+# -------------------- Prompt templates --------------------
+# Build a strong prompt template that enforces required JSON schema
+card_structure = """{
+  "executive": {
+    "summary": "2-3 sentence summary",
+    "recommendation": "2+ sentence justification",
+    "activities": ["Activity 1", "Activity 2", "..."],
+    "focus_8w": ["Sprint1 item", "Sprint2 item", "..."],
+    "plan_3y": ["Year1 item", "Year2 item", "..."],
+    "assumptions": ["Assumption 1", "..."]
+  },
+  "technical": {
+    "summary": "2-3 sentence summary",
+    "recommendation": "2+ sentence technical justification",
+    "activities": ["Tactic 1", "Tactic 2", "..."],
+    "focus_8w": ["Sprint-level technical task", "..."],
+    "plan_3y": ["Year1 technical plan", "..."],
+    "assumptions": ["Assumption A", "..."],
+    "team": ["Role: count", "..."]
+  }
+}"""
+generation_schema = """
+You are an experienced CTO advisor. Return ONLY valid JSON that exactly follows this structure (no explanatory text, no markdown fences):
+
+""" + card_structure + """
+
+Make sure:
+- All keys are double quoted.
+- All lists are JSON arrays.
+- Keep entries concise.
+- Use the inputs below for context.
+"""
+
+# Batched mode: one request for all categories, answer keyed by category name
+batched_generation_schema = """
+You are an experienced CTO advisor. Return ONLY valid JSON (no explanatory text, no markdown fences):
+one object whose keys are exactly the category names listed under "Categories" below, and whose
+value for each category exactly follows this structure:
+
+""" + card_structure + """
+
+Make sure:
+- All keys are double quoted.
+- All lists are JSON arrays.
+- Keep entries concise.
+- Tailor each category's cards to that category's scores and comments.
+- Use the inputs below for context.
+"""
+
+
+# Same structure as a JSON schema, for models that support structured outputs / function calling
+_string_list = {"type": "array", "items": {"type": "string"}}
+_card_fields = {
+    "summary": {"type": "string"},
+    "recommendation": {"type": "string"},
+    "activities": _string_list,
+    "focus_8w": _string_list,
+    "plan_3y": _string_list,
+    "assumptions": _string_list
+}
+BASEBALL_CARD_SCHEMA = {
+    "name": "baseball_cards",
+    "description": "Executive and technical baseball cards for one maturity category.",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "executive": {"type": "object", "properties": _card_fields,
+                          "required": list(_card_fields), "additionalProperties": False},
+            "technical": {"type": "object", "properties": {**_card_fields, "team": _string_list},
+                          "required": list(_card_fields) + ["team"], "additionalProperties": False}
+        },
+        "required": ["executive", "technical"],
+        "additionalProperties": False
+    }
+}
+
+
+def batched_card_schema(categories):
+    return {
+        "name": "baseball_cards_by_category",
+        "description": "Executive and technical baseball cards for each maturity category.",
+        "schema": {
+            "type": "object",
+            "properties": {category: BASEBALL_CARD_SCHEMA["schema"] for category in categories},
+            "required": list(categories),
+            "additionalProperties": False
+        }
+    }
+
+
+# -------------------- OpenAI access --------------------
+STRUCTURED_MODES = {"JSON schema": "json_schema", "Function calling": "tool"}
+
+# (model, mode) pairs the API rejected; remembered for the process so we stop asking for them
+_structured_unsupported = set()
+
+
+class CompletionClient:
+    """
+    Wraps an OpenAI client with the response cache and the optional structured-output mode
+    ("json_schema" or "tool"). Models that reject the structured mode are retried free-form,
+    so callers always get text back for the repair/normalize path. When a RequestScheduler is
+    given, every request goes through its rate limits, retries and deadline. Prompts are counted
+    against the model's context window (max_tokens is clamped to what is left) and, on a client
+    returned by metered(), every call is recorded in a UsageMeter. With a ModelRouter and a tier
+    (see routed()), calls that do not name a model are routed per stage. Safe to share between threads.
+    """
+
+    def __init__(self, client=None, cache=None, use_cache=True, structured_mode=None, model="gpt-3.5-turbo",
+                 client_factory=None, scheduler=None, router=None, tier=None):
+        self.client = client
+        # called once on first use when no client was given (keeps the openai import off the startup path)
+        self.client_factory = client_factory
+        self._client_lock = threading.Lock()
+        self.cache = cache
+        self.use_cache = use_cache and cache is not None
+        self.structured_mode = structured_mode
+        self.model = model
+        self.scheduler = scheduler
+        self.router = router
+        self.tier = tier
+        self.usage = None
+
+    def metered(self, meter):
+        """Copy of this client (same OpenAI client, cache and scheduler) that records calls in meter."""
+        metered = copy.copy(self)
+        metered.usage = meter
+        return metered
+
+    def routed(self, tier):
+        """Copy of this client whose calls are routed through self.router for tier ("draft" / "final")."""
+        routed = copy.copy(self)
+        routed.tier = tier
+        return routed
+
+    def model_for(self, stage):
+        """Model a call for stage goes to (when the caller does not name one)."""
+        return self._route(stage, None, 0)[0]
+
+    def _route(self, stage, model, max_tokens):
+        if model is not None:
+            return model, max_tokens
+        if self.router is None or self.tier is None:
+            return self.model, max_tokens
+        return self.router.route(self.tier, stage, self.model, max_tokens)
+
+    def _get_client(self):
+        if self.client is None and self.client_factory is not None:
+            with self._client_lock:
+                if self.client is None:
+                    self.client = self.client_factory()
+        if self.client is None:
+            raise RuntimeError("OpenAI client is not configured. Add OPENAI_API_KEY.")
+        return self.client
+
+    def _mode_for(self, model, schema):
+        if schema is None or (model, self.structured_mode) in _structured_unsupported:
+            return None
+        return self.structured_mode
+
+    def _cached(self, key, use_cache):
+        return self.cache.get(key) if use_cache else None
+
+    def _prepare(self, prompt, max_tokens, temperature, model, schema, stage):
+        """(model, max_tokens, mode, prompt_tokens, cache key) of one request after routing and budgeting."""
+        model, max_tokens = self._route(stage, model, max_tokens)
+        mode = self._mode_for(model, schema)
+        prompt_tokens, max_tokens = self._budget(prompt, model, max_tokens)
+        return model, max_tokens, mode, prompt_tokens, make_cache_key(model, prompt, temperature, max_tokens, extra=mode)
+
+    def forget(self, prompt, max_tokens=1400, temperature=0.6, model=None, schema=None, stage="completion"):
+        """
+        Drop the cached response to this request (same arguments as call_openai), e.g. one the
+        caller could not parse, so the next run asks the model again instead of replaying it.
+        """
+        if self.cache is not None:
+            self.cache.discard(self._prepare(prompt, max_tokens, temperature, model, schema, stage)[4])
+
+    def _budget(self, prompt, model, max_tokens):
+        """Prompt token count and max_tokens clamped to the model's context window."""
+        prompt_tokens = count_tokens(prompt, model)
+        room = context_window(model) - prompt_tokens
+        if room < min(max_tokens, 256):
+            raise ValueError(f"Prompt is {prompt_tokens:,} tokens; {model} allows {context_window(model):,} in total.")
+        return prompt_tokens, min(max_tokens, room)
+
+    def _record(self, stage, model, max_tokens, prompt_tokens, content, usage, seconds, cached=False):
+        if self.router is not None and self.tier is not None:
+            self.router.observe(self.tier, stage, model, max_tokens, seconds, cached)
+        if self.usage is None:
+            return
+        if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+            self.usage.record(stage, model, usage.prompt_tokens, usage.completion_tokens, seconds)
+        else:
+            self.usage.record(stage, model, prompt_tokens, count_tokens(content, model), seconds,
+                              cached=cached, estimated=True)
+
+    def _create(self, client, kwargs, prompt_tokens):
+        if self.scheduler is None:
+            return client.chat.completions.create(**kwargs)
+        # tokens/min limits count the requested max_tokens, not just the prompt
+        return self.scheduler.run(
+            lambda timeout: client.chat.completions.create(timeout=timeout, **kwargs),
+            estimated_tokens=prompt_tokens + kwargs["max_tokens"]
+        )
+
+    def call_openai(self, prompt, max_tokens=1400, temperature=0.6, model=None, use_cache=None, schema=None,
+                    stage="completion"):
+        use_cache = self.use_cache if use_cache is None else (use_cache and self.cache is not None)
+        model, max_tokens, mode, prompt_tokens, key = self._prepare(prompt, max_tokens, temperature, model, schema,
+                                                                    stage)
+        cached = self._cached(key, use_cache)
+        if cached is not None:
+            self._record(stage, model, max_tokens, prompt_tokens, cached, None, 0.0, cached=True)
+            return cached
+        client = self._get_client()
+        start = time.perf_counter()
+        try:
+            resp = self._create(client, completion_kwargs(prompt, max_tokens, temperature, model, schema, mode),
+                                prompt_tokens)
+        except Exception as e:
+            if mode is None or not _is_bad_request(e):
+                raise
+            # model does not support this structured-output mode: retry free-form (repair path)
+            _structured_unsupported.add((model, mode))
+            return self.call_openai(prompt, max_tokens, temperature, model, use_cache, schema, stage)
+        choice = resp.choices[0]
+        message = choice.message
+        if getattr(message, "tool_calls", None):
+            content = str(message.tool_calls[0].function.arguments)
+        else:
+            content = str(message.content)
+        self._record(stage, model, max_tokens, prompt_tokens, content, getattr(resp, "usage", None),
+                     time.perf_counter() - start)
+        # a response cut off at max_tokens is returned (the repair path may salvage it) but never cached
+        if use_cache and getattr(choice, "finish_reason", None) != "length":
+            self.cache.put(key, content)
+        return content
+
+    def stream_openai(self, prompt, max_tokens=1400, temperature=0.6, model=None, use_cache=None, schema=None,
+                      stage="completion"):
+        """
+        Streaming variant of call_openai: yields the accumulated text each time a chunk arrives.
+        The last value yielded is the complete response (which is also cached unless it was truncated).
+        """
+        use_cache = self.use_cache if use_cache is None else (use_cache and self.cache is not None)
+        model, max_tokens, mode, prompt_tokens, key = self._prepare(prompt, max_tokens, temperature, model, schema,
+                                                                    stage)
+        cached = self._cached(key, use_cache)
+        if cached is not None:
+            self._record(stage, model, max_tokens, prompt_tokens, cached, None, 0.0, cached=True)
+            yield cached
+            return
+        client = self._get_client()
+        start = time.perf_counter()
+        try:
+            # only opening the stream is retried; a failure mid-stream surfaces to the caller
+            stream = self._create(client, dict(stream=True, stream_options={"include_usage": True},
+                                               **completion_kwargs(prompt, max_tokens, temperature, model, schema, mode)),
+                                  prompt_tokens)
+        except Exception as e:
+            if mode is None or not _is_bad_request(e):
+                raise
+            _structured_unsupported.add((model, mode))
+            yield from self.stream_openai(prompt, max_tokens, temperature, model, use_cache, schema, stage)
+            return
+        parts = []
+        usage = None
+        finish_reason = None
+        finished = False
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    # with include_usage the final chunk carries token usage and no choices
+                    usage = getattr(chunk, "usage", None) or usage
+                    continue
+                finish_reason = getattr(chunk.choices[0], "finish_reason", None) or finish_reason
+                delta = chunk.choices[0].delta
+                # function-calling mode streams the JSON as tool-call argument fragments
+                text = delta.tool_calls[0].function.arguments if getattr(delta, "tool_calls", None) else delta.content
+                if text:
+                    parts.append(text)
+                    yield "".join(parts)
+            finished = True
+        finally:
+            if not finished:
+                # stopped mid-stream (the consumer closed us, e.g. a cancelled prefetch, or the stream failed):
+                # the prompt and the tokens received so far are still billed
+                self._record(stage, model, max_tokens, prompt_tokens, "".join(parts), usage,
+                             time.perf_counter() - start)
+                if hasattr(stream, "close"):
+                    stream.close()
+        content = "".join(parts)
+        self._record(stage, model, max_tokens, prompt_tokens, content, usage, time.perf_counter() - start)
+        if use_cache and finish_reason != "length":
+            self.cache.put(key, content)
+        if not parts:
+            yield content
+
+
+def _is_bad_request(error):
+    # openai is already imported once a request has failed, so this import is free
+    from openai import BadRequestError
+    return isinstance(error, BadRequestError)
+
+
+def completion_kwargs(prompt, max_tokens, temperature, model, schema=None, mode=None):
+    """
+    Arguments for client.chat.completions.create. schema is {"name", "description", "schema"};
+    mode picks how it is sent: "json_schema" (response_format) or "tool" (forced function call).
+    """
+    kwargs = dict(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+    if schema is not None and mode == "json_schema":
+        kwargs["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": schema["name"], "schema": schema["schema"], "strict": True}
+        }
+    elif schema is not None and mode == "tool":
+        kwargs["tools"] = [{
+            "type": "function",
+            "function": {"name": schema["name"], "description": schema["description"], "parameters": schema["schema"]}
+        }]
+        kwargs["tool_choice"] = {"type": "function", "function": {"name": schema["name"]}}
+    return kwargs
+
+# -------------------- JSON parsing and card normalization --------------------
+
+def try_load_json(text):
+    """
+    Robust JSON loader (single tolerant pass, see json_repair.repair_json).
+    Returns a Python object (usually dict) or raises ValueError.
+    """
+    return repair_json(text)[0]
+
+def normalize_baseball_card(parsed):
+    """
+    Ensure returned object has 'executive' and 'technical' keys.
+    Accept a few common variants. Returns normalized dict:
+    { "executive": {...}, "technical": {...} }
+    """
+    if parsed is None:
+        return {"executive": {}, "technical": {}}
+    if isinstance(parsed, str):
+        # cannot parse — return empty and keep raw elsewhere
+        return {"executive": {}, "technical": {}}
+    if isinstance(parsed, list):
+        # unexpected — place in executive.summary
+        return {"executive": {"summary": " ".join(map(str, parsed))}, "technical": {}}
+    if isinstance(parsed, dict):
+        keys_lower = {k.lower(): k for k in parsed.keys()}
+        # If already has exec/technical
+        if "executive" in parsed and "technical" in parsed:
+            return {
+                "executive": parsed.get("executive") or {},
+                "technical": parsed.get("technical") or {}
+            }
+        # Accept capitalized variants
+        if "Executive" in parsed or "Technical" in parsed:
+            return {
+                "executive": parsed.get("Executive") or parsed.get("executive") or {},
+                "technical": parsed.get("Technical") or parsed.get("technical") or {}
+            }
+        # Some outputs may return top-level fields for executive only
+        # Heuristic: if keys include summary/recommendation/activities -> treat as executive
+        exec_keys = {"summary", "recommendation", "activities", "project_activities", "focus_8w", "plan_3y", "assumptions", "team"}
+        lower_keys = {k.lower() for k in parsed.keys()}
+        if lower_keys & exec_keys:
+            # map fields to canonical names if necessary
+            exec_block = {}
+            tech_block = {}
+            for k, v in parsed.items():
+                kl = k.lower()
+                if kl in exec_keys:
+                    # unify 'project_activities' -> 'activities'
+                    if kl == "project_activities":
+                        exec_block.setdefault("activities", v)
+                    else:
+                        exec_block[kl] = v
+                else:
+                    # put other keys under exec by default
+                    exec_block[k] = v
+            return {"executive": exec_block, "technical": tech_block}
+        # If parsed contains exactly two top-level keys that look like cards (e.g., 'Exec' and 'Tech'), map them
+        if len(parsed.keys()) <= 4:
+            # attempt mapping by inspection
+            exec_block = parsed.get("executive") or parsed.get("Executive") or {}
+            tech_block = parsed.get("technical") or parsed.get("Technical") or {}
+            return {"executive": exec_block, "technical": tech_block}
+        # fallback: put entire parsed content into executive.summary as string
+        return {"executive": {"summary": json.dumps(parsed)[:1000]}, "technical": {}}
+    # else fallback
+    return {"executive": {}, "technical": {}}
+
+
+def get_field(case_insensitive_dict, *candidates):
+    """
+    Helper: given a dict, return first existing field among candidates (case-insensitive).
+    """
+    if not isinstance(case_insensitive_dict, dict):
+        return None
+    for cand in candidates:
+        for k in case_insensitive_dict.keys():
+            if k.lower() == cand.lower():
+                return case_insensitive_dict[k]
+    return None
+
+
+def _as_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(map(str, value))
+    return str(value)
+
+
+def _as_list(value):
+    if value is None or value == "":
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    if isinstance(value, dict):
+        return [f"{k}: {v}" for k, v in value.items()]
+    return [value]
+
+
+@dataclass(slots=True)
+class CardBlock:
+    """One side (executive or technical) of a baseball card, with canonical field names."""
+    summary: str = ""
+    recommendation: str = ""
+    activities: list = field(default_factory=list)
+    focus_8w: list = field(default_factory=list)
+    plan_3y: list = field(default_factory=list)
+    assumptions: list = field(default_factory=list)
+    team: list = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, block):
+        """
+        From a normalized card block: keys matched case-insensitively (first spelling wins, as
+        with get_field), project_activities accepted for activities, list fields coerced to lists.
+        None for a missing or empty block.
+        """
+        if not isinstance(block, dict) or not block:
+            return None
+        fields = {}
+        for key, value in block.items():
+            fields.setdefault(str(key).lower(), value)
+        activities = fields["activities"] if "activities" in fields else fields.get("project_activities")
+        return cls(summary=_as_text(fields.get("summary")), recommendation=_as_text(fields.get("recommendation")),
+                   activities=_as_list(activities), focus_8w=_as_list(fields.get("focus_8w")),
+                   plan_3y=_as_list(fields.get("plan_3y")), assumptions=_as_list(fields.get("assumptions")),
+                   team=_as_list(fields.get("team")))
+
+
+@dataclass(slots=True)
+class BaseballCard:
+    executive: Optional[CardBlock] = None
+    technical: Optional[CardBlock] = None
+
+    @classmethod
+    def from_normalized(cls, normalized):
+        """From normalize_baseball_card output (or a partial card while streaming)."""
+        normalized = normalized if isinstance(normalized, dict) else {}
+        return cls(CardBlock.from_dict(normalized.get("executive")), CardBlock.from_dict(normalized.get("technical")))
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def item_card(item):
+    """
+    The BaseballCard of a recommendation_data item. Items loaded from storage only carry
+    data_normalized, so their card is built on first use and kept on the item.
+    """
+    if item.get("card") is None:
+        item["card"] = BaseballCard.from_normalized(item.get("data_normalized"))
+    return item["card"]
+
+# -------------------- Prompt construction --------------------
+
+def categories_to_process(profile):
+    """
+    Categories to evaluate: include check OR comment present -> included.
+    """
+    return [
+        c for c in categories_structure.keys()
+        if profile["inclusion"].get(c) or (profile["comments"].get(c, "").strip() != "")
+    ]
+
+
+def _category_context(profile, category):
+    include_flag = profile["inclusion"].get(category, False)
+    comment_text = profile["comments"].get(category, "").strip()
+    scores = profile["scores"].get(category, {})
+    avg = scores.get("average")
+    return f"""Category: {category}
+Included flag: {'Yes' if include_flag else 'No'}
+Category maturity average (if included): {avg if include_flag else 'N/A'}
+Sub-capability scores: {json.dumps(scores.get('sub_capabilities', {}))}
+Category comments: {comment_text if comment_text else 'None'}"""
+
+
+def build_category_prompt(profile, category):
+    """
+    Build the per-category generation prompt (schema + company context).
+    """
+    p = profile
+    return generation_schema + f"""
+
+Context:
+Industry: {p['industry']}
+Company size: {p['company_size']}
+IT department size: {p['it_size']}
+Uses cloud: {p['uses_cloud']} {p['cloud_platform']}
+Priority projects: {p['priority_projects'] if p['priority_projects'] else 'None'}
+{_category_context(p, category)}
+Overall context: {p['overall_input'] if p['overall_input'] else 'None'}
+Seed scenario: {p['seed_scenario'] if p['seed_scenario'] else 'None'}
+
+Return the JSON only, exactly matching the schema at the top.
+"""
+
+
+def build_batched_prompt(profile, categories):
+    """
+    One prompt for all categories: the shared company context is sent once,
+    followed by each category's scores and comments.
+    """
+    p = profile
+    sections = [_category_context(p, category) for category in categories]
+    return batched_generation_schema + f"""
+
+Context:
+Industry: {p['industry']}
+Company size: {p['company_size']}
+IT department size: {p['it_size']}
+Uses cloud: {p['uses_cloud']} {p['cloud_platform']}
+Priority projects: {p['priority_projects'] if p['priority_projects'] else 'None'}
+Overall context: {p['overall_input'] if p['overall_input'] else 'None'}
+Seed scenario: {p['seed_scenario'] if p['seed_scenario'] else 'None'}
+
+Categories:
+""" + "\n\n".join(sections) + """
+
+Return the JSON only: one key per category above, each matching the structure at the top.
+"""
+
+
+# tokens allowed for the serialized fragments in the consolidation prompt
+FRAGMENT_TOKEN_BUDGET = 1500
+
+
+def serialize_fragments(fragments, budget_tokens=FRAGMENT_TOKEN_BUDGET, model="gpt-3.5-turbo"):
+    """
+    JSON for the consolidation prompt. Pretty-printed while it fits the budget; otherwise compact
+    separators (indentation is a large share of the tokens), then the shortest per-category
+    focus_8w / plan_3y lists that fit (earliest items are kept, as they are the highest priority).
+    """
+    text = json.dumps(fragments, indent=2, ensure_ascii=False)
+    if count_tokens(text, model) <= budget_tokens:
+        return text
+    text = json.dumps(fragments, separators=(",", ":"), ensure_ascii=False)
+    keep = max((len(f.get(k) or []) for f in fragments for k in ("focus_8w", "plan_3y")), default=0)
+    while count_tokens(text, model) > budget_tokens and keep > 1:
+        keep -= 1
+        trimmed = [{**f, "focus_8w": (f.get("focus_8w") or [])[:keep], "plan_3y": (f.get("plan_3y") or [])[:keep]}
+                   for f in fragments]
+        text = json.dumps(trimmed, separators=(",", ":"), ensure_ascii=False)
+    return text
+
+
+def build_consolidation_prompt(fragments, budget_tokens=FRAGMENT_TOKEN_BUDGET, model="gpt-3.5-turbo"):
+    return f"""
+You are a CTO. Consolidate these category-level fragments into ONE JSON roadmap. Return ONLY JSON matching this structure:
+
+{{
+  "focus_8w": {{
+    "sprint1": ["..."],
+    "sprint2": ["..."],
+    "sprint3": ["..."],
+    "sprint4": ["..."]
+  }},
+  "plan_3y": {{
+    "year1": ["..."],
+    "year2": ["..."],
+    "year3": ["..."]
+  }}
+}}
+
+Category fragments:
+{serialize_fragments(fragments, budget_tokens, model)}
+
+Distribute initiatives sensibly across sprints and years. Return JSON only.
+"""
+
+# -------------------- Incremental regeneration --------------------
+
+def category_fingerprint(profile, category, tier=None):
+    """
+    Hash of everything a category's card depends on: its scores, comment and include flag
+    plus the shared sidebar context (exactly the inputs of build_category_prompt), and the
+    model tier it was generated with, so a draft card is not kept as a final one.
+    """
+    payload = build_category_prompt(profile, category) + f"\n--tier={tier or ''}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fragments_fingerprint(fragments, tier=None):
+    """Hash of the consolidation input (and model tier); the roadmap only needs re-consolidating when this changes."""
+    payload = json.dumps([fragments, tier], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def dirty_categories(profile, categories, previous_fingerprints, tier=None):
+    """
+    (categories whose inputs changed since previous_fingerprints, {category: fingerprint} for all of them).
+    """
+    fingerprints = {category: category_fingerprint(profile, category, tier) for category in categories}
+    return [c for c in categories if previous_fingerprints.get(c) != fingerprints[c]], fingerprints
+
+
+def merge_results(categories, previous, fresh, dirty):
+    """
+    Per-category stored items in categories order: fresh (just regenerated) entries for dirty
+    categories, previous ones for the rest. Both are lists of dicts with a "category" key; a dirty
+    category whose regeneration failed is dropped rather than shown with stale content.
+    """
+    by_category = {item["category"]: item for item in previous if item["category"] not in dirty}
+    by_category.update((item["category"], item) for item in fresh)
+    return [by_category[c] for c in categories if c in by_category]
+
+
+# -------------------- Generation --------------------
+
+def estimate_tokens(text, model="gpt-3.5-turbo"):
+    return max(1, count_tokens(text, model))
+
+
+def generate_category_card(llm, category, prompt, on_progress=None, tracer=NULL_TRACER):
+    """
+    Worker for one category: call the model and parse the card.
+    Runs on a pool thread, so it must not touch UI state — errors are returned, not raised.
+    When on_progress is given the response is streamed and on_progress(category, text_so_far) is called per chunk.
+    """
+    raw = None
+    try:
+        with tracer.span("card.model_call", category=category, model=llm.model_for("card"),
+                         streamed=on_progress is not None):
+            if on_progress is None:
+                raw = llm.call_openai(prompt, max_tokens=1000, temperature=0.4, schema=BASEBALL_CARD_SCHEMA,
+                                      stage="card")
+            else:
+                # closed as soon as on_progress raises, so a stopped stream records its usage right away
+                with closing(llm.stream_openai(prompt, max_tokens=1000, temperature=0.4, schema=BASEBALL_CARD_SCHEMA,
+                                               stage="card")) as stream:
+                    for raw in stream:
+                        on_progress(category, raw)
+        with tracer.span("card.parse_json", category=category):
+            parsed, repairs = repair_json(raw)
+            normalized = normalize_baseball_card(parsed)
+            card = BaseballCard.from_normalized(normalized)
+        return {"category": category, "raw": raw, "parsed": parsed, "repairs": repairs,
+                "normalized": normalized, "card": card, "error": None}
+    except Exception as e:
+        if raw is not None:
+            # do not replay an unusable response from the cache on the next run
+            llm.forget(prompt, max_tokens=1000, temperature=0.4, schema=BASEBALL_CARD_SCHEMA, stage="card")
+        return {"category": category, "raw": raw, "parsed": None, "repairs": [], "normalized": None, "error": e}
+
+
+def drain_progress(futures, updates, publish):
+    """
+    Wait for futures while forwarding the latest queued (key, text) per key to publish(key, text).
+    Runs on the calling thread, so publish may touch UI state (e.g. Streamlit placeholders).
+    """
+    pending = set(futures)
+    while pending:
+        _, pending = wait(pending, timeout=0.1)
+        latest = {}
+        while True:
+            try:
+                key, text = updates.get_nowait()
+            except queue.Empty:
+                break
+            latest[key] = text
+        for key, text in latest.items():
+            publish(key, text)
+
+
+def run_category_generation(llm, prompts, max_workers, on_update=None, tracer=NULL_TRACER):
+    """
+    Fan out all (category, prompt) pairs with at most max_workers calls in flight.
+    Returns one result per prompt, in the same order as the input.
+    If on_update is given, responses are streamed and on_update(category, partial_card) is called
+    on the calling thread (never from a worker) with the latest partially parsed card per category.
+    """
+    if not prompts:
+        return []
+    updates = queue.Queue() if on_update is not None else None
+    report = (lambda category, text: updates.put((category, text))) if updates is not None else None
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(prompts)))) as pool:
+        worker = tracer.wrap(generate_category_card)
+        futures = [pool.submit(worker, llm, category, prompt, report, tracer) for category, prompt in prompts]
+        if updates is not None:
+            drain_progress(futures, updates, lambda category, text: on_update(category, parse_partial_json(text)))
+        return [f.result() for f in futures]
+
+
+def generate_batched_cards(llm, categories, prompt, on_progress=None, tracer=NULL_TRACER):
+    """
+    Worker for batched mode: one call for all categories, split into per-category results
+    shaped like generate_category_card's. A failed call fails every category with the same error.
+    """
+    max_tokens = min(4000, 900 * len(categories))
+    schema = batched_card_schema(categories)
+    raw = None
+    try:
+        with tracer.span("batched.model_call", categories=len(categories), model=llm.model_for("batched"),
+                         streamed=on_progress is not None):
+            if on_progress is None:
+                raw = llm.call_openai(prompt, max_tokens=max_tokens, temperature=0.4, schema=schema, stage="batched")
+            else:
+                # closed as soon as on_progress raises, like generate_category_card's stream
+                with closing(llm.stream_openai(prompt, max_tokens=max_tokens, temperature=0.4, schema=schema,
+                                               stage="batched")) as stream:
+                    for raw in stream:
+                        on_progress("batched", raw)
+        with tracer.span("batched.parse_json", categories=len(categories)):
+            parsed, repairs = repair_json(raw)
+        if not isinstance(parsed, dict):
+            raise ValueError("Batched response is not a JSON object keyed by category.")
+    except Exception as e:
+        if raw is not None:
+            llm.forget(prompt, max_tokens=max_tokens, temperature=0.4, schema=schema, stage="batched")
+        return raw, [{"category": c, "raw": raw, "parsed": None, "repairs": [], "normalized": None, "error": e}
+                     for c in categories]
+    results = []
+    for category in categories:
+        section = get_field(parsed, category)
+        if section is None:
+            results.append({"category": category, "raw": raw, "parsed": None, "repairs": repairs,
+                            "normalized": None, "error": ValueError("Category missing from batched response.")})
+            continue
+        normalized = normalize_baseball_card(section)
+        results.append({"category": category, "raw": json.dumps(section, indent=2), "parsed": section,
+                        "repairs": repairs, "normalized": normalized, "card": BaseballCard.from_normalized(normalized),
+                        "error": None})
+    return raw, results
+
+
+def run_batched_generation(llm, categories, prompt, on_update=None, tracer=NULL_TRACER):
+    """
+    Run generate_batched_cards on a worker; with on_update, stream it and publish
+    each category's partial card on the calling thread as the combined JSON grows.
+    Returns (raw, results) with results in category order.
+    """
+    if on_update is None:
+        return generate_batched_cards(llm, categories, prompt, tracer=tracer)
+    updates = queue.Queue()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(tracer.wrap(generate_batched_cards), llm, categories, prompt,
+                             lambda key, text: updates.put((key, text)), tracer)
+
+        def publish(_, text):
+            partial = parse_partial_json(text) or {}
+            for category in categories:
+                section = get_field(partial, category)
+                if isinstance(section, dict):
+                    on_update(category, section)
+
+        drain_progress([future], updates, publish)
+        return future.result()
+
+
+def collect_results(profile, results):
+    """
+    Turn generation results into the app's stored shapes.
+    Returns (recommendation_data, category_fragments, raw_outputs, errors) where errors is
+    a list of (category, exception) for categories that failed.
+    """
+    recommendation_data, fragments, raw_outputs, errors = [], [], {}, []
+    for result in results:
+        category = result["category"]
+        include_flag = profile["inclusion"].get(category, False)
+        avg = profile["scores"].get(category, {}).get("average")
+        if result["error"] is not None:
+            errors.append((category, result["error"]))
+            # save raw text for debugging if available
+            raw_outputs[category] = result["raw"] if result["raw"] is not None else "<no raw captured>"
+            continue
+        raw, parsed, normalized = result["raw"], result["parsed"], result["normalized"]
+        card = result.get("card") or BaseballCard.from_normalized(normalized)
+        raw_outputs[category] = raw
+        # store both raw, parsed and normalized for debugging & export
+        recommendation_data.append({
+            "category": category,
+            "raw": raw,
+            "parsed": parsed,
+            "json_repairs": result["repairs"],
+            "data_normalized": normalized,
+            "card": card,
+            "show_avg": include_flag,
+            "avg": avg if include_flag else None
+        })
+        # For consolidation, use executive.focus_8w and plan_3y (already lists on the card)
+        fragments.append({
+            "category": category,
+            "focus_8w": card.executive.focus_8w if card.executive else [],
+            "plan_3y": card.executive.plan_3y if card.executive else []
+        })
+    return recommendation_data, fragments, raw_outputs, errors
+
+
+def normalize_consolidated(consolidated):
+    """
+    Make sure focus_8w has sprint1..4 and plan_3y has year1..3, each a list.
+    """
+    if not isinstance(consolidated, dict):
+        raise ValueError("Consolidated roadmap is not a JSON object.")
+    consolidated.setdefault("focus_8w", {})
+    consolidated.setdefault("plan_3y", {})
+    for s in SPRINTS:
+        if s not in consolidated["focus_8w"] or not isinstance(consolidated["focus_8w"][s], list):
+            consolidated["focus_8w"][s] = []
+    for y in YEARS:
+        if y not in consolidated["plan_3y"] or not isinstance(consolidated["plan_3y"][y], list):
+            consolidated["plan_3y"][y] = []
+    return consolidated
+
+
+def consolidate_roadmap(llm, fragments, tracer=NULL_TRACER):
+    """
+    Ask the model to merge category fragments into one roadmap.
+    Returns {"raw", "consolidated", "error"}; raw is kept even when parsing fails.
+    """
+    raw = prompt = None
+    try:
+        with tracer.span("consolidate.model_call", fragments=len(fragments), model=llm.model_for("consolidate")):
+            prompt = build_consolidation_prompt(fragments, model=llm.model_for("consolidate"))
+            raw = llm.call_openai(prompt, max_tokens=800, temperature=0.4, stage="consolidate")
+        with tracer.span("consolidate.parse_json"):
+            consolidated = normalize_consolidated(try_load_json(raw))
+        return {"raw": raw, "consolidated": consolidated, "error": None}
+    except Exception as e:
+        if raw is not None:
+            llm.forget(prompt, max_tokens=800, temperature=0.4, stage="consolidate")
+        return {"raw": raw, "consolidated": None, "error": e}
+
+
+def evaluate_profile(llm, profile, batched=False, max_in_flight=4, tracer=NULL_TRACER):
+    """
+    Headless end-to-end run for one profile: cards for every selected category, then consolidation.
+    Returns a dict with recommendation_data, category_fragments, raw_ai_outputs, errors, consolidated_json
+    and usage (token, cost and latency totals, see token_budget.UsageMeter.summary).
+    """
+    meter = UsageMeter()
+    llm = llm.metered(meter)
+    categories = categories_to_process(profile)
+    raw_outputs = {}
+    if batched and categories:
+        batched_raw, results = run_batched_generation(llm, categories, build_batched_prompt(profile, categories),
+                                                      tracer=tracer)
+        raw_outputs["batched"] = batched_raw if batched_raw is not None else "<no raw captured>"
+    else:
+        prompts = [(category, build_category_prompt(profile, category)) for category in categories]
+        results = run_category_generation(llm, prompts, max_in_flight, tracer=tracer)
+    recommendation_data, fragments, card_raw, errors = collect_results(profile, results)
+    raw_outputs.update(card_raw)
+    consolidated = None
+    if fragments:
+        outcome = consolidate_roadmap(llm, fragments, tracer)
+        raw_outputs["consolidate"] = outcome["raw"] if outcome["raw"] is not None else "<no raw>"
+        consolidated = outcome["consolidated"]
+        if outcome["error"] is not None:
+            errors.append(("consolidate", outcome["error"]))
+    return {
+        "recommendation_data": recommendation_data,
+        "category_fragments": fragments,
+        "raw_ai_outputs": raw_outputs,
+        "consolidated_json": consolidated,
+        "errors": [(name, str(e)) for name, e in errors],
+        "usage": meter.summary(),
+    }
@@ -0,0 +1,75 @@
+# model_routing.py
+# Per-stage model selection in tiers: "draft" sends cards and consolidation to a fast, cheap model
+# with tighter max_tokens for live workshop iteration; "final" uses a stronger model for the deck
+# that goes to the client. Every routed call (tier, stage, model, max_tokens, latency) is kept in a
+# bounded in-memory log and written to the "maturity.routing" logger.
+
+import logging
+import threading
+import time
+from collections import deque
+
+from perf_trace import percentile
+
+logger = logging.getLogger("maturity.routing")
+
+DRAFT, FINAL = "draft", "final"
+TIERS = (DRAFT, FINAL)
+
+
+def build_routes(draft_model="gpt-4o-mini", final_model="gpt-4o"):
+    """
+    {tier: {stage: (model, max_tokens cap)}} for the generation stages ("card", "batched",
+    "consolidate"). The cap only ever lowers the max_tokens a stage asks for.
+    """
+    return {
+        DRAFT: {"card": (draft_model, 700), "batched": (draft_model, 2800), "consolidate": (draft_model, 600)},
+        FINAL: {"card": (final_model, 1000), "batched": (final_model, 4000), "consolidate": (final_model, 800)},
+    }
+
+
+class ModelRouter:
+    """
+    Resolves (tier, stage) to a model and max_tokens and records how each routed call went.
+    Stages or tiers without a route keep the caller's model and max_tokens. Safe to share between threads.
+    """
+
+    def __init__(self, routes=None, log_size=1000):
+        self.routes = routes or build_routes()
+        self.decisions = deque(maxlen=log_size)
+        self._lock = threading.Lock()
+
+    def route(self, tier, stage, model, max_tokens):
+        """(model, max_tokens) to use for one call."""
+        route = self.routes.get(tier, {}).get(stage)
+        if route is None:
+            return model, max_tokens
+        return route[0], min(max_tokens, route[1])
+
+    def observe(self, tier, stage, model, max_tokens, seconds, cached=False):
+        with self._lock:
+            self.decisions.append({"time": time.time(), "tier": tier, "stage": stage, "model": model,
+                                   "max_tokens": max_tokens, "seconds": seconds, "cached": cached})
+        logger.info("tier=%s stage=%s model=%s max_tokens=%d %.2fs%s", tier, stage, model, max_tokens, seconds,
+                    " (cached)" if cached else "")
+
+    def model_stats(self):
+        """
+        {model: {calls, cached, p50_ms, p95_ms, mean_ms}} over the logged calls; latency excludes cache hits.
+        """
+        with self._lock:
+            decisions = list(self.decisions)
+        by_model = {}
+        for d in decisions:
+            by_model.setdefault(d["model"], []).append(d)
+        stats = {}
+        for model, rows in by_model.items():
+            seconds = sorted(r["seconds"] * 1000 for r in rows if not r["cached"])
+            stats[model] = {"calls": len(rows), "cached": len(rows) - len(seconds),
+                            "p50_ms": percentile(seconds, 0.5) or 0.0, "p95_ms": percentile(seconds, 0.95) or 0.0,
+                            "mean_ms": sum(seconds) / len(seconds) if seconds else 0.0}
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self.decisions.clear()
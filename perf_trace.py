@@ -0,0 +1,146 @@
+# perf_trace.py
+# Lightweight timing spans for the evaluation pipeline: nested context-manager spans,
+# p50/p95 per stage, and export as plain JSON records or OpenTelemetry (OTLP/JSON) spans.
+
+import contextlib
+import math
+import os
+import threading
+import time
+from collections import deque
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile (q in 0..1) of an already sorted list; None when it is empty."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+class Tracer:
+    """
+    Records finished spans (name, start/end, parent, attributes, status) in a bounded buffer.
+    Spans nest per thread; wrap() carries the caller's current span into a worker thread so
+    pool work shows up under the stage that started it. Safe to share between threads.
+    """
+
+    def __init__(self, service_name="cloud-data-maturity-evaluator", max_spans=5000):
+        self.service_name = service_name
+        self.spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current(self):
+        """(trace_id, span_id) of the innermost open span on this thread, or None."""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        parent = self.current()
+        trace_id = parent[0] if parent else os.urandom(16).hex()
+        span_id = os.urandom(8).hex()
+        record = {"name": name, "trace_id": trace_id, "span_id": span_id,
+                  "parent_span_id": parent[1] if parent else None,
+                  "start_ns": time.time_ns(), "attributes": attributes, "status": "ok"}
+        stack = self._stack()
+        stack.append((trace_id, span_id))
+        start = time.perf_counter()
+        try:
+            yield record["attributes"]
+        except BaseException as e:
+            record["status"] = "error"
+            record["attributes"]["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["duration_ms"] = (time.perf_counter() - start) * 1000.0
+            record["end_ns"] = record["start_ns"] + int(record["duration_ms"] * 1e6)
+            stack.pop()
+            with self._lock:
+                self.spans.append(record)
+
+    def wrap(self, fn):
+        """Bind fn to the calling thread's current span, for use as a pool worker."""
+        parent = self.current()
+
+        def run(*args, **kwargs):
+            stack = self._stack()
+            if parent:
+                stack.append(parent)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if parent:
+                    stack.pop()
+        return run
+
+    def records(self):
+        with self._lock:
+            return list(self.spans)
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+    def stage_stats(self):
+        """
+        {span name: {count, errors, p50_ms, p95_ms, max_ms, total_ms}} over all recorded spans.
+        """
+        durations, errors = {}, {}
+        for record in self.records():
+            durations.setdefault(record["name"], []).append(record["duration_ms"])
+            errors[record["name"]] = errors.get(record["name"], 0) + (record["status"] == "error")
+        stats = {}
+        for name, values in durations.items():
+            values.sort()
+            stats[name] = {"count": len(values), "errors": errors[name], "p50_ms": percentile(values, 0.50),
+                           "p95_ms": percentile(values, 0.95), "max_ms": values[-1], "total_ms": sum(values)}
+        return stats
+
+    def to_otlp(self):
+        """
+        Spans as an OTLP/JSON ExportTraceServiceRequest (importable by OpenTelemetry collectors).
+        """
+        def attribute(key, value):
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        spans = [{
+            "traceId": r["trace_id"],
+            "spanId": r["span_id"],
+            "parentSpanId": r["parent_span_id"] or "",
+            "name": r["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(r["start_ns"]),
+            "endTimeUnixNano": str(r["end_ns"]),
+            "attributes": [attribute(k, v) for k, v in r["attributes"].items()],
+            "status": {"code": 2 if r["status"] == "error" else 1},
+        } for r in self.records()]
+        return {"resourceSpans": [{
+            "resource": {"attributes": [attribute("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": "perf_trace"}, "spans": spans}],
+        }]}
+
+
+class _NullTracer:
+    """Tracer stand-in that records nothing (the default for engine functions)."""
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        yield attributes
+
+    def wrap(self, fn):
+        return fn
+
+
+NULL_TRACER = _NullTracer()
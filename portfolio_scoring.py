@@ -0,0 +1,308 @@
+# portfolio_scoring.py
+# Vectorized scoring over many assessments held as one dense uint8 array of shape
+# (clients × categories × sub-capabilities): category averages, gaps to target, percentile
+# ranks against industry peers and strength/priority classification, all without Python loops.
+# Peer lookups go through PercentileIndex, per-industry histograms kept up to date on every add,
+# so ranking one assessment costs the same for ten peers or ten thousand. Each client is one peer:
+# a newer assessment of the same client replaces the older one.
+
+import threading
+
+import numpy as np
+
+from score_model import Assessment, layout_for
+
+STRENGTH, DEVELOPING, PRIORITY = "strength", "developing", "priority"
+
+
+def _sub_scores(value):
+    # accepts {"average", "sub_capabilities": {...}} (app shape) or a plain {sub_cap: score}
+    if isinstance(value, dict) and "sub_capabilities" in value:
+        return value["sub_capabilities"]
+    return value or {}
+
+
+def category_averages(all_scores):
+    """
+    Mean sub-capability score per category of one assessment, in all_scores order (float array).
+    """
+    rows = [list(_sub_scores(v).values()) for v in all_scores.values()]
+    if not rows:
+        return np.zeros(0)
+    width = max(len(r) for r in rows)
+    padded = np.zeros((len(rows), width), dtype=np.float64)
+    counts = np.array([len(r) for r in rows], dtype=np.float64)
+    for i, r in enumerate(rows):
+        padded[i, :len(r)] = r
+    return padded.sum(axis=1) / np.maximum(counts, 1)
+
+
+def classify(averages, strength=4, priority=2):
+    """Label array: STRENGTH where average >= strength, PRIORITY where <= priority, else DEVELOPING."""
+    averages = np.asarray(averages)
+    return np.where(averages >= strength, STRENGTH, np.where(averages <= priority, PRIORITY, DEVELOPING))
+
+
+def key_insights(averages_by_category, strength=4, priority=2):
+    """
+    (overall average, strength categories, priority categories) for one assessment's category averages.
+    """
+    names = list(averages_by_category)
+    if not names:
+        return 0.0, [], []
+    values = np.fromiter(averages_by_category.values(), dtype=np.float64, count=len(names))
+    labels = classify(values, strength, priority)
+    return (float(values.mean()), [n for n, label in zip(names, labels) if label == STRENGTH],
+            [n for n, label in zip(names, labels) if label == PRIORITY])
+
+
+class PercentileIndex:
+    """
+    Per-industry histograms over a (categories × sub-capabilities) mask: counts of each score
+    level per sub-capability, and counts of each category score total (which gives category
+    averages). Updated in O(cells) per added or removed assessment; queries never touch individual
+    assessments. Scores above levels - 1 are indexed as 0 (unscored), so a bad row cannot break it.
+    industry=None addresses the all-industries histogram.
+    """
+
+    def __init__(self, mask, levels=6):
+        self.mask = mask
+        self.counts = mask.sum(axis=1)
+        self.levels = levels
+        self._rows, self._cols = np.nonzero(mask)
+        self._max_total = (levels - 1) * mask.shape[1]
+        self._entries = {}
+
+    def _entry(self, industry):
+        if industry not in self._entries:
+            self._entries[industry] = {
+                "n": 0,
+                "scores": np.zeros(self.mask.shape + (self.levels,), dtype=np.int64),
+                "totals": np.zeros((self.mask.shape[0], self._max_total + 1), dtype=np.int64),
+            }
+        return self._entries[industry]
+
+    def add(self, industry, vector, delta=1):
+        vector = np.where(vector < self.levels, vector, 0)
+        category_totals = (vector * self.mask).sum(axis=-1)
+        for key in (industry, None):
+            entry = self._entry(key)
+            entry["n"] += delta
+            entry["scores"][self._rows, self._cols, vector[self._rows, self._cols]] += delta
+            entry["totals"][np.arange(len(category_totals)), category_totals] += delta
+
+    def remove(self, industry, vector):
+        """Undo add(industry, vector)."""
+        self.add(industry, vector, delta=-1)
+
+    def size(self, industry=None):
+        entry = self._entries.get(industry)
+        return entry["n"] if entry else 0
+
+    @staticmethod
+    def _mid_rank(hist, values, n):
+        # share of peers below value plus half of those equal to it, from a histogram over the last axis
+        below = np.take_along_axis(np.cumsum(hist, axis=-1) - hist, values[..., None], axis=-1)[..., 0]
+        equal = np.take_along_axis(hist, values[..., None], axis=-1)[..., 0]
+        return (below + 0.5 * equal) / n * 100.0
+
+    def rank(self, industry, category_index, sub_index, score):
+        """Percentile rank of one score for one sub-capability, and the peer count."""
+        entry = self._entries.get(industry)
+        if not entry or not entry["n"]:
+            return float("nan"), 0
+        hist = entry["scores"][category_index, sub_index]
+        return float((hist[:score].sum() + 0.5 * hist[score]) / entry["n"] * 100.0), entry["n"]
+
+    def ranks(self, vector, industry=None):
+        """(mask-shaped percentile ranks of every sub-capability score, peer count)."""
+        entry = self._entries.get(industry)
+        if not entry or not entry["n"]:
+            return np.full(self.mask.shape, np.nan), 0
+        return self._mid_rank(entry["scores"], vector.astype(np.intp), entry["n"]), entry["n"]
+
+    def category_stats(self, vector, industry=None, quantiles=(0.25, 0.5, 0.75)):
+        """
+        (percentile rank of each category average, {q: peer category averages at quantile q}, peer count).
+        Quantiles are nearest-rank (the smallest peer value with at least q of peers at or below it).
+        """
+        entry = self._entries.get(industry)
+        if not entry or not entry["n"]:
+            empty = np.full(len(self.counts), np.nan)
+            return empty, {q: empty for q in quantiles}, 0
+        hist, n = entry["totals"], entry["n"]
+        totals = (vector * self.mask).sum(axis=-1).astype(np.intp)
+        cumulative = np.cumsum(hist, axis=-1)
+        values = {q: np.argmax(cumulative >= max(1, np.ceil(q * n)), axis=-1) / self.counts for q in quantiles}
+        return self._mid_rank(hist, totals, n), values, n
+
+
+class Portfolio:
+    """
+    Many assessments on one categories structure, one row per client (matched case-insensitively,
+    like the store). Scores live in a preallocated uint8 array (grown by doubling); sub-capability
+    slots a category does not have are masked out. Reads return views/arrays over the first n rows;
+    add() is safe to call from several threads.
+    """
+
+    def __init__(self, categories, capacity=256):
+        self.categories = list(categories)
+        self.layout = layout_for(categories)
+        self.sub_capabilities = [list(subs) for subs in categories.values()]
+        width = max((len(subs) for subs in self.sub_capabilities), default=0)
+        self.mask = np.zeros((len(self.categories), width), dtype=bool)
+        for i, subs in enumerate(self.sub_capabilities):
+            self.mask[i, :len(subs)] = True
+        self.counts = self.mask.sum(axis=1)
+        self._scores = np.zeros((capacity, len(self.categories), width), dtype=np.uint8)
+        self._industry = np.zeros(capacity, dtype=np.int32)
+        self.industries = []
+        self._industry_codes = {}
+        self.clients = []
+        self._client_rows = {}
+        self.index = PercentileIndex(self.mask)
+        self._positions = {(c, sub): (i, j) for i, (c, subs) in enumerate(zip(self.categories, self.sub_capabilities))
+                           for j, sub in enumerate(subs)}
+        self.n = 0
+        self.synced_id = 0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    # ---- building ----
+    def to_array(self, all_scores):
+        """
+        One assessment's scores (an all_scores dict or a score_model.Assessment) as a
+        (categories × sub-capabilities) uint8 array; missing scores are 0.
+        """
+        if not isinstance(all_scores, Assessment) or all_scores.layout.tag != self.layout.tag:
+            all_scores = Assessment.from_dict(self.layout, all_scores if isinstance(all_scores, dict)
+                                              else all_scores.to_dict())
+        out = np.zeros(self.mask.shape, dtype=np.uint8)
+        # mask positions in row-major order are the layout's category-major vector positions
+        out[self.mask] = np.frombuffer(all_scores.scores, dtype=np.uint8)
+        return out
+
+    def _code(self, industry):
+        if industry not in self._industry_codes:
+            self._industry_codes[industry] = len(self.industries)
+            self.industries.append(industry)
+        return self._industry_codes[industry]
+
+    def add(self, client, industry, all_scores):
+        """
+        Append one assessment, or replace the client's earlier one so repeated saves of a client
+        do not count as extra peers; returns its row index.
+        """
+        row = self.to_array(all_scores)
+        key = str(client).casefold()
+        with self._lock:
+            existing = self._client_rows.get(key)
+            if existing is not None:
+                self.index.remove(self.industries[self._industry[existing]], self._scores[existing])
+                self._scores[existing] = row
+                self._industry[existing] = self._code(industry)
+                self.index.add(industry, row)
+                self.clients[existing] = client
+                return existing
+            if self.n == len(self._scores):
+                self._scores = np.concatenate([self._scores, np.zeros_like(self._scores)])
+                self._industry = np.concatenate([self._industry, np.zeros_like(self._industry)])
+            self._scores[self.n] = row
+            self._industry[self.n] = self._code(industry)
+            self.index.add(industry, row)
+            self.clients.append(client)
+            self._client_rows[key] = self.n
+            self.n += 1
+            return self.n - 1
+
+    def sync(self, store):
+        """
+        Add assessments saved to store since the last sync (one indexed query, see
+        AssessmentStore.score_rows), newest per client last. Returns the number of assessments read.
+        """
+        with self._sync_lock:
+            added = 0
+            current, client, industry, scores = None, None, None, {}
+            for assessment_id, row_client, row_industry, category, sub_cap, score in store.score_rows(self.synced_id):
+                if assessment_id != current:
+                    if current is not None:
+                        self.add(client, industry, scores)
+                        added += 1
+                    current, client, industry, scores = assessment_id, row_client, row_industry, {}
+                # a score outside the scale (e.g. written by an older batch run) counts as unscored
+                scores.setdefault(category, {})[sub_cap] = score if 1 <= score < self.index.levels else 0
+            if current is not None:
+                self.add(client, industry, scores)
+                self.synced_id = current
+                added += 1
+            return added
+
+    @classmethod
+    def from_store(cls, store, categories):
+        portfolio = cls(categories)
+        portfolio.sync(store)
+        return portfolio
+
+    # ---- queries ----
+    @property
+    def scores(self):
+        return self._scores[:self.n]
+
+    def assessment(self, row):
+        """One stored row as a score_model.Assessment (e.g. for its fingerprint)."""
+        return Assessment(self.layout, self.scores[row][self.mask])
+
+    def peers(self, industry=None):
+        """Row indices of assessments in industry (all rows when industry is None)."""
+        if industry is None:
+            return np.arange(self.n)
+        code = self._industry_codes.get(industry)
+        if code is None:
+            return np.zeros(0, dtype=np.intp)
+        return np.flatnonzero(self._industry[:self.n] == code)
+
+    def averages(self, rows=None):
+        """(rows × categories) mean sub-capability score."""
+        scores = self.scores if rows is None else self.scores[rows]
+        return scores.sum(axis=-1, dtype=np.float64) / self.counts
+
+    def gaps(self, target=5, rows=None):
+        """(rows × categories × sub-capabilities) points missing to reach target (0 where met or masked)."""
+        scores = self.scores if rows is None else self.scores[rows]
+        target = np.broadcast_to(np.asarray(target, dtype=np.int16), self.mask.shape)
+        return np.clip(target - scores.astype(np.int16), 0, None) * self.mask
+
+    def category_gaps(self, target=5, rows=None):
+        return self.gaps(target, rows).sum(axis=-1) / self.counts
+
+    def percentile_ranks(self, scores, industry=None):
+        """
+        Percentile rank (0-100, mid-rank for ties) of one assessment's sub-capability scores
+        among the peers in industry, from the histogram index. scores is an all_scores dict, an
+        Assessment or a to_array() result. Returns (ranks array shaped like the mask, number of peers).
+        """
+        vector = scores if isinstance(scores, np.ndarray) else self.to_array(scores)
+        with self._lock:
+            return self.index.ranks(vector, industry)
+
+    def sub_capability_rank(self, industry, category, sub_capability, score):
+        """(percentile rank, peer count) of a single slider value; O(levels)."""
+        i, j = self._positions[(category, sub_capability)]
+        with self._lock:
+            return self.index.rank(industry, i, j, int(score))
+
+    def benchmark(self, scores, industry=None, strength=4, priority=2, target=5):
+        """
+        One assessment against its industry peers, per category: own average, peer median / p25 / p75,
+        gap to target, percentile rank of the average and classification. Returns (rows, peer count).
+        """
+        vector = scores if isinstance(scores, np.ndarray) else self.to_array(scores)
+        own = vector.sum(axis=-1, dtype=np.float64) / self.counts
+        gap = (np.clip(np.asarray(target) - vector.astype(np.int16), 0, None) * self.mask).sum(axis=-1) / self.counts
+        labels = classify(own, strength, priority)
+        with self._lock:
+            rank, values, peer_count = self.index.category_stats(vector, industry)
+        rows = [{"category": c, "average": float(own[i]), "peer_median": float(values[0.5][i]),
+                 "peer_p25": float(values[0.25][i]), "peer_p75": float(values[0.75][i]), "percentile": float(rank[i]),
+                 "gap_to_target": float(gap[i]), "class": str(labels[i])} for i, c in enumerate(self.categories)]
+        return rows, peer_count
@@ -0,0 +1,81 @@
+# radar_charts.py
+# One spider (radar) chart per category, rendered on its own so a slider change only redraws the
+# chart of the category it belongs to. The apps cache each chart on the category's score tuple
+# and lay the charts out in a grid of Streamlit columns.
+#
+# radar_svg is what the apps display (an SVG string, no rasterization); radar_png is the
+# matplotlib version for when a raster image is needed. Its figures are built with
+# matplotlib.figure.Figure (no pyplot): no global state, nothing to close, and thread-safe.
+
+import math
+from io import BytesIO
+
+import numpy as np
+
+from svg_render import PX_PER_POINT, SvgCanvas, polar_point
+
+LEVEL_TICK_LABELS = ['1\nGreenfield', '2\nEmerging', '3\nDeveloping', '4\nEstablished', '5\nOptimized']
+
+
+def draw_category_radar(category, sub_caps, values, average, level_label, color='#1976d2'):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(6.5, 6.5))
+    ax = fig.add_subplot(projection='polar')
+    n = len(sub_caps)
+    angles = [i / float(n) * 2 * np.pi for i in range(n)]
+    closed_angles = angles + angles[:1]
+    closed_values = list(values) + list(values[:1])
+    ax.plot(closed_angles, closed_values, 'o-', linewidth=3, label=category, color=color, markersize=8)
+    ax.fill(closed_angles, closed_values, alpha=0.25, color=color)
+    ax.set_xticks(angles)
+    ax.set_xticklabels(sub_caps, fontsize=10, fontweight='bold')
+    ax.set_ylim(0, 5)
+    ax.set_yticks([1, 2, 3, 4, 5])
+    ax.set_yticklabels(LEVEL_TICK_LABELS, fontsize=8)
+    ax.grid(True, alpha=0.3)
+    ax.set_title(f"{category}\nAverage: {average:.1f} ({level_label})", fontsize=14, fontweight='bold', pad=20,
+                 color='#1565c0')
+    for angle, value in zip(angles, values):
+        ax.annotate(f'{value}', xy=(angle, value), xytext=(5, 5), textcoords='offset points', fontsize=9,
+                    fontweight='bold', color='#0d47a1',
+                    bbox=dict(boxstyle='round,pad=0.2', facecolor='white', alpha=0.8))
+    fig.tight_layout()
+    return fig
+
+
+def radar_png(category, sub_caps, values, average, level_label, color='#1976d2', dpi=100):
+    """PNG bytes of one category's radar chart."""
+    img = BytesIO()
+    draw_category_radar(category, sub_caps, values, average, level_label, color).savefig(
+        img, format='png', bbox_inches='tight', dpi=dpi)
+    return img.getvalue()
+
+
+def radar_svg(category, sub_caps, values, average, level_label, color='#1976d2'):
+    """SVG string of one category's radar chart, laid out like draw_category_radar."""
+    canvas = SvgCanvas(650, 650)
+    cx, cy, radius = 325, 355, 215
+    n = len(sub_caps)
+    angles = [i / float(n) * 2 * math.pi for i in range(n)]
+    # grid: level circles, spokes, outer frame
+    for level in range(1, 6):
+        canvas.circle(cx, cy, radius * level / 5, stroke='#b0b0b0', stroke_width=0.8, opacity=0.3)
+    for angle in angles:
+        canvas.line(cx, cy, *polar_point(cx, cy, radius, angle), stroke='#b0b0b0', stroke_width=0.8, opacity=0.3)
+    canvas.circle(cx, cy, radius, stroke='#000000', stroke_width=0.8)
+    # level labels along the 22.5° spoke, as matplotlib places radial tick labels
+    for level, label in enumerate(LEVEL_TICK_LABELS, start=1):
+        canvas.text(*polar_point(cx, cy, radius * level / 5, math.radians(22.5)), label, size=8, ha='left')
+    for angle, sub_cap in zip(angles, sub_caps):
+        x, y = polar_point(cx, cy, radius + 22, angle)
+        ha = 'center' if abs(math.cos(angle)) < 0.3 else ('left' if math.cos(angle) > 0 else 'right')
+        canvas.text(x, y, sub_cap, size=10, weight='bold', ha=ha)
+    points = [polar_point(cx, cy, radius * value / 5, angle) for angle, value in zip(angles, values)]
+    canvas.polygon(points, fill=color, stroke=color, stroke_width=3 * PX_PER_POINT, opacity=0.25)
+    for (x, y), value in zip(points, values):
+        canvas.circle(x, y, 4 * PX_PER_POINT, fill=color)
+        canvas.text(x, y, f'{value}', size=9, weight='bold', color='#0d47a1', ha='left', va='bottom',
+                    background='white', offset=(5 * PX_PER_POINT, 5 * PX_PER_POINT))
+    canvas.text(cx, cy - radius - 40, f"{category}\nAverage: {average:.1f} ({level_label})", size=14,
+                weight='bold', color='#1565c0', va='bottom')
+    return canvas.to_string()
@@ -0,0 +1,138 @@
+# request_scheduler.py
+# Rate limiting and retries for model calls: token buckets for requests/min and tokens/min,
+# exponential backoff with full jitter, Retry-After support and a per-call deadline.
+
+import random
+import threading
+import time
+
+RETRYABLE_STATUS = {408, 409, 429}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError"}
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call could not be completed (including waits and retries) before its deadline."""
+
+
+class TokenBucket:
+    """
+    Refills continuously at rate_per_minute up to capacity (defaults to one minute's worth).
+    acquire() blocks until the amount is available; amounts above capacity are clamped so a
+    single large request can still go through on a full bucket.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1, deadline=None):
+        """Take amount from the bucket; returns seconds spent waiting or raises DeadlineExceeded."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.available >= amount:
+                    self.available -= amount
+                    return waited
+                wait = (amount - self.available) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise DeadlineExceeded("Rate limit would delay the call past its deadline.")
+            time.sleep(wait)
+            waited += wait
+
+    def penalize(self, seconds):
+        """Drain the bucket so nothing is sent for roughly `seconds` (used after a 429)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.available = min(self.available, -seconds * self.rate)
+
+
+def retry_after_seconds(error):
+    """
+    Server-suggested wait from an API error's response headers (retry-after-ms / retry-after), if any.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def is_retryable(error):
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+class RequestScheduler:
+    """
+    Runs model calls under shared requests/min and tokens/min budgets and retries transient
+    failures (429, 408/409, 5xx, connection errors) with exponential backoff and full jitter,
+    preferring the server's Retry-After. Each call has a deadline covering waits and retries.
+    One instance should be shared by every thread that draws on the same API quota.
+    """
+
+    def __init__(self, requests_per_minute=500, tokens_per_minute=200000, max_retries=6,
+                 base_delay=1.0, max_delay=30.0, deadline_seconds=120.0):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline_seconds = deadline_seconds
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.throttled_seconds = 0.0
+
+    def _count(self, calls=0, retries=0, throttled=0.0):
+        with self._lock:
+            self.calls += calls
+            self.retries += retries
+            self.throttled_seconds += throttled
+
+    def run(self, fn, estimated_tokens=0, deadline_seconds=None):
+        """
+        Call fn(timeout) within the rate limits, retrying transient errors.
+        timeout is the number of seconds left before the deadline (pass it on to the HTTP call).
+        """
+        deadline = time.monotonic() + (deadline_seconds or self.deadline_seconds)
+        attempt = 0
+        while True:
+            waited = self.requests.acquire(1, deadline) + self.tokens.acquire(estimated_tokens, deadline)
+            self._count(calls=1, throttled=waited)
+            try:
+                return fn(max(1.0, deadline - time.monotonic()))
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                if getattr(e, "status_code", None) == 429:
+                    # everyone sharing the quota backs off, not just this caller
+                    self.requests.penalize(delay)
+                if time.monotonic() + delay > deadline:
+                    raise DeadlineExceeded(f"Gave up after {attempt + 1} attempt(s): {e}") from e
+                self._count(retries=1)
+                time.sleep(delay)
+                attempt += 1
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "retries": self.retries, "throttled_seconds": self.throttled_seconds}
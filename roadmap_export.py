@@ -0,0 +1,218 @@
+# roadmap_export.py
+# Roadmap diagrams and the PowerPoint deck (python-pptx). The app displays the SVG versions of
+# the diagrams (svg_render); the matplotlib versions are rasterized only for the deck.
+
+# matplotlib and python-pptx are imported inside the functions that need them, so importing
+# this module (e.g. on every Streamlit rerun) stays cheap until a diagram or deck is built.
+
+import hashlib
+import json
+import threading
+from io import BytesIO
+
+from maturity_engine import SPRINTS, YEARS, CardBlock, item_card
+from svg_render import PX_PER_POINT, SvgCanvas, wrap_lines
+
+# pyplot keeps global state; batch workers render one figure at a time
+_figure_lock = threading.Lock()
+
+# -------------------- Diagram drawing --------------------
+def draw_8week_roadmap_figure(focus_dict):
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
+    fig, ax = plt.subplots(figsize=(12, 3))
+    ax.set_xlim(0, 4)
+    ax.set_ylim(0, 1)
+    ax.axis("off")
+    for i, sprint in enumerate(SPRINTS):
+        x = i
+        items = focus_dict.get(sprint, [])
+        if isinstance(items, str):
+            items = [items]
+        lines = [f"• {it}" for it in items] if items else ["(no items)"]
+        text = f"Sprint {i+1}\n" + "\n".join(lines)
+        ax.add_patch(
+            patches.FancyBboxPatch((x + 0.05, 0.05), 0.9, 0.9, boxstyle="round,pad=0.02", facecolor="#e3f2fd", edgecolor="#1976d2")
+        )
+        ax.text(x + 0.08, 0.5, text, ha="left", va="center", fontsize=8, wrap=True)
+    plt.tight_layout()
+    return fig
+
+
+def draw_3year_roadmap_figure(plan_dict):
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
+    fig, ax = plt.subplots(figsize=(12, 3))
+    ax.set_xlim(0, 3)
+    ax.set_ylim(0, 1)
+    ax.axis("off")
+    for i, year in enumerate(YEARS):
+        x = i
+        items = plan_dict.get(year, [])
+        if isinstance(items, str):
+            items = [items]
+        lines = [f"• {it}" for it in items] if items else ["(no items)"]
+        text = f"Year {i+1}\n" + "\n".join(lines)
+        ax.add_patch(
+            patches.FancyBboxPatch((x + 0.05, 0.05), 0.9, 0.9, boxstyle="round,pad=0.02", facecolor="#e8f5e9", edgecolor="#2e7d32")
+        )
+        ax.text(x + 0.08, 0.5, text, ha="left", va="center", fontsize=8, wrap=True)
+    plt.tight_layout()
+    return fig
+
+
+def figure_to_png(fig):
+    """
+    Rasterize a figure to PNG bytes and close it so figures do not pile up across reruns.
+    """
+    import matplotlib.pyplot as plt
+    img = BytesIO()
+    fig.savefig(img, format="png", bbox_inches="tight", dpi=150)
+    plt.close(fig)
+    return img.getvalue()
+
+
+def render_roadmap_pngs(consolidated):
+    """
+    PNG bytes for the (8-week, 3-year) diagrams of a consolidated roadmap. Thread-safe.
+    """
+    with _figure_lock:
+        png_8w = figure_to_png(draw_8week_roadmap_figure(consolidated.get("focus_8w", {})))
+        png_3y = figure_to_png(draw_3year_roadmap_figure(consolidated.get("plan_3y", {})))
+    return png_8w, png_3y
+
+
+def _roadmap_columns_svg(columns, fill, stroke):
+    # same layout as the matplotlib figures (figsize 12 × 3, one rounded box per column), with each
+    # item wrapped to its box and the canvas made taller when the text would not fit
+    width = 1200
+    column_px = (width - 20) / len(columns)
+    texts = []
+    for title, items in columns:
+        if isinstance(items, str):
+            items = [items]
+        lines = [title]
+        for item in items or ["(no items)"]:
+            lines.extend(wrap_lines(f"• {item}", column_px * 0.84, 8))
+        texts.append("\n".join(lines))
+    tallest = max(text.count("\n") + 1 for text in texts)
+    height = max(300, int(tallest * 8 * PX_PER_POINT * 1.2 / 0.8) + 40)
+    canvas = SvgCanvas(width, height).set_limits((0, len(columns)), (0, 1), (10, 10, width - 20, height - 20))
+    for i, text in enumerate(texts):
+        canvas.fancy_box(i + 0.05, 0.05, 0.9, 0.9, 0.02, fill, stroke)
+        canvas.text(i + 0.08, 0.5, text, size=8, ha="left")
+    return canvas.to_string()
+
+
+def roadmap_8week_svg(focus_dict):
+    """SVG version of draw_8week_roadmap_figure."""
+    return _roadmap_columns_svg([(f"Sprint {i + 1}", focus_dict.get(s, [])) for i, s in enumerate(SPRINTS)],
+                                "#e3f2fd", "#1976d2")
+
+
+def roadmap_3year_svg(plan_dict):
+    """SVG version of draw_3year_roadmap_figure."""
+    return _roadmap_columns_svg([(f"Year {i + 1}", plan_dict.get(y, [])) for i, y in enumerate(YEARS)],
+                                "#e8f5e9", "#2e7d32")
+
+# -------------------- PPTX helpers --------------------
+def add_wrapped_paragraph(frame, text, font_size=11, bold=False, level=0):
+    from pptx.util import Pt
+    p = frame.add_paragraph()
+    p.text = text
+    p.font.size = Pt(font_size)
+    p.font.bold = bold
+    p.level = level
+    p.word_wrap = True
+    return p
+
+
+def export_to_pptx(consolidated, png_8w, png_3y, rec_data):
+    from pptx import Presentation
+    from pptx.util import Inches
+    prs = Presentation()
+    # Title slide
+    slide = prs.slides.add_slide(prs.slide_layouts[0])
+    slide.shapes.title.text = "Consolidated Roadmap & Baseball Cards"
+
+    # Roadmap slides
+    for title, png in [("8-Week Roadmap", png_8w), ("3-Year Roadmap", png_3y)]:
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = title
+        slide.shapes.add_picture(BytesIO(png), Inches(0.5), Inches(1.5), width=Inches(8))
+
+    # Per-category baseball card slides
+    for item in rec_data:
+        cat = item["category"]
+        card = item_card(item)
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = f"{cat} Baseball Cards"
+
+        # Left column: Executive
+        tf = slide.shapes.add_textbox(Inches(0.3), Inches(1.3), Inches(4.2), Inches(5)).text_frame
+        tf.clear()
+        add_wrapped_paragraph(tf, "EXECUTIVE Baseball Card", 14, True)
+        exec_block = card.executive or CardBlock()
+        # summary + recommendation
+        if exec_block.summary: add_wrapped_paragraph(tf, f"Summary: {exec_block.summary}", 11)
+        if exec_block.recommendation: add_wrapped_paragraph(tf, f"Recommendation: {exec_block.recommendation}", 11)
+        if exec_block.activities:
+            add_wrapped_paragraph(tf, "Project Activities:", 11, True)
+            for a in exec_block.activities:
+                add_wrapped_paragraph(tf, f"• {a}", 10, False, 1)
+        if exec_block.assumptions:
+            add_wrapped_paragraph(tf, "Assumptions:", 11, True)
+            for a in exec_block.assumptions:
+                add_wrapped_paragraph(tf, f"• {a}", 10, False, 1)
+
+        # Right column: Technical
+        tf2 = slide.shapes.add_textbox(Inches(4.8), Inches(1.3), Inches(4.2), Inches(5)).text_frame
+        tf2.clear()
+        add_wrapped_paragraph(tf2, "TECHNICAL Baseball Card", 14, True)
+        tech_block = card.technical or CardBlock()
+        if tech_block.summary: add_wrapped_paragraph(tf2, f"Summary: {tech_block.summary}", 11)
+        if tech_block.recommendation: add_wrapped_paragraph(tf2, f"Recommendation: {tech_block.recommendation}", 11)
+        if tech_block.activities:
+            add_wrapped_paragraph(tf2, "Project Activities:", 11, True)
+            for a in tech_block.activities:
+                add_wrapped_paragraph(tf2, f"• {a}", 10, False, 1)
+        if tech_block.assumptions:
+            add_wrapped_paragraph(tf2, "Assumptions:", 11, True)
+            for a in tech_block.assumptions:
+                add_wrapped_paragraph(tf2, f"• {a}", 10, False, 1)
+        # team
+        if tech_block.team:
+            add_wrapped_paragraph(tf2, "Initial Team (3-6 months):", 11, True)
+            for t in tech_block.team:
+                add_wrapped_paragraph(tf2, f"• {t}", 10, False, 1)
+
+    # final summary slide (top 3 priorities)
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = "Executive Summary — Top Priorities"
+    tf3 = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(8.5), Inches(5)).text_frame
+    tf3.clear()
+    add_wrapped_paragraph(tf3, "Top 3 Priorities (by impact)", 18, True)
+
+    # derive priorities from consolidated (if present)
+    items = []
+    if consolidated:
+        for s in SPRINTS:
+            items.extend(consolidated.get("focus_8w", {}).get(s, []))
+        for y in YEARS:
+            items.extend(consolidated.get("plan_3y", {}).get(y, []))
+    top3 = items[:3]
+    for t in top3:
+        add_wrapped_paragraph(tf3, f"• {t}", 14)
+
+    out = BytesIO()
+    prs.save(out)
+    out.seek(0)
+    return out
+
+
+def deck_fingerprint(consolidated, rec_data):
+    """
+    Content hash of everything that ends up in the deck (roadmap + normalized cards).
+    """
+    content = [consolidated, [(item["category"], item["data_normalized"]) for item in rec_data]]
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
@@ -0,0 +1,159 @@
+# score_model.py
+# Compact score model shared by the app variants: one byte per sub-capability at fixed positions
+# derived once from a categories structure, so an assessment is a small flat vector instead of
+# nested dicts. Categories are contiguous slices of the vector (O(1) memoryviews), and the raw
+# bytes give a stable fingerprint for cache keys, storage and comparing many assessments.
+# Plain bytearray rather than numpy, so importing this module at app startup stays cheap;
+# portfolio_scoring wraps the same bytes as numpy arrays (np.frombuffer) for its vectorized work.
+#
+# A structure is {category: [sub-capabilities]} or, for variants with one score per category
+# (AI3), a plain list of categories.
+
+import hashlib
+import json
+
+_layouts = {}
+
+
+def _freeze(categories):
+    if isinstance(categories, dict):
+        return tuple((c, tuple(subs)) for c, subs in categories.items()), False
+    return tuple((c, (c,)) for c in categories), True
+
+
+class ScoreLayout:
+    """
+    Fixed vector positions for one categories structure. Use layout_for() so each structure's
+    layout is built once per process.
+    """
+
+    __slots__ = ("categories", "sub_capabilities", "flat", "offsets", "counts", "positions", "size", "tag", "_ranges")
+
+    def __init__(self, categories):
+        frozen, self.flat = _freeze(categories)
+        if any(not subs for _, subs in frozen):
+            raise ValueError("Every category needs at least one sub-capability.")
+        self.categories = tuple(c for c, _ in frozen)
+        self.sub_capabilities = dict(frozen)
+        self.counts = tuple(len(subs) for _, subs in frozen)
+        offsets = [0]
+        for count in self.counts:
+            offsets.append(offsets[-1] + count)
+        self.offsets = tuple(offsets)
+        self.size = self.offsets[-1]
+        self.positions = {(c, sub): self.offsets[i] + j for i, (c, subs) in enumerate(frozen)
+                          for j, sub in enumerate(subs)}
+        self._ranges = {c: slice(self.offsets[i], self.offsets[i + 1]) for i, c in enumerate(self.categories)}
+        # identifies the structure in fingerprints, so vectors from different layouts never compare equal
+        self.tag = hashlib.sha256(json.dumps(frozen, ensure_ascii=False).encode("utf-8")).hexdigest()[:8]
+
+    def range(self, category):
+        return self._ranges[category]
+
+
+def layout_for(categories):
+    """The (cached) ScoreLayout of a categories structure."""
+    key = _freeze(categories)
+    if key not in _layouts:
+        _layouts[key] = ScoreLayout(categories)
+    return _layouts[key]
+
+
+class Assessment:
+    """
+    One assessment's scores as a bytearray over a ScoreLayout; 0 means not scored.
+    assessment[category, sub_cap] is one score, assessment[category] a memoryview of the category's scores.
+    """
+
+    __slots__ = ("layout", "scores")
+
+    def __init__(self, layout, scores=None):
+        self.layout = layout
+        self.scores = bytearray(layout.size) if scores is None else bytearray(scores)
+        if len(self.scores) != layout.size:
+            raise ValueError(f"Expected {layout.size} scores, got {len(self.scores)}.")
+
+    @classmethod
+    def from_dict(cls, layout, all_scores):
+        """
+        From the apps' dict shape ({category: {"average", "sub_capabilities": {...}}}), a plain
+        {category: {sub_cap: score}} or, for flat layouts, {category: score}. Missing scores are 0.
+        """
+        assessment = cls(layout)
+        for category, value in all_scores.items():
+            if category not in layout.sub_capabilities:
+                continue
+            if isinstance(value, dict):
+                for sub_cap, score in value.get("sub_capabilities", value).items():
+                    position = layout.positions.get((category, sub_cap))
+                    if position is not None:
+                        assessment.scores[position] = int(score or 0)
+            else:
+                assessment[category] = int(value or 0)
+        return assessment
+
+    @classmethod
+    def from_fingerprint(cls, layout, fingerprint):
+        """Inverse of fingerprint(); raises ValueError for a fingerprint of another layout."""
+        if not fingerprint.startswith(layout.tag):
+            raise ValueError("Fingerprint belongs to a different categories structure.")
+        return cls(layout, bytes.fromhex(fingerprint[len(layout.tag):]))
+
+    def _position(self, key):
+        if isinstance(key, tuple):
+            return self.layout.positions[key]
+        return self.layout.range(key)
+
+    def __getitem__(self, key):
+        position = self._position(key)
+        return memoryview(self.scores)[position] if isinstance(position, slice) else self.scores[position]
+
+    def __setitem__(self, key, score):
+        position = self._position(key)
+        if isinstance(position, slice) and isinstance(score, int):
+            # one score for the whole category (flat layouts)
+            score = [score] * (position.stop - position.start)
+        self.scores[position] = score
+
+    def __eq__(self, other):
+        if not isinstance(other, Assessment):
+            return NotImplemented
+        return self.layout.tag == other.layout.tag and self.scores == other.scores
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Assessment({self.fingerprint()})"
+
+    def copy(self):
+        return Assessment(self.layout, self.scores)
+
+    def to_bytes(self):
+        return bytes(self.scores)
+
+    def fingerprint(self):
+        """Layout tag + hex scores: stable across processes, reversible with from_fingerprint()."""
+        return self.layout.tag + self.scores.hex()
+
+    def averages(self):
+        """Mean score per category, in layout order (list of floats)."""
+        layout = self.layout
+        return [sum(self.scores[start:end]) / count
+                for start, end, count in zip(layout.offsets, layout.offsets[1:], layout.counts)]
+
+    def sub_scores(self, category):
+        return dict(zip(self.layout.sub_capabilities[category], self[category].tolist()))
+
+    def to_dict(self, categories=None, average_digits=1):
+        """
+        The apps' dict shape for categories (default: all): {category: {"average", "sub_capabilities"}}
+        with averages rounded to average_digits (None rounds to an int level), or {category: score}
+        for flat layouts.
+        """
+        layout = self.layout
+        names = layout.categories if categories is None else categories
+        if layout.flat:
+            return {c: int(self.scores[layout.positions[(c, c)]]) for c in names}
+        averages = dict(zip(layout.categories, self.averages()))
+        return {c: {"average": round(averages[c], average_digits), "sub_capabilities": self.sub_scores(c)}
+                for c in names}
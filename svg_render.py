@@ -0,0 +1,203 @@
+# svg_render.py
+# Dependency-free SVG drawing for the app's fixed-layout visuals: boxes, rounded boxes, polygons,
+# text and arrows on a canvas with matplotlib-like data coordinates. The result is an SVG string
+# the browser renders (st.image accepts SVG markup), so no figure creation, rasterization or PNG
+# encoding happens on the server. matplotlib is only still used where a raster image is needed
+# (the PowerPoint export).
+#
+# Canvases are sized in pixels at 100 px per inch and font sizes are given in points, so a
+# layout ported from a matplotlib figure keeps its figsize, data limits and fontsize values.
+
+import math
+import textwrap
+from xml.sax.saxutils import escape
+
+FONT_FAMILY = "DejaVu Sans, Helvetica, Arial, sans-serif"
+PX_PER_POINT = 100 / 72
+
+
+def _attrs(**kwargs):
+    # keyword names use "_" for "-" (stroke_width -> stroke-width); None values are left out
+    return " ".join(f'{k.rstrip("_").replace("_", "-")}="{escape(str(v), {chr(34): "&quot;"})}"'
+                    for k, v in kwargs.items() if v is not None)
+
+
+def _num(value):
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+
+def wrap_lines(text, width_px, font_pt):
+    """Split text into lines that fit width_px, estimating ~0.55 em per character."""
+    chars = max(4, int(width_px / (font_pt * PX_PER_POINT * 0.55)))
+    lines = []
+    for paragraph in str(text).split("\n"):
+        lines.extend(textwrap.wrap(paragraph, chars) or [""])
+    return lines
+
+
+class SvgCanvas:
+    """
+    A width × height pixel canvas. set_limits() maps data coordinates onto a plot area (y up,
+    like matplotlib axes); every drawing method takes data coordinates and returns self.
+    """
+
+    def __init__(self, width, height, background="white"):
+        self.width = width
+        self.height = height
+        self.items = []
+        self._defs = {}
+        self.set_limits((0, width), (height, 0))
+        if background:
+            self.items.append(f'<rect {_attrs(x=0, y=0, width=width, height=height, fill=background)}/>')
+
+    def set_limits(self, xlim, ylim, area=None):
+        """Map xlim × ylim onto area = (left, top, width, height) in pixels (default: whole canvas)."""
+        left, top, width, height = area or (0, 0, self.width, self.height)
+        self._x = lambda x: left + (x - xlim[0]) / (xlim[1] - xlim[0]) * width
+        self._y = lambda y: top + (ylim[1] - y) / (ylim[1] - ylim[0]) * height
+        self._sx = width / (xlim[1] - xlim[0])
+        self._sy = height / abs(ylim[1] - ylim[0])
+        return self
+
+    def px(self, x, y):
+        return self._x(x), self._y(y)
+
+    def rect(self, x, y, width, height, fill="none", stroke=None, stroke_width=1, radius=0, opacity=None):
+        """Box with lower-left corner (x, y) in data coordinates; radius rounds the corners (pixels)."""
+        x0, y0 = self.px(x, y + height)
+        attrs = _attrs(x=_num(x0), y=_num(y0), width=_num(width * self._sx), height=_num(height * self._sy),
+                       rx=radius or None, fill=fill, stroke=stroke, stroke_width=stroke_width if stroke else None,
+                       fill_opacity=opacity)
+        self.items.append(f"<rect {attrs}/>")
+        return self
+
+    def fancy_box(self, x, y, width, height, pad, fill, stroke, stroke_width=1):
+        """matplotlib FancyBboxPatch(boxstyle="round,pad=...") look-alike: padded box with rounded corners."""
+        radius = pad * min(self._sx, self._sy)
+        return self.rect(x - pad, y - pad, width + 2 * pad, height + 2 * pad, fill, stroke, stroke_width, _num(radius))
+
+    def polygon(self, points, fill="none", stroke=None, stroke_width=1, opacity=None, closed=True):
+        coords = " ".join(f"{_num(px)},{_num(py)}" for px, py in (self.px(x, y) for x, y in points))
+        tag = "polygon" if closed else "polyline"
+        attrs = _attrs(points=coords, fill=fill, stroke=stroke, stroke_width=stroke_width if stroke else None,
+                       fill_opacity=opacity, stroke_linejoin="round")
+        self.items.append(f"<{tag} {attrs}/>")
+        return self
+
+    def circle(self, x, y, radius_px, fill="none", stroke=None, stroke_width=1, opacity=None):
+        cx, cy = self.px(x, y)
+        attrs = _attrs(cx=_num(cx), cy=_num(cy), r=_num(radius_px), fill=fill, stroke=stroke,
+                       stroke_width=stroke_width if stroke else None, stroke_opacity=opacity)
+        self.items.append(f"<circle {attrs}/>")
+        return self
+
+    def line(self, x1, y1, x2, y2, stroke="#000000", stroke_width=1, opacity=None, arrow=False):
+        (px1, py1), (px2, py2) = self.px(x1, y1), self.px(x2, y2)
+        marker = None
+        if arrow:
+            marker_id = "arrow-" + stroke.lstrip("#")
+            self._defs[marker_id] = (
+                f'<marker id="{marker_id}" viewBox="0 0 10 10" refX="9" refY="5" markerWidth="7" markerHeight="7" '
+                f'orient="auto-start-reverse"><path d="M1,1 L9,5 L1,9" fill="none" stroke="{stroke}" '
+                f'stroke-width="1.5"/></marker>')
+            marker = f"url(#{marker_id})"
+        attrs = _attrs(x1=_num(px1), y1=_num(py1), x2=_num(px2), y2=_num(py2), stroke=stroke,
+                       stroke_width=stroke_width, stroke_opacity=opacity, marker_end=marker)
+        self.items.append(f"<line {attrs}/>")
+        return self
+
+    def arrow(self, x1, y1, x2, y2, stroke="#666666", stroke_width=1.2):
+        """matplotlib FancyArrowPatch(arrowstyle='->') look-alike."""
+        return self.line(x1, y1, x2, y2, stroke, stroke_width, arrow=True)
+
+    def text(self, x, y, text, size=10, weight="normal", color="#000000", ha="center", va="center",
+             line_spacing=1.2, background=None, offset=(0, 0)):
+        """
+        Text at (x, y) in data coordinates with matplotlib-style ha/va alignment; "\\n" starts a new
+        line. offset shifts it by (dx, dy) pixels (dy up). background draws a rounded white-ish box behind it.
+        """
+        lines = str(text).split("\n")
+        px, py = self.px(x, y)
+        px, py = px + offset[0], py - offset[1]
+        font_px = size * PX_PER_POINT
+        step = font_px * line_spacing
+        block = step * (len(lines) - 1)
+        # y of the first baseline; ~0.35 em from the middle of a line to its baseline
+        first = {"center": py - block / 2, "top": py + font_px * 0.85, "bottom": py - block - font_px * 0.2,
+                 "baseline": py}[va] + (font_px * 0.35 if va == "center" else 0)
+        anchor = {"center": "middle", "left": "start", "right": "end"}[ha]
+        if background:
+            width = max(len(line) for line in lines) * font_px * 0.6 + 4
+            x0 = {"middle": px - width / 2, "start": px - 2, "end": px - width + 2}[anchor]
+            attrs = _attrs(x=_num(x0), y=_num(first - font_px * 0.95), width=_num(width),
+                           height=_num(block + font_px * 1.3), rx=3, fill=background, fill_opacity=0.8,
+                           stroke="#000000", stroke_width=0.8)
+            self.items.append(f"<rect {attrs}/>")
+        spans = "".join(f'<tspan {_attrs(x=_num(px), y=_num(first + i * step))}>{escape(line)}</tspan>'
+                        for i, line in enumerate(lines))
+        attrs = _attrs(font_size=_num(font_px), font_weight=weight, fill=color, text_anchor=anchor,
+                       font_family=FONT_FAMILY)
+        self.items.append(f"<text {attrs}>{spans}</text>")
+        return self
+
+    def to_string(self):
+        defs = f"<defs>{''.join(self._defs.values())}</defs>" if self._defs else ""
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+                f'viewBox="0 0 {self.width} {self.height}">{defs}{"".join(self.items)}</svg>')
+
+
+# -------------------- Fixed layouts --------------------
+
+HEATMAP_COLORS = {1: "#d6e4f0", 2: "#a9c9e2", 3: "#78abd5", 4: "#4f90c6", 5: "#2d72b8"}
+
+
+def heatmap_svg(scores, levels):
+    """One colored cell per category (AI3's maturity heatmap, figsize 10 × 2)."""
+    canvas = SvgCanvas(1000, 200).set_limits((0, len(scores)), (0, 1), (125, 24, 775, 154))
+    cell_px = 775 / max(1, len(scores))
+    for i, (category, level) in enumerate(scores.items()):
+        canvas.rect(i, 0, 1, 1, fill=HEATMAP_COLORS[level], stroke="white")
+        canvas.text(i + 0.5, 0.75, "\n".join(wrap_lines(category, cell_px - 4, 8)), size=8)
+        canvas.text(i + 0.5, 0.25, f"Level {level}\n({levels[level]})", size=8)
+    return canvas.to_string()
+
+
+def phase_roadmap_svg(phases, title, vertical=False):
+    """
+    Phase boxes joined by arrows: phases are {"name", "items", "color", "border"}; left to right
+    (AI5's 14 × 8 figure) or, with vertical=True, top to bottom (AI6's 8 × 7 figure).
+    """
+    if not vertical:
+        box_width, box_height, spacing = 3, 2, 1
+        x_max = len(phases) * (box_width + spacing)
+        canvas = SvgCanvas(1400, 800).set_limits((-0.5, x_max), (1, 5), (60, 90, 1300, 660))
+        canvas.text((x_max - 0.5) / 2, 5, title, size=16, weight="bold", va="bottom", offset=(0, 22))
+        for i, phase in enumerate(phases):
+            x = i * (box_width + spacing)
+            canvas.fancy_box(x, 2, box_width, box_height, 0.1, phase["color"], phase["border"], 2)
+            canvas.text(x + box_width / 2, 3.5, phase["name"], size=12, weight="bold")
+            for j, item in enumerate(phase["items"]):
+                canvas.text(x + box_width / 2, 2.8 - j * 0.3, f"• {item}", size=9)
+            if i < len(phases) - 1:
+                canvas.arrow(x + box_width, 3, x + box_width + spacing, 3, stroke_width=1.5)
+        return canvas.to_string()
+
+    box_width, box_height, spacing, y_start = 7, 1.2, 0.5, 7.5
+    canvas = SvgCanvas(800, 700).set_limits((0, 8), (0, 9), (40, 49, 720, 630))
+    canvas.text(4, 9, title, size=15, weight="bold", color="#1565c0", va="bottom", offset=(0, 25))
+    for i, phase in enumerate(phases):
+        y = y_start - i * (box_height + spacing)
+        canvas.fancy_box(0.7, y, box_width, box_height, 0.1, phase["color"], phase["border"], 3 if i == 0 else 2)
+        canvas.text(0.7 + box_width / 2, y + box_height - 0.2, phase["name"], size=12, weight="bold",
+                    color=phase["border"])
+        for j, item in enumerate(phase["items"]):
+            canvas.text(0.7 + box_width / 2, y + box_height - 0.5 - j * 0.28, f"• {item}", size=10,
+                        color=phase["border"])
+        if i < len(phases) - 1:
+            canvas.arrow(0.7 + box_width / 2, y - 0.1, 0.7 + box_width / 2, y - spacing + 0.1)
+    return canvas.to_string()
+
+
+def polar_point(cx, cy, radius, angle):
+    """Pixel position at angle (radians, counter-clockwise from east, like matplotlib's polar axes)."""
+    return cx + radius * math.cos(angle), cy - radius * math.sin(angle)
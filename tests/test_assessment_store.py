@@ -0,0 +1,113 @@
+# test_assessment_store.py
+
+import sqlite3
+
+import pytest
+
+from assessment_store import AssessmentStore
+from maturity_engine import categories_structure, category_fingerprint, fragments_fingerprint
+from model_routing import DRAFT, FINAL
+
+CATEGORIES = list(categories_structure)[:2]
+
+
+def make_profile(client="Acme Homes", industry="Retail", comment=""):
+    scores = {c: {"average": 3.0, "sub_capabilities": {s: 3 for s in categories_structure[c]}} for c in CATEGORIES}
+    return {"client": client, "industry": industry, "company_size": "500", "it_size": "40", "uses_cloud": "Yes",
+            "cloud_platform": "Azure", "priority_projects": "Data platform", "overall_input": "",
+            "seed_scenario": "", "scores": scores, "comments": {c: comment for c in CATEGORIES},
+            "inclusion": {c: True for c in CATEGORIES}}
+
+
+def make_cards():
+    return [{"category": c, "show_avg": True, "data_normalized": {"executive": {"summary": f"{c} summary"}},
+             "card": object()} for c in CATEGORIES]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AssessmentStore(str(tmp_path / "assessments.sqlite3"))
+
+
+def test_save_and_load_round_trip(store):
+    profile = make_profile()
+    fragments = [{"category": c, "focus_8w": ["a"], "plan_3y": ["b"]} for c in CATEGORIES]
+    assessment_id = store.save(profile, make_cards(), fragments, {"focus_8w": {}, "plan_3y": {}},
+                               {CATEGORIES[0]: "raw"}, {"calls": 2}, mode="per-category", tier=FINAL)
+    saved = store.load(assessment_id)
+    assert saved["profile"] == profile
+    assert saved["category_fragments"] == fragments
+    assert saved["consolidated_json"] == {"focus_8w": {}, "plan_3y": {}}
+    assert (saved["raw_ai_outputs"], saved["usage"], saved["mode"]) == ({CATEGORIES[0]: "raw"}, {"calls": 2}, "per-category")
+    # the BaseballCard object is not stored; it is rebuilt from data_normalized on use
+    assert [sorted(item) for item in saved["recommendation_data"]] == [["category", "data_normalized", "show_avg"]] * 2
+    assert store.load(assessment_id + 1) is None
+
+
+def test_fingerprints_rebuilt_from_a_loaded_assessment_match_the_saved_cards(store):
+    profile = make_profile(comment="Legacy ETL")
+    fingerprints = {c: category_fingerprint(profile, c, FINAL) for c in CATEGORIES}
+    fragments = [{"category": c} for c in CATEGORIES]
+    saved = store.load(store.save(profile, make_cards(), fragments, tier=FINAL))
+    assert {c: category_fingerprint(saved["profile"], c, saved["card_tiers"][c]) for c in CATEGORIES} == fingerprints
+    assert fragments_fingerprint(saved["category_fragments"], saved["tier"]) == fragments_fingerprint(fragments, FINAL)
+
+
+def test_tiers_are_saved_per_card(store):
+    profile = make_profile()
+    saved = store.load(store.save(profile, make_cards(), [], tier=FINAL, card_tiers={CATEGORIES[1]: DRAFT}))
+    assert saved["card_tiers"] == {CATEGORIES[0]: FINAL, CATEGORIES[1]: DRAFT}
+    # a mixed run has no shared tier, so its roadmap never counts as Final
+    assert saved["tier"] is None
+    draft_loaded = {c: category_fingerprint(profile, c, saved["card_tiers"][c]) for c in CATEGORIES}
+    assert [draft_loaded[c] == category_fingerprint(profile, c, FINAL) for c in CATEGORIES] == [True, False]
+
+
+def test_out_of_range_scores_are_rejected(store):
+    profile = make_profile()
+    profile["scores"][CATEGORIES[0]]["sub_capabilities"][categories_structure[CATEGORIES[0]][0]] = 7
+    with pytest.raises(ValueError, match="1-5"):
+        store.save(profile, make_cards(), [])
+    assert store.stats()["assessments"] == 0
+
+
+def test_stores_without_tier_columns_are_upgraded(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE assessments (id INTEGER PRIMARY KEY AUTOINCREMENT, client TEXT NOT NULL COLLATE NOCASE,
+            industry TEXT NOT NULL, created REAL NOT NULL, mode TEXT, profile TEXT NOT NULL, fragments TEXT NOT NULL,
+            consolidated TEXT, raw_outputs TEXT NOT NULL, usage TEXT);
+        CREATE TABLE cards (assessment_id INTEGER NOT NULL, position INTEGER NOT NULL, category TEXT NOT NULL,
+            average REAL, included INTEGER NOT NULL, item TEXT NOT NULL, PRIMARY KEY (assessment_id, position));
+        INSERT INTO assessments (client, industry, created, profile, fragments, raw_outputs)
+            VALUES ('Old', 'Retail', 1, '{}', '[]', '{}');
+        INSERT INTO cards VALUES (1, 0, 'Cloud Architecture', 3.0, 1, '{"category": "Cloud Architecture"}');
+    """)
+    conn.commit()
+    conn.close()
+    store = AssessmentStore(path)
+    old = store.load(1)
+    assert old["tier"] is None and old["card_tiers"] == {"Cloud Architecture": None}
+    assert store.load(store.save(make_profile(), make_cards(), [], tier=DRAFT))["tier"] == DRAFT
+
+
+def test_search_filters(store):
+    first = store.save(make_profile("Acme Homes", "Retail"), make_cards(), [], tier=DRAFT)
+    second = store.save(make_profile("acme_labs", "Banking"), make_cards()[:1], [])
+    store.save(make_profile("Zenith", "Retail"), make_cards(), [])
+    assert [m["id"] for m in store.search(client="ACME")] == [second, first]
+    assert [m["id"] for m in store.search(client="acme_")] == [second]
+    assert [m["client"] for m in store.search(industry="Banking")] == ["acme_labs"]
+    assert {m["id"] for m in store.search(category=CATEGORIES[1])} == {first, second + 1}
+    assert store.search(client="Acme H")[0]["tier"] == DRAFT
+    assert store.stats() == {"assessments": 3, "clients": 3}
+
+
+def test_score_rows_and_delete(store):
+    first = store.save(make_profile("A"), make_cards(), [])
+    second = store.save(make_profile("B"), make_cards(), [])
+    rows = store.score_rows(since_id=first)
+    assert {r[0] for r in rows} == {second} and rows[0][1:3] == ("B", "Retail")
+    store.delete(second)
+    assert store.load(second) is None and store.score_rows(since_id=first) == []
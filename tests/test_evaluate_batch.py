@@ -0,0 +1,55 @@
+# test_evaluate_batch.py
+
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+import evaluate_batch
+from evaluate_batch import evaluate_client, load_profiles, output_names, profile_from_record
+
+SCORE = "Cloud Architecture/Infrastructure Design"
+
+
+def test_numeric_score_text_is_accepted():
+    profile = profile_from_record({"client": "Acme", SCORE: "4.0", "Data Management/Data Quality": ""})
+    assert profile["scores"]["Cloud Architecture"]["sub_capabilities"]["Infrastructure Design"] == 4
+    assert profile["scores"]["Data Management"]["sub_capabilities"]["Data Quality"] == 3
+
+
+@pytest.mark.parametrize("value", ["7", "0", "-1", "high"])
+def test_invalid_scores_are_rejected(value):
+    with pytest.raises(ValueError, match="Infrastructure Design"):
+        profile_from_record({"client": "Acme", SCORE: value})
+
+
+def test_load_profiles_reports_bad_rows_and_keeps_the_rest(tmp_path):
+    path = tmp_path / "clients.csv"
+    path.write_text(f"client,{SCORE},include:Data Management\nAcme,3,\nBad,7,yes\nZenith,5,no\n", encoding="utf-8")
+    profiles, rejected = load_profiles(str(path))
+    assert [p["client"] for p in profiles] == ["Acme", "Zenith"]
+    assert [(where, client) for where, client, _ in rejected] == [("line 3", "Bad")]
+    # a blank include cell counts as included
+    assert [p["inclusion"]["Data Management"] for p in profiles] == [True, False]
+
+
+def test_output_names_are_unique():
+    names = output_names([{"client": c} for c in ["Acme", "acme", "Acme!", "***", ""]])
+    assert names == ["Acme", "acme_2", "Acme_3", "client", "client_2"]
+
+
+def test_a_failed_store_save_fails_only_that_client(tmp_path, monkeypatch):
+    result = {"recommendation_data": [{"category": "Cloud Architecture"}], "category_fragments": [],
+              "raw_ai_outputs": {}, "errors": [], "consolidated_json": None, "usage": None}
+    monkeypatch.setattr(evaluate_batch, "evaluate_profile", lambda *args, **kwargs: result)
+
+    class LockedStore:
+        def save(self, *args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+    status = evaluate_client(SimpleNamespace(tier=None), profile_from_record({"client": "Acme"}), str(tmp_path),
+                             False, 4, store=LockedStore())
+    assert not status["ok"] and status["errors"] == [("store", "database is locked")]
+    # the client's JSON is still written
+    assert json.loads((tmp_path / "Acme.json").read_text(encoding="utf-8"))["errors"] == [["store", "database is locked"]]
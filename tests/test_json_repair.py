@@ -0,0 +1,41 @@
+# test_json_repair.py
+
+import pytest
+
+from json_repair import parse_partial_json, repair_json
+
+
+@pytest.mark.parametrize("text, expected, repairs", [
+    ('{"a": 1}', {"a": 1}, []),
+    ('[1, 2]', [1, 2], []),
+    ('{"a": "he said \\"hi\\""}', {"a": 'he said "hi"'}, []),
+    ('```json\n{"a": 1}\n```', {"a": 1}, ["code_fence"]),
+    ('Here you go: {"a": 1} Hope this helps.', {"a": 1}, ["leading_text", "trailing_text"]),
+    ('{"a": 1,}', {"a": 1}, ["trailing_comma"]),
+    ('{"a": 1 "b": 2}', {"a": 1, "b": 2}, ["missing_comma"]),
+    ("{'a': 'x'}", {"a": "x"}, ["single_quotes"]),
+    ('{a: True, b: None}', {"a": True, "b": None}, ["unquoted_key", "python_literal"]),
+    ('{"a": [1, 2', {"a": [1, 2]}, ["truncated"]),
+    ('[{"a": 1}, {"b": 2}]', [{"a": 1}, {"b": 2}], []),
+    ('```json\n[{"a": 1}, {"b": 2}]\n```', [{"a": 1}, {"b": 2}], ["code_fence"]),
+    ('Cards: [{"a": 1}, {"b": 2},] Done.', [{"a": 1}, {"b": 2}], ["leading_text", "trailing_comma", "trailing_text"]),
+    ('See note [1]: {"a": "x, }"}', {"a": "x, }"}, ["leading_text"]),
+])
+def test_repair_json(text, expected, repairs):
+    assert repair_json(text) == (expected, repairs)
+
+
+@pytest.mark.parametrize("text", [None, "no json here", "{]"])
+def test_repair_json_rejects_unparseable_text(text):
+    with pytest.raises(ValueError):
+        repair_json(text)
+
+
+def test_parse_partial_json_closes_an_open_stream():
+    assert parse_partial_json('{"summary": "Partly wri') == {"summary": "Partly wri"}
+    assert parse_partial_json('{"a": 1, "b') == {"a": 1}
+
+
+@pytest.mark.parametrize("text", [None, "", "still thinking", "[1, 2"])
+def test_parse_partial_json_without_an_object(text):
+    assert parse_partial_json(text) is None
@@ -0,0 +1,106 @@
+# test_portfolio_scoring.py
+
+import sqlite3
+
+import numpy as np
+import pytest
+
+from assessment_store import AssessmentStore
+from portfolio_scoring import DEVELOPING, PRIORITY, STRENGTH, Portfolio, classify, key_insights
+
+CATEGORIES = {"Cloud": ["Design", "Cost", "Recovery"], "Data": ["Quality", "Lineage"]}
+
+
+def scores(cloud, data):
+    return {"Cloud": dict(zip(CATEGORIES["Cloud"], cloud)), "Data": dict(zip(CATEGORIES["Data"], data))}
+
+
+def mid_rank(peers, value):
+    # percentile rank by definition: share of peers below value plus half of those equal to it
+    peers = np.asarray(peers, dtype=np.float64)
+    return ((peers < value).sum() + 0.5 * (peers == value).sum()) / len(peers) * 100.0
+
+
+@pytest.fixture
+def portfolio():
+    portfolio = Portfolio(CATEGORIES)
+    portfolio.add("A", "Retail", scores([1, 2, 3], [1, 1]))
+    portfolio.add("B", "Retail", scores([3, 3, 3], [2, 4]))
+    portfolio.add("C", "Retail", scores([5, 4, 3], [5, 5]))
+    portfolio.add("D", "Banking", scores([2, 2, 2], [3, 3]))
+    return portfolio
+
+
+def test_sub_capability_rank(portfolio):
+    assert portfolio.sub_capability_rank("Retail", "Cloud", "Design", 3) == (mid_rank([1, 3, 5], 3), 3)
+    assert portfolio.sub_capability_rank(None, "Cloud", "Design", 2) == (mid_rank([1, 3, 5, 2], 2), 4)
+    rank, peers = portfolio.sub_capability_rank("Mining", "Cloud", "Design", 3)
+    assert np.isnan(rank) and peers == 0
+
+
+def test_percentile_ranks_match_the_definition(portfolio):
+    ranks, peers = portfolio.percentile_ranks(scores([3, 1, 5], [4, 2]), "Retail")
+    assert peers == 3
+    assert ranks[0, :3].tolist() == [mid_rank([1, 3, 5], 3), mid_rank([2, 3, 4], 1), mid_rank([3, 3, 3], 5)]
+    assert ranks[1, :2].tolist() == [mid_rank([1, 2, 5], 4), mid_rank([1, 4, 5], 2)]
+
+
+def test_benchmark_against_industry_peers(portfolio):
+    rows, peers = portfolio.benchmark(scores([4, 4, 4], [1, 1]), "Retail")
+    assert peers == 3
+    cloud, data = rows
+    assert (cloud["average"], cloud["class"], data["class"]) == (4.0, STRENGTH, PRIORITY)
+    assert (cloud["peer_p25"], cloud["peer_median"], cloud["peer_p75"]) == (2.0, 3.0, 4.0)
+    assert cloud["percentile"] == mid_rank([2, 3, 4], 4)
+    assert data["gap_to_target"] == 4.0
+
+
+def test_a_newer_assessment_replaces_the_clients_peer_row(portfolio):
+    row = portfolio.add("a", "Banking", scores([5, 5, 5], [5, 5]))
+    assert row == 0 and portfolio.n == 4
+    assert portfolio.sub_capability_rank("Retail", "Cloud", "Design", 3) == (mid_rank([3, 5], 3), 2)
+    assert portfolio.sub_capability_rank("Banking", "Cloud", "Design", 5) == (mid_rank([2, 5], 5), 2)
+    assert portfolio.sub_capability_rank(None, "Cloud", "Design", 5)[1] == 4
+    assert portfolio.peers("Banking").tolist() == [0, 3]
+
+
+def test_averages_gaps_and_classes(portfolio):
+    assert portfolio.averages()[2].tolist() == [4.0, 5.0]
+    assert portfolio.category_gaps(rows=[0])[0].tolist() == [3.0, 4.0]
+    assert classify([4.5, 3, 1]).tolist() == [STRENGTH, DEVELOPING, PRIORITY]
+    assert key_insights({"Cloud": 4.0, "Data": 2.0}) == (3.0, ["Cloud"], ["Data"])
+
+
+def test_sync_reads_only_new_store_rows(tmp_path):
+    store = AssessmentStore(str(tmp_path / "assessments.sqlite3"))
+
+    def save(client, cloud, data):
+        all_scores = {c: {"sub_capabilities": subs} for c, subs in scores(cloud, data).items()}
+        store.save({"client": client, "industry": "Retail", "scores": all_scores}, [], [])
+
+    save("A", [1, 1, 1], [1, 1])
+    portfolio = Portfolio.from_store(store, CATEGORIES)
+    assert portfolio.n == 1
+    save("B", [5, 5, 5], [5, 5])
+    save("A", [3, 3, 3], [3, 3])
+    assert portfolio.sync(store) == 2
+    assert portfolio.n == 2 and portfolio.sync(store) == 0
+    assert portfolio.assessment(0).to_bytes() == bytes([3] * 5)
+
+
+def test_out_of_range_store_scores_count_as_unscored(tmp_path):
+    path = str(tmp_path / "assessments.sqlite3")
+    store = AssessmentStore(path)
+    all_scores = {c: {"sub_capabilities": subs} for c, subs in scores([3, 3, 3], [3, 3]).items()}
+    store.save({"client": "A", "industry": "Retail", "scores": all_scores}, [], [])
+    store.save({"client": "B", "industry": "Retail", "scores": all_scores}, [], [])
+    # rows written before the store validated scores
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE scores SET score = 7 WHERE assessment_id = 1 AND sub_capability = 'Design'")
+        conn.execute("UPDATE scores SET score = 0 WHERE assessment_id = 2 AND sub_capability = 'Cost'")
+    portfolio = Portfolio.from_store(store, CATEGORIES)
+    assert portfolio.n == 2
+    assert portfolio.assessment(0).to_bytes() == bytes([0, 3, 3, 3, 3])
+    assert portfolio.sub_capability_rank("Retail", "Cloud", "Design", 3) == (mid_rank([0, 3], 3), 2)
+    rows, peers = portfolio.benchmark(scores([3, 3, 3], [3, 3]), "Retail")
+    assert peers == 2 and rows[1]["percentile"] == 50.0
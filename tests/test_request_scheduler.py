@@ -0,0 +1,131 @@
+# test_request_scheduler.py
+
+import types
+
+import pytest
+
+import request_scheduler
+from request_scheduler import (
+    DeadlineExceeded, RequestScheduler, TokenBucket, is_retryable, retry_after_seconds
+)
+
+
+class Clock:
+    """Fake monotonic clock; sleeping advances it instead of blocking."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(request_scheduler.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(request_scheduler.time, "sleep", clock.sleep)
+    return clock
+
+
+class ApiError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = types.SimpleNamespace(headers=headers or {})
+
+
+def test_bucket_waits_for_refill(clock):
+    bucket = TokenBucket(60)  # one per second, capacity 60
+    assert bucket.acquire(60) == 0.0
+    assert bucket.acquire(2) == pytest.approx(2.0)
+    assert clock.sleeps == [pytest.approx(2.0)]
+
+
+def test_bucket_clamps_oversized_requests_to_capacity(clock):
+    assert TokenBucket(60).acquire(1000) == 0.0
+
+
+def test_bucket_raises_when_the_wait_passes_the_deadline(clock):
+    bucket = TokenBucket(60)
+    bucket.acquire(60)
+    with pytest.raises(DeadlineExceeded):
+        bucket.acquire(10, deadline=clock.now + 5)
+
+
+def test_penalize_drains_the_bucket(clock):
+    bucket = TokenBucket(60)
+    bucket.penalize(3)
+    assert bucket.acquire(1) == pytest.approx(4.0)
+
+
+def test_retry_after_headers():
+    assert retry_after_seconds(ApiError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(ApiError(429, {"retry-after": "2"})) == 2.0
+    assert retry_after_seconds(ApiError(429, {"retry-after": "soon"})) is None
+    assert retry_after_seconds(ValueError()) is None
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (ApiError(429), True), (ApiError(408), True), (ApiError(503), True),
+    (ApiError(400), False), (ApiError(401), False), (ValueError("bad"), False),
+    (type("APIConnectionError", (Exception,), {})(), True),
+])
+def test_is_retryable(error, retryable):
+    assert is_retryable(error) is retryable
+
+
+def test_run_retries_transient_errors_with_retry_after(clock):
+    scheduler = RequestScheduler(max_retries=3)
+    errors = [ApiError(429, {"retry-after": "2"}), ApiError(500, {"retry-after": "1"})]
+    timeouts = []
+
+    def call(timeout):
+        timeouts.append(timeout)
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert scheduler.run(call) == "ok"
+    assert len(timeouts) == 3
+    assert 2.0 in clock.sleeps and 1.0 in clock.sleeps
+    assert scheduler.stats()["calls"] == 3 and scheduler.stats()["retries"] == 2
+
+
+def test_run_does_not_retry_client_errors(clock):
+    scheduler = RequestScheduler()
+
+    def call(timeout):
+        raise ApiError(400)
+
+    with pytest.raises(ApiError):
+        scheduler.run(call)
+    assert scheduler.stats()["retries"] == 0
+
+
+def test_run_gives_up_after_max_retries(clock):
+    scheduler = RequestScheduler(max_retries=2)
+    attempts = []
+
+    def call(timeout):
+        attempts.append(timeout)
+        raise ApiError(503, {"retry-after": "1"})
+
+    with pytest.raises(ApiError):
+        scheduler.run(call)
+    assert len(attempts) == 3
+
+
+def test_run_stops_at_the_deadline(clock):
+    scheduler = RequestScheduler(deadline_seconds=10)
+
+    def call(timeout):
+        raise ApiError(503, {"retry-after": "30"})
+
+    with pytest.raises(DeadlineExceeded):
+        scheduler.run(call)
@@ -0,0 +1,116 @@
+# test_response_cache.py
+
+from types import SimpleNamespace
+
+import pytest
+
+import response_cache
+from maturity_engine import CompletionClient, consolidate_roadmap, generate_category_card
+from response_cache import ResponseCache, make_cache_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    return clock
+
+
+def test_cache_key_depends_on_every_request_field():
+    key = make_cache_key("gpt-4o", "prompt", 0.4, 1000)
+    assert key == make_cache_key("gpt-4o", "prompt", 0.4, 1000)
+    assert len({key,
+                make_cache_key("gpt-4o-mini", "prompt", 0.4, 1000),
+                make_cache_key("gpt-4o", "prompt!", 0.4, 1000),
+                make_cache_key("gpt-4o", "prompt", 0.6, 1000),
+                make_cache_key("gpt-4o", "prompt", 0.4, 800),
+                make_cache_key("gpt-4o", "prompt", 0.4, 1000, extra="tool")}) == 6
+
+
+def test_get_put_and_stats(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    assert cache.get("a") is None
+    cache.put("a", "héllo")
+    assert cache.get("a") == "héllo"
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1, "bytes": len("héllo".encode("utf-8"))}
+
+
+def test_discard_removes_one_entry(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    cache.put("a", "value")
+    cache.put("b", "value")
+    cache.discard("a")
+    cache.discard("missing")
+    assert cache.get("a") is None and cache.get("b") == "value"
+
+
+def test_evicts_least_recently_used_first(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_bytes=30)
+    for key in "abc":
+        cache.put(key, "x" * 10)
+        clock.now += 1
+    cache.get("a")  # "b" is now the least recently used entry
+    clock.now += 1
+    cache.put("d", "x" * 10)
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["x" * 10] * 3
+    assert cache.stats()["bytes"] <= 30
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60)
+    cache.put("a", "value")
+    clock.now += 59
+    assert cache.get("a") == "value"
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ResponseCache(path).put("a", "value")
+    assert ResponseCache(path).get("a") == "value"
+
+
+class FakeOpenAI:
+    """Chat completions client that answers every request with the next (content, finish_reason)."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        content, finish_reason = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        message = SimpleNamespace(content=content, tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=finish_reason)], usage=None)
+
+
+def test_truncated_responses_are_not_cached(tmp_path):
+    fake = FakeOpenAI(('{"a": [1, 2', "length"), ('{"a": [1, 2]}', "stop"))
+    llm = CompletionClient(fake, ResponseCache(str(tmp_path / "cache.sqlite3")))
+    assert llm.call_openai("prompt") == '{"a": [1, 2'
+    assert llm.call_openai("prompt") == '{"a": [1, 2]}'
+    assert llm.call_openai("prompt") == '{"a": [1, 2]}'
+    assert fake.calls == 2
+
+
+def test_responses_that_fail_to_parse_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    fake = FakeOpenAI(("Sorry, I cannot help with that.", "stop"))
+    llm = CompletionClient(fake, cache)
+    assert generate_category_card(llm, "Cloud", "prompt")["error"] is not None
+    assert consolidate_roadmap(llm, [])["error"] is not None
+    assert cache.stats()["entries"] == 0
+    assert generate_category_card(llm, "Cloud", "prompt")["error"] is not None
+    assert fake.calls == 3
@@ -0,0 +1,82 @@
+# test_score_model.py
+
+import pytest
+
+from score_model import Assessment, layout_for
+
+CATEGORIES = {"Cloud": ["Design", "Cost", "Recovery"], "Data": ["Quality", "Lineage"]}
+
+
+def test_layout_positions_are_category_major_and_cached():
+    layout = layout_for(CATEGORIES)
+    assert layout is layout_for({"Cloud": ["Design", "Cost", "Recovery"], "Data": ["Quality", "Lineage"]})
+    assert layout.size == 5
+    assert layout.offsets == (0, 3, 5)
+    assert [layout.positions["Cloud", "Recovery"], layout.positions["Data", "Quality"]] == [2, 3]
+    assert layout.range("Data") == slice(3, 5)
+
+
+def test_layouts_of_different_structures_get_different_tags():
+    assert layout_for(CATEGORIES).tag != layout_for({"Cloud": ["Design", "Cost"], "Data": ["Quality", "Lineage"]}).tag
+    with pytest.raises(ValueError):
+        layout_for({"Empty": []})
+
+
+def test_scores_pack_one_byte_per_sub_capability():
+    assessment = Assessment(layout_for(CATEGORIES))
+    assessment["Cloud", "Cost"] = 4
+    assessment["Data", "Lineage"] = 5
+    assert assessment.to_bytes() == bytes([0, 4, 0, 0, 5])
+    assert assessment["Cloud", "Cost"] == 4
+    assert assessment["Data"].tolist() == [0, 5]
+    with pytest.raises(ValueError):
+        assessment["Cloud", "Design"] = 256
+    with pytest.raises(ValueError):
+        Assessment(layout_for(CATEGORIES), [1, 2])
+
+
+def test_category_view_follows_later_edits():
+    assessment = Assessment(layout_for(CATEGORIES))
+    view = assessment["Cloud"]
+    assessment["Cloud", "Design"] = 3
+    assert view.tolist() == [3, 0, 0]
+
+
+def test_round_trip_through_the_app_dict_shape():
+    all_scores = {"Cloud": {"average": 3.0, "sub_capabilities": {"Design": 1, "Cost": 3, "Recovery": 5}},
+                  "Data": {"Quality": 2, "Lineage": 4, "Unknown": 5},
+                  "Not a category": {"x": 1}}
+    assessment = Assessment.from_dict(layout_for(CATEGORIES), all_scores)
+    assert assessment.to_bytes() == bytes([1, 3, 5, 2, 4])
+    assert assessment.averages() == [3.0, 3.0]
+    assert assessment.to_dict() == {"Cloud": {"average": 3.0, "sub_capabilities": {"Design": 1, "Cost": 3, "Recovery": 5}},
+                                    "Data": {"average": 3.0, "sub_capabilities": {"Quality": 2, "Lineage": 4}}}
+    assert list(assessment.to_dict(["Data"])) == ["Data"]
+
+
+def test_average_digits():
+    assessment = Assessment.from_dict(layout_for(CATEGORIES), {"Cloud": {"Design": 1, "Cost": 2, "Recovery": 2}})
+    assert assessment.to_dict()["Cloud"]["average"] == 1.7
+    assert assessment.to_dict(average_digits=None)["Cloud"]["average"] == 2
+
+
+def test_flat_layout_has_one_score_per_category():
+    layout = layout_for(["Cloud", "Data"])
+    assessment = Assessment(layout)
+    assessment["Cloud"] = 4
+    assert assessment.to_dict() == {"Cloud": 4, "Data": 0}
+    assert Assessment.from_dict(layout, {"Data": 2}).to_dict() == {"Cloud": 0, "Data": 2}
+
+
+def test_fingerprint_round_trip_and_equality():
+    layout = layout_for(CATEGORIES)
+    assessment = Assessment(layout, [1, 2, 3, 4, 5])
+    fingerprint = assessment.fingerprint()
+    assert fingerprint == layout.tag + "0102030405"
+    restored = Assessment.from_fingerprint(layout, fingerprint)
+    assert restored == assessment
+    copy = assessment.copy()
+    copy["Cloud", "Design"] = 5
+    assert copy != assessment and assessment["Cloud", "Design"] == 1
+    with pytest.raises(ValueError):
+        Assessment.from_fingerprint(layout_for(["Cloud"]), fingerprint)
@@ -0,0 +1,87 @@
+# test_token_budget.py
+
+import json
+
+import pytest
+
+from maturity_engine import serialize_fragments
+from token_budget import UsageMeter, context_window, count_tokens, estimate_cost, format_usage
+
+
+def test_count_tokens():
+    assert count_tokens("") == 0
+    assert count_tokens(None) == 0
+    assert 0 < count_tokens("short text") < count_tokens("short text " * 50)
+
+
+def test_context_window_uses_the_longest_matching_prefix():
+    assert context_window("gpt-4o-2024-08-06") == 128000
+    assert context_window("gpt-4") == 8192
+    assert context_window("some-other-model") == 4096
+
+
+def test_estimate_cost():
+    assert estimate_cost("gpt-4o-mini", 1_000_000, 1_000_000) == pytest.approx(0.75)
+    assert estimate_cost("gpt-4o-mini-2024-07-18", 2000, 0) == pytest.approx(0.0003)
+    assert estimate_cost("unknown-model", 10, 10) is None
+
+
+def test_usage_meter_summary_per_stage():
+    meter = UsageMeter()
+    meter.record("card", "gpt-4o-mini", 1000, 500, 1.5)
+    meter.record("card", "gpt-4o-mini", 1000, 0, 0.0, cached=True)
+    meter.record("consolidate", "gpt-4o", 2000, 400, 2.0, estimated=True)
+    summary = meter.summary()
+    assert (summary["calls"], summary["cached_calls"]) == (3, 1)
+    assert (summary["prompt_tokens"], summary["completion_tokens"]) == (4000, 900)
+    assert summary["model_seconds"] == pytest.approx(3.5)
+    assert summary["estimated"] is True
+    assert summary["cost_usd"] == pytest.approx(estimate_cost("gpt-4o-mini", 1000, 500)
+                                                + estimate_cost("gpt-4o", 2000, 400))
+    assert summary["stages"]["card"]["calls"] == 2
+    assert summary["stages"]["consolidate"]["completion_tokens"] == 400
+
+
+def test_usage_meter_cost_is_unknown_when_a_model_has_no_price():
+    meter = UsageMeter()
+    meter.record("card", "gpt-4o-mini", 100, 100, 0.1)
+    meter.record("card", "unknown-model", 100, 100, 0.1)
+    assert meter.summary()["cost_usd"] is None
+    assert "cost n/a" in format_usage(meter.summary())
+
+
+def test_usage_meter_merge():
+    first, second = UsageMeter(), UsageMeter()
+    first.record("card", "gpt-4o-mini", 10, 20, 0.1)
+    second.record("card", "gpt-4o-mini", 30, 40, 0.2)
+    first.merge(second)
+    assert (first.summary()["calls"], first.summary()["prompt_tokens"]) == (2, 40)
+    assert second.summary()["calls"] == 1
+
+
+def test_format_usage_marks_estimates():
+    meter = UsageMeter()
+    meter.record("card", "gpt-4o-mini", 1200, 300, 1.0, estimated=True)
+    assert format_usage(meter.summary()) == ("1 call(s) (0 cached) · ≈1,200 prompt + ≈300 completion tokens · "
+                                             "cost $0.0004 · model time 1.0s")
+
+
+def _fragments(items):
+    return [{"category": f"Category {i}", "focus_8w": [f"Sprint item {i}.{j} " * 3 for j in range(items)],
+             "plan_3y": [f"Year item {i}.{j} " * 3 for j in range(items)]} for i in range(6)]
+
+
+def test_serialize_fragments_keeps_pretty_json_when_it_fits():
+    fragments = _fragments(1)
+    assert serialize_fragments(fragments, budget_tokens=10_000) == json.dumps(fragments, indent=2, ensure_ascii=False)
+
+
+def test_serialize_fragments_trims_to_the_budget():
+    fragments = _fragments(8)
+    budget = count_tokens(json.dumps(_fragments(3), separators=(",", ":")))
+    trimmed = json.loads(serialize_fragments(fragments, budget_tokens=budget))
+    assert count_tokens(serialize_fragments(fragments, budget_tokens=budget)) <= budget
+    assert [f["category"] for f in trimmed] == [f["category"] for f in fragments]
+    # the earliest (highest priority) items are the ones kept
+    assert trimmed[0]["focus_8w"] == fragments[0]["focus_8w"][:len(trimmed[0]["focus_8w"])]
+    assert 1 <= len(trimmed[0]["focus_8w"]) < 8
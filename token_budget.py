@@ -0,0 +1,143 @@
+# token_budget.py
+# Token counting, context-window limits and per-assessment usage/cost accounting for model calls.
+# Uses tiktoken when it is installed; otherwise falls back to a ~4 characters/token estimate.
+
+import threading
+import time
+
+# USD per 1M tokens (prompt, completion); update when OpenAI pricing changes
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+}
+
+CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4o-mini": 128000,
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4": 8192,
+}
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def _lookup(table, model, default=None):
+    # longest matching prefix, so dated snapshots ("gpt-4o-2024-08-06") use their family's entry
+    for name in sorted(table, key=len, reverse=True):
+        if model.startswith(name):
+            return table[name]
+    return default
+
+
+def _encoding(model):
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                import tiktoken
+            except ImportError:
+                _encodings[model] = None
+            else:
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("cl100k_base")
+        return _encodings[model]
+
+
+def count_tokens(text, model="gpt-3.5-turbo"):
+    """
+    Number of tokens text uses for model (exact with tiktoken, estimated without).
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def context_window(model):
+    return _lookup(CONTEXT_WINDOWS, model, 4096)
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    prices = _lookup(MODEL_PRICES, model)
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def _empty_totals():
+    return {"calls": 0, "cached_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "model_seconds": 0.0, "cost_usd": 0.0}
+
+
+class UsageMeter:
+    """
+    Collects one record per model call (stage, model, tokens, latency, cost) for an assessment.
+    Token counts come from the response's `usage` when present and are counted locally otherwise
+    (marked estimated). Cache hits are recorded at zero cost. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+        self.started = self.finished = time.perf_counter()
+
+    def record(self, stage, model, prompt_tokens, completion_tokens, seconds, cached=False, estimated=False):
+        cost = 0.0 if cached else estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            self.records.append({
+                "stage": stage, "model": model, "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens, "seconds": seconds, "cached": cached,
+                "estimated": estimated, "cost_usd": cost
+            })
+            self.finished = time.perf_counter()
+
+    def merge(self, other):
+        """Add the call records of another meter (e.g. work done ahead of time) to this one."""
+        with other._lock:
+            records = list(other.records)
+        with self._lock:
+            self.records.extend(records)
+            self.finished = time.perf_counter()
+
+    def summary(self):
+        """
+        Totals for the assessment plus a per-stage breakdown. cost_usd is None if a model has no price;
+        wall_seconds runs from the meter's creation to the last recorded call.
+        """
+        with self._lock:
+            records = list(self.records)
+            wall = self.finished - self.started
+        totals = _empty_totals()
+        stages = {}
+        for r in records:
+            if r["stage"] not in stages:
+                stages[r["stage"]] = _empty_totals()
+            for bucket in (totals, stages[r["stage"]]):
+                bucket["calls"] += 1
+                bucket["cached_calls"] += 1 if r["cached"] else 0
+                bucket["prompt_tokens"] += r["prompt_tokens"]
+                bucket["completion_tokens"] += r["completion_tokens"]
+                bucket["model_seconds"] += r["seconds"]
+                if bucket["cost_usd"] is not None:
+                    bucket["cost_usd"] = None if r["cost_usd"] is None else bucket["cost_usd"] + r["cost_usd"]
+        totals["wall_seconds"] = wall
+        totals["estimated"] = any(r["estimated"] for r in records)
+        totals["stages"] = stages
+        return totals
+
+
+def format_usage(summary):
+    """One-line human summary, shared by the app and the batch CLI."""
+    cost = "n/a" if summary["cost_usd"] is None else f"${summary['cost_usd']:.4f}"
+    approx = "≈" if summary["estimated"] else ""
+    return (f"{summary['calls']} call(s) ({summary['cached_calls']} cached) · "
+            f"{approx}{summary['prompt_tokens']:,} prompt + {approx}{summary['completion_tokens']:,} completion tokens · "
+            f"cost {cost} · model time {summary['model_seconds']:.1f}s")